@@ -0,0 +1,21 @@
+-- Indexes for the quran_ayah_lemma_location lookups made by the word-column scripts
+-- and the ayah endpoints. scripts/index_advisor.py prints the query plans and
+-- timings with and without them.
+
+-- Position lookups: UPDATE ... WHERE surah = ? AND ayah = ? AND token_index = ?,
+-- the joins on staged words and every ORDER BY surah, ayah, token_index.
+-- It also serves (surah, ayah) lookups, so it replaces idx_quran_ayah_lemma_location_ref.
+CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_position
+  ON quran_ayah_lemma_location (surah, ayah, token_index);
+
+DROP INDEX IF EXISTS idx_quran_ayah_lemma_location_ref;
+
+-- batch_update_specific_words.gather_rows: WHERE word_simple IN (...), read from the index alone.
+CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_word_simple
+  ON quran_ayah_lemma_location (word_simple, surah, ayah, token_index, word_location);
+
+-- Rows still missing word columns, keyed by id for the backfill's resumable ranges;
+-- shrinks to nothing once the backfill is done.
+CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_missing_words
+  ON quran_ayah_lemma_location (id, surah, ayah, token_index)
+  WHERE word_simple IS NULL OR word_diacritic IS NULL;
@@ -0,0 +1,29 @@
+-- Shared phrases from the tarteel.ai export (Database/data/tarteel.ai/quran-meta/phrases.json),
+-- loaded by scripts/import-tarteel-phrases.py. See scripts/quran_phrases.py for the lookups.
+
+CREATE TABLE IF NOT EXISTS quran_phrases (
+  phrase_id     INTEGER PRIMARY KEY,
+  source_surah  INTEGER NOT NULL,
+  source_ayah   INTEGER NOT NULL,
+  source_from   INTEGER NOT NULL,
+  source_to     INTEGER NOT NULL,
+  surahs        INTEGER NOT NULL,
+  ayahs         INTEGER NOT NULL,
+  occurrences   INTEGER NOT NULL
+);
+
+-- One inclusive, 1-based word range [word_from, word_to] per phrase occurrence.
+-- The primary key is the interval index for "phrases covering word N of S:A":
+-- WHERE surah = ? AND ayah = ? AND word_from <= N AND word_to >= N.
+CREATE TABLE IF NOT EXISTS quran_phrase_ranges (
+  phrase_id  INTEGER NOT NULL,
+  surah      INTEGER NOT NULL,
+  ayah       INTEGER NOT NULL,
+  word_from  INTEGER NOT NULL,
+  word_to    INTEGER NOT NULL,
+  PRIMARY KEY (surah, ayah, word_from, word_to, phrase_id)
+) WITHOUT ROWID;
+
+-- Every occurrence of one phrase.
+CREATE INDEX IF NOT EXISTS idx_quran_phrase_ranges_phrase
+  ON quran_phrase_ranges (phrase_id, surah, ayah, word_from);
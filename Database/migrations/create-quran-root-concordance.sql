@@ -0,0 +1,134 @@
+-- Materialized root -> lemma -> occurrence concordance (see scripts/quran_concordance.py).
+-- Root and lemma pages become one range scan on (root_id, ordinal) instead of the
+-- ar_u_roots -> ar_u_tokens -> quran_ayah_lemmas -> quran_ayah_lemma_location join.
+--
+-- This fills the tables from scratch. The triggers then record the lemmas whose
+-- occurrences or root change, and scripts/build_concordance.py rewrites only their
+-- roots. Digests start out NULL here, so each root's first refresh rewrites it.
+
+CREATE TABLE IF NOT EXISTS quran_root_concordance_roots (
+  root_id      INTEGER PRIMARY KEY,
+  ar_u_root    TEXT NOT NULL UNIQUE,
+  occurrences  INTEGER NOT NULL,
+  lemmas       INTEGER NOT NULL,
+  digest       TEXT,
+  updated_at   TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS quran_root_concordance_lemmas (
+  lemma_id       INTEGER PRIMARY KEY,
+  root_id        INTEGER NOT NULL,
+  first_ordinal  INTEGER NOT NULL,
+  occurrences    INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_quran_root_concordance_lemmas_root
+  ON quran_root_concordance_lemmas (root_id, first_ordinal);
+
+CREATE TABLE IF NOT EXISTS quran_root_concordance (
+  root_id         INTEGER NOT NULL,
+  ordinal         INTEGER NOT NULL,
+  lemma_id        INTEGER NOT NULL,
+  surah           INTEGER NOT NULL,
+  ayah            INTEGER NOT NULL,
+  token_index     INTEGER NOT NULL,
+  location_id     INTEGER NOT NULL,
+  word_simple     TEXT,
+  word_diacritic  TEXT,
+  PRIMARY KEY (root_id, ordinal)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS quran_root_concordance_dirty (
+  lemma_id INTEGER PRIMARY KEY
+);
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_location_ai
+AFTER INSERT ON quran_ayah_lemma_location BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (new.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_location_ad
+AFTER DELETE ON quran_ayah_lemma_location BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_location_au
+AFTER UPDATE OF lemma_id, surah, ayah, token_index, word_simple, word_diacritic ON quran_ayah_lemma_location BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id), (new.lemma_id);
+END;
+
+-- Dropped first so databases created with the earlier body (new.lemma_id only) get this one.
+DROP TRIGGER IF EXISTS quran_root_concordance_lemma_au;
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_lemma_au
+AFTER UPDATE OF lemma_id, primary_ar_u_token ON quran_ayah_lemmas BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id), (new.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_lemma_ad
+AFTER DELETE ON quran_ayah_lemmas BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_token_ai
+AFTER INSERT ON ar_u_tokens BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id)
+  SELECT lemma_id FROM quran_ayah_lemmas WHERE primary_ar_u_token = new.ar_u_token;
+END;
+
+-- Dropped first so databases created with the earlier body (ar_u_root only) get this one.
+DROP TRIGGER IF EXISTS quran_root_concordance_token_au;
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_token_au
+AFTER UPDATE OF ar_u_token, ar_u_root ON ar_u_tokens BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id)
+  SELECT lemma_id FROM quran_ayah_lemmas WHERE primary_ar_u_token IN (old.ar_u_token, new.ar_u_token);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_token_ad
+AFTER DELETE ON ar_u_tokens BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id)
+  SELECT lemma_id FROM quran_ayah_lemmas WHERE primary_ar_u_token = old.ar_u_token;
+END;
+
+-- Lemmas of a token, for the ar_u_tokens triggers and refreshes limited to a few roots.
+CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemmas_primary_ar_u_token
+  ON quran_ayah_lemmas (primary_ar_u_token);
+
+DELETE FROM quran_root_concordance;
+DELETE FROM quran_root_concordance_lemmas;
+DELETE FROM quran_root_concordance_roots;
+DELETE FROM quran_root_concordance_dirty;
+
+-- Same rows and order as SOURCE_ROWS_SQL in scripts/quran_concordance.py.
+INSERT INTO quran_root_concordance_roots (ar_u_root, occurrences, lemmas)
+SELECT t.ar_u_root, COUNT(*), COUNT(DISTINCT loc.lemma_id)
+FROM quran_ayah_lemma_location AS loc
+JOIN quran_ayah_lemmas AS l ON l.lemma_id = loc.lemma_id
+JOIN ar_u_tokens AS t ON t.ar_u_token = l.primary_ar_u_token
+WHERE t.ar_u_root IS NOT NULL
+GROUP BY t.ar_u_root
+ORDER BY t.ar_u_root;
+
+INSERT INTO quran_root_concordance
+  (root_id, ordinal, lemma_id, surah, ayah, token_index, location_id, word_simple, word_diacritic)
+SELECT
+  r.root_id,
+  row_number() OVER (
+    PARTITION BY r.root_id
+    ORDER BY loc.lemma_id, loc.surah, loc.ayah, loc.token_index, loc.id
+  ) - 1,
+  loc.lemma_id,
+  loc.surah,
+  loc.ayah,
+  loc.token_index,
+  loc.id,
+  loc.word_simple,
+  loc.word_diacritic
+FROM quran_ayah_lemma_location AS loc
+JOIN quran_ayah_lemmas AS l ON l.lemma_id = loc.lemma_id
+JOIN ar_u_tokens AS t ON t.ar_u_token = l.primary_ar_u_token
+JOIN quran_root_concordance_roots AS r ON r.ar_u_root = t.ar_u_root;
+
+INSERT INTO quran_root_concordance_lemmas (lemma_id, root_id, first_ordinal, occurrences)
+SELECT lemma_id, root_id, MIN(ordinal), COUNT(*)
+FROM quran_root_concordance
+GROUP BY root_id, lemma_id;
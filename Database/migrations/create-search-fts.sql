@@ -0,0 +1,142 @@
+-- Generated by scripts/build_search_index.py --write-sql; edit quran_search.py instead.
+
+-- word: quran_ayah_lemma_location (word_simple, word_diacritic)
+DROP TRIGGER IF EXISTS quran_word_fts_ai;
+DROP TRIGGER IF EXISTS quran_word_fts_ad;
+DROP TRIGGER IF EXISTS quran_word_fts_au;
+DROP VIEW IF EXISTS quran_word_fts_source;
+DROP TABLE IF EXISTS quran_word_fts;
+CREATE VIRTUAL TABLE IF NOT EXISTS quran_word_fts USING fts5(
+  word_simple, word_diacritic,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3 4'
+);
+CREATE VIEW IF NOT EXISTS quran_word_fts_source AS
+SELECT
+  src.id AS doc_id,
+  CASE WHEN src.word_simple GLOB '*[' || char(1425, 45, 1479, 1552, 45, 1562, 1570, 45, 1571, 1573, 1577, 1609, 1611, 45, 1631, 1648, 1750, 45, 1773, 2259, 45, 2303) || ']*' THEN (
+    WITH RECURSIVE walk(rest, out) AS (
+      SELECT src.word_simple, ''
+      UNION ALL
+      SELECT substr(rest, 2), out || CASE
+        WHEN unicode(rest) BETWEEN 1552 AND 1562 OR unicode(rest) BETWEEN 1611 AND 1631 OR unicode(rest) = 1648 OR unicode(rest) BETWEEN 1750 AND 1773 OR unicode(rest) BETWEEN 2259 AND 2303 OR unicode(rest) BETWEEN 1425 AND 1479 THEN ''
+        ELSE CASE unicode(rest) WHEN 1571 THEN char(1575) WHEN 1573 THEN char(1575) WHEN 1570 THEN char(1575) WHEN 1609 THEN char(1610) WHEN 1577 THEN char(1607) ELSE substr(rest, 1, 1) END
+      END
+      FROM walk
+      WHERE rest <> ''
+    )
+    SELECT out FROM walk WHERE rest = ''
+  ) ELSE src.word_simple END AS word_simple,
+  CASE WHEN src.word_diacritic GLOB '*[' || char(1425, 45, 1479, 1552, 45, 1562, 1570, 45, 1571, 1573, 1577, 1609, 1611, 45, 1631, 1648, 1750, 45, 1773, 2259, 45, 2303) || ']*' THEN (
+    WITH RECURSIVE walk(rest, out) AS (
+      SELECT src.word_diacritic, ''
+      UNION ALL
+      SELECT substr(rest, 2), out || CASE
+        WHEN unicode(rest) BETWEEN 1552 AND 1562 OR unicode(rest) BETWEEN 1611 AND 1631 OR unicode(rest) = 1648 OR unicode(rest) BETWEEN 1750 AND 1773 OR unicode(rest) BETWEEN 2259 AND 2303 OR unicode(rest) BETWEEN 1425 AND 1479 THEN ''
+        ELSE CASE unicode(rest) WHEN 1571 THEN char(1575) WHEN 1573 THEN char(1575) WHEN 1570 THEN char(1575) WHEN 1609 THEN char(1610) WHEN 1577 THEN char(1607) ELSE substr(rest, 1, 1) END
+      END
+      FROM walk
+      WHERE rest <> ''
+    )
+    SELECT out FROM walk WHERE rest = ''
+  ) ELSE src.word_diacritic END AS word_diacritic
+FROM quran_ayah_lemma_location AS src;
+CREATE TRIGGER IF NOT EXISTS quran_word_fts_ai AFTER INSERT ON quran_ayah_lemma_location BEGIN
+  INSERT INTO quran_word_fts (rowid, word_simple, word_diacritic) SELECT doc_id, word_simple, word_diacritic FROM quran_word_fts_source WHERE doc_id = new.id;
+END;
+CREATE TRIGGER IF NOT EXISTS quran_word_fts_ad AFTER DELETE ON quran_ayah_lemma_location BEGIN
+  DELETE FROM quran_word_fts WHERE rowid = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS quran_word_fts_au
+AFTER UPDATE OF word_simple, word_diacritic, id ON quran_ayah_lemma_location BEGIN
+  DELETE FROM quran_word_fts WHERE rowid = old.id;
+  INSERT INTO quran_word_fts (rowid, word_simple, word_diacritic) SELECT doc_id, word_simple, word_diacritic FROM quran_word_fts_source WHERE doc_id = new.id;
+END;
+DELETE FROM quran_word_fts;
+INSERT INTO quran_word_fts (rowid, word_simple, word_diacritic) SELECT doc_id, word_simple, word_diacritic FROM quran_word_fts_source;
+
+-- lemma: ar_u_tokens (lemma_norm)
+DROP TRIGGER IF EXISTS ar_u_token_fts_ai;
+DROP TRIGGER IF EXISTS ar_u_token_fts_ad;
+DROP TRIGGER IF EXISTS ar_u_token_fts_au;
+DROP VIEW IF EXISTS ar_u_token_fts_source;
+DROP TABLE IF EXISTS ar_u_token_fts;
+CREATE VIRTUAL TABLE IF NOT EXISTS ar_u_token_fts USING fts5(
+  lemma_norm, ar_u_token UNINDEXED,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3 4'
+);
+CREATE VIEW IF NOT EXISTS ar_u_token_fts_source AS
+SELECT
+  src.rowid AS doc_id,
+  CASE WHEN src.lemma_norm GLOB '*[' || char(1425, 45, 1479, 1552, 45, 1562, 1570, 45, 1571, 1573, 1577, 1609, 1611, 45, 1631, 1648, 1750, 45, 1773, 2259, 45, 2303) || ']*' THEN (
+    WITH RECURSIVE walk(rest, out) AS (
+      SELECT src.lemma_norm, ''
+      UNION ALL
+      SELECT substr(rest, 2), out || CASE
+        WHEN unicode(rest) BETWEEN 1552 AND 1562 OR unicode(rest) BETWEEN 1611 AND 1631 OR unicode(rest) = 1648 OR unicode(rest) BETWEEN 1750 AND 1773 OR unicode(rest) BETWEEN 2259 AND 2303 OR unicode(rest) BETWEEN 1425 AND 1479 THEN ''
+        ELSE CASE unicode(rest) WHEN 1571 THEN char(1575) WHEN 1573 THEN char(1575) WHEN 1570 THEN char(1575) WHEN 1609 THEN char(1610) WHEN 1577 THEN char(1607) ELSE substr(rest, 1, 1) END
+      END
+      FROM walk
+      WHERE rest <> ''
+    )
+    SELECT out FROM walk WHERE rest = ''
+  ) ELSE src.lemma_norm END AS lemma_norm,
+  src.ar_u_token AS ar_u_token
+FROM ar_u_tokens AS src;
+CREATE TRIGGER IF NOT EXISTS ar_u_token_fts_ai AFTER INSERT ON ar_u_tokens BEGIN
+  INSERT INTO ar_u_token_fts (rowid, lemma_norm, ar_u_token) SELECT doc_id, lemma_norm, ar_u_token FROM ar_u_token_fts_source WHERE doc_id = new.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS ar_u_token_fts_ad AFTER DELETE ON ar_u_tokens BEGIN
+  DELETE FROM ar_u_token_fts WHERE rowid = old.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS ar_u_token_fts_au
+AFTER UPDATE OF lemma_norm, ar_u_token ON ar_u_tokens BEGIN
+  DELETE FROM ar_u_token_fts WHERE rowid = old.rowid;
+  INSERT INTO ar_u_token_fts (rowid, lemma_norm, ar_u_token) SELECT doc_id, lemma_norm, ar_u_token FROM ar_u_token_fts_source WHERE doc_id = new.rowid;
+END;
+DELETE FROM ar_u_token_fts;
+INSERT INTO ar_u_token_fts (rowid, lemma_norm, ar_u_token) SELECT doc_id, lemma_norm, ar_u_token FROM ar_u_token_fts_source;
+
+-- root: ar_u_roots (search_keys_norm)
+DROP TRIGGER IF EXISTS ar_u_root_fts_ai;
+DROP TRIGGER IF EXISTS ar_u_root_fts_ad;
+DROP TRIGGER IF EXISTS ar_u_root_fts_au;
+DROP VIEW IF EXISTS ar_u_root_fts_source;
+DROP TABLE IF EXISTS ar_u_root_fts;
+CREATE VIRTUAL TABLE IF NOT EXISTS ar_u_root_fts USING fts5(
+  search_keys_norm, ar_u_root UNINDEXED,
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3 4'
+);
+CREATE VIEW IF NOT EXISTS ar_u_root_fts_source AS
+SELECT
+  src.rowid AS doc_id,
+  CASE WHEN src.search_keys_norm GLOB '*[' || char(1425, 45, 1479, 1552, 45, 1562, 1570, 45, 1571, 1573, 1577, 1609, 1611, 45, 1631, 1648, 1750, 45, 1773, 2259, 45, 2303) || ']*' THEN (
+    WITH RECURSIVE walk(rest, out) AS (
+      SELECT src.search_keys_norm, ''
+      UNION ALL
+      SELECT substr(rest, 2), out || CASE
+        WHEN unicode(rest) BETWEEN 1552 AND 1562 OR unicode(rest) BETWEEN 1611 AND 1631 OR unicode(rest) = 1648 OR unicode(rest) BETWEEN 1750 AND 1773 OR unicode(rest) BETWEEN 2259 AND 2303 OR unicode(rest) BETWEEN 1425 AND 1479 THEN ''
+        ELSE CASE unicode(rest) WHEN 1571 THEN char(1575) WHEN 1573 THEN char(1575) WHEN 1570 THEN char(1575) WHEN 1609 THEN char(1610) WHEN 1577 THEN char(1607) ELSE substr(rest, 1, 1) END
+      END
+      FROM walk
+      WHERE rest <> ''
+    )
+    SELECT out FROM walk WHERE rest = ''
+  ) ELSE src.search_keys_norm END AS search_keys_norm,
+  src.ar_u_root AS ar_u_root
+FROM ar_u_roots AS src;
+CREATE TRIGGER IF NOT EXISTS ar_u_root_fts_ai AFTER INSERT ON ar_u_roots BEGIN
+  INSERT INTO ar_u_root_fts (rowid, search_keys_norm, ar_u_root) SELECT doc_id, search_keys_norm, ar_u_root FROM ar_u_root_fts_source WHERE doc_id = new.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS ar_u_root_fts_ad AFTER DELETE ON ar_u_roots BEGIN
+  DELETE FROM ar_u_root_fts WHERE rowid = old.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS ar_u_root_fts_au
+AFTER UPDATE OF search_keys_norm, ar_u_root ON ar_u_roots BEGIN
+  DELETE FROM ar_u_root_fts WHERE rowid = old.rowid;
+  INSERT INTO ar_u_root_fts (rowid, search_keys_norm, ar_u_root) SELECT doc_id, search_keys_norm, ar_u_root FROM ar_u_root_fts_source WHERE doc_id = new.rowid;
+END;
+DELETE FROM ar_u_root_fts;
+INSERT INTO ar_u_root_fts (rowid, search_keys_norm, ar_u_root) SELECT doc_id, search_keys_norm, ar_u_root FROM ar_u_root_fts_source;
@@ -714,6 +714,22 @@ CREATE TABLE ar_grammar_unit_items (
 --------------------------------------------------------------------------------
 -- 3) OCCURRENCE LAYER (Arabic transactional)
 --------------------------------------------------------------------------------
+-- Import manifests (scripts/import_manifest.py) outlive the tables they describe:
+-- the sources whose tables this file recreates are forgotten next to their DROPs.
+CREATE TABLE IF NOT EXISTS import_manifest_sources (
+  source       TEXT PRIMARY KEY,
+  fingerprint  TEXT NOT NULL,
+  row_count    INTEGER NOT NULL DEFAULT 0,
+  updated_at   TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS import_manifest_rows (
+  source   TEXT NOT NULL,
+  row_key  TEXT NOT NULL,
+  digest   TEXT NOT NULL,
+  PRIMARY KEY (source, row_key)
+) WITHOUT ROWID;
+
 DROP TABLE IF EXISTS ar_token_pair_links;
 DROP TABLE IF EXISTS ar_token_valency_link;
 DROP TABLE IF EXISTS ar_token_lexicon_link;
@@ -723,8 +739,25 @@ DROP TABLE IF EXISTS ar_occ_sentence;
 DROP TABLE IF EXISTS ar_occ_span;
 DROP TABLE IF EXISTS ar_occ_token_morph;
 DROP TABLE IF EXISTS ar_occ_token;
+DROP VIEW IF EXISTS quran_word_fts_source;
+DROP VIEW IF EXISTS ar_u_token_fts_source;
+DROP VIEW IF EXISTS ar_u_root_fts_source;
+DROP TABLE IF EXISTS quran_word_fts;
+DROP TABLE IF EXISTS ar_u_token_fts;
+DROP TABLE IF EXISTS ar_u_root_fts;
+DROP TABLE IF EXISTS quran_phrase_ranges;
+DROP TABLE IF EXISTS quran_phrases;
+DELETE FROM import_manifest_rows WHERE source = 'tarteel_phrases';
+DELETE FROM import_manifest_sources WHERE source = 'tarteel_phrases';
+DROP TABLE IF EXISTS quran_root_concordance_dirty;
+DROP TABLE IF EXISTS quran_root_concordance;
+DROP TABLE IF EXISTS quran_root_concordance_lemmas;
+DROP TABLE IF EXISTS quran_root_concordance_roots;
 DROP TABLE IF EXISTS quran_ayah_lemma_location;
 DROP TABLE IF EXISTS quran_ayah_lemmas;
+-- ar_u_tokens is recreated in section 2 above.
+DELETE FROM import_manifest_rows WHERE source IN ('qul_lemma_tables', 'qul_word_lemmas');
+DELETE FROM import_manifest_sources WHERE source IN ('qul_lemma_tables', 'qul_word_lemmas');
 
 CREATE TABLE ar_occ_token (
   ar_token_occ_id  TEXT PRIMARY KEY,
@@ -964,8 +997,127 @@ CREATE TABLE quran_ayah_lemma_location (
 
 CREATE UNIQUE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_unique
   ON quran_ayah_lemma_location (lemma_id, word_location);
-CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_ref
-  ON quran_ayah_lemma_location (surah, ayah);
+CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_position
+  ON quran_ayah_lemma_location (surah, ayah, token_index);
+CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_word_simple
+  ON quran_ayah_lemma_location (word_simple, surah, ayah, token_index, word_location);
+CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_missing_words
+  ON quran_ayah_lemma_location (id, surah, ayah, token_index)
+  WHERE word_simple IS NULL OR word_diacritic IS NULL;
+
+-- Root -> lemma -> occurrence concordance, materialized by scripts/build_concordance.py.
+CREATE TABLE quran_root_concordance_roots (
+  root_id      INTEGER PRIMARY KEY,
+  ar_u_root    TEXT NOT NULL UNIQUE,
+  occurrences  INTEGER NOT NULL,
+  lemmas       INTEGER NOT NULL,
+  digest       TEXT,
+  updated_at   TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE quran_root_concordance_lemmas (
+  lemma_id       INTEGER PRIMARY KEY,
+  root_id        INTEGER NOT NULL,
+  first_ordinal  INTEGER NOT NULL,
+  occurrences    INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_quran_root_concordance_lemmas_root
+  ON quran_root_concordance_lemmas (root_id, first_ordinal);
+
+CREATE TABLE quran_root_concordance (
+  root_id         INTEGER NOT NULL,
+  ordinal         INTEGER NOT NULL,
+  lemma_id        INTEGER NOT NULL,
+  surah           INTEGER NOT NULL,
+  ayah            INTEGER NOT NULL,
+  token_index     INTEGER NOT NULL,
+  location_id     INTEGER NOT NULL,
+  word_simple     TEXT,
+  word_diacritic  TEXT,
+  PRIMARY KEY (root_id, ordinal)
+) WITHOUT ROWID;
+
+CREATE TABLE quran_root_concordance_dirty (
+  lemma_id INTEGER PRIMARY KEY
+);
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_location_ai
+AFTER INSERT ON quran_ayah_lemma_location BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (new.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_location_ad
+AFTER DELETE ON quran_ayah_lemma_location BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_location_au
+AFTER UPDATE OF lemma_id, surah, ayah, token_index, word_simple, word_diacritic ON quran_ayah_lemma_location BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id), (new.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_lemma_au
+AFTER UPDATE OF lemma_id, primary_ar_u_token ON quran_ayah_lemmas BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id), (new.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_lemma_ad
+AFTER DELETE ON quran_ayah_lemmas BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_token_ai
+AFTER INSERT ON ar_u_tokens BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id)
+  SELECT lemma_id FROM quran_ayah_lemmas WHERE primary_ar_u_token = new.ar_u_token;
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_token_au
+AFTER UPDATE OF ar_u_token, ar_u_root ON ar_u_tokens BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id)
+  SELECT lemma_id FROM quran_ayah_lemmas WHERE primary_ar_u_token IN (old.ar_u_token, new.ar_u_token);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_token_ad
+AFTER DELETE ON ar_u_tokens BEGIN
+  INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id)
+  SELECT lemma_id FROM quran_ayah_lemmas WHERE primary_ar_u_token = old.ar_u_token;
+END;
+
+-- Lemmas of a token, for the ar_u_tokens triggers and refreshes limited to a few roots.
+CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemmas_primary_ar_u_token
+  ON quran_ayah_lemmas (primary_ar_u_token);
+
+-- Shared phrases, loaded by scripts/import-tarteel-phrases.py.
+CREATE TABLE quran_phrases (
+  phrase_id     INTEGER PRIMARY KEY,
+  source_surah  INTEGER NOT NULL,
+  source_ayah   INTEGER NOT NULL,
+  source_from   INTEGER NOT NULL,
+  source_to     INTEGER NOT NULL,
+  surahs        INTEGER NOT NULL,
+  ayahs         INTEGER NOT NULL,
+  occurrences   INTEGER NOT NULL
+);
+
+CREATE TABLE quran_phrase_ranges (
+  phrase_id  INTEGER NOT NULL,
+  surah      INTEGER NOT NULL,
+  ayah       INTEGER NOT NULL,
+  word_from  INTEGER NOT NULL,
+  word_to    INTEGER NOT NULL,
+  PRIMARY KEY (surah, ayah, word_from, word_to, phrase_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_quran_phrase_ranges_phrase
+  ON quran_phrase_ranges (phrase_id, surah, ayah, word_from);
+
+-- FTS5 search over quran_ayah_lemma_location, ar_u_tokens and ar_u_roots
+-- (quran_word_fts, ar_u_token_fts, ar_u_root_fts, their *_source views and
+-- *_ai/_ad/_au triggers) is not inlined here: the views' Arabic folding is
+-- generated from scripts/arabic_normalize.py by scripts/quran_search.py.
+-- Apply migrations/create-search-fts.sql after this file.
 
 --------------------------------------------------------------------------------
 -- 4) WORLDVIEW (wv_) + PLANNER (sp_)
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Apply exported word-update chunks to D1, resuming from a progress journal.
+
+Chunks come from export_word_updates_chunks.py. Each chunk is run through an
+executor: ``wrangler`` shells out to ``npx wrangler d1 execute --file`` for
+the remote database, ``sqlite`` applies it to a local SQLite file standing
+in for D1. Finished chunks are appended to a JSONL journal in the chunk
+directory, so a rerun skips them and picks up at the chunk that failed.
+Once every chunk is done, the row manifest the export left pending is moved
+into place, so the next ``--baseline`` export never skips unapplied rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import shlex
+import sqlite3
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from import_manifest import file_sha256
+
+CHUNK_MANIFEST_NAME = "manifest.json"
+JOURNAL_NAME = "apply-journal.jsonl"
+
+
+class ChunkApplyError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Chunk:
+    index: int
+    path: Path
+    sha256: Optional[str]
+    first_key: Optional[Tuple[int, int, int]]
+    last_key: Optional[Tuple[int, int, int]]
+
+
+def _parse_key(text: Optional[str]) -> Optional[Tuple[int, int, int]]:
+    if not text:
+        return None
+    surah, ayah, token_index = text.split(":")
+    return int(surah), int(ayah), int(token_index)
+
+
+def read_chunk_sql(path: Path) -> str:
+    if path.suffix == ".gz":
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            return fh.read()
+    return path.read_text(encoding="utf-8")
+
+
+def load_chunks(chunk_dir: Path) -> List[Chunk]:
+    """Chunks listed in manifest.json, or every word-updates-NNN file when there is no manifest."""
+    manifest_path = chunk_dir / CHUNK_MANIFEST_NAME
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        return [
+            Chunk(
+                index=entry["index"],
+                path=chunk_dir / entry["file"],
+                sha256=entry.get("sha256"),
+                first_key=_parse_key(entry.get("first_key")),
+                last_key=_parse_key(entry.get("last_key")),
+            )
+            for entry in sorted(manifest["chunks"], key=lambda entry: entry["index"])
+        ]
+    paths = sorted([*chunk_dir.glob("word-updates-*.sql"), *chunk_dir.glob("word-updates-*.sql.gz")])
+    return [Chunk(index, path, None, None, None) for index, path in enumerate(paths, start=1)]
+
+
+def promote_row_manifest(chunk_dir: Path) -> Optional[Path]:
+    """Move the export's pending row manifest to its final path; returns that path, or None if nothing was pending."""
+    manifest_path = chunk_dir / CHUNK_MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    entry = json.loads(manifest_path.read_text(encoding="utf-8")).get("row_manifest")
+    if not entry:
+        return None
+    pending, target = Path(entry["pending"]), Path(entry["path"])
+    if not pending.exists():
+        return None
+    pending.replace(target)
+    return target
+
+
+def ranges_are_disjoint(chunks: List[Chunk]) -> bool:
+    """True when every chunk has a key range and no two ranges overlap, so apply order does not matter."""
+    if any(chunk.first_key is None or chunk.last_key is None for chunk in chunks):
+        return False
+    ordered = sorted(chunks, key=lambda chunk: chunk.first_key)
+    return all(prev.last_key < nxt.first_key for prev, nxt in zip(ordered, ordered[1:]))
+
+
+class SqliteExecutor:
+    """Fake D1: applies chunks to a local SQLite file, one connection per call."""
+
+    name = "sqlite"
+
+    def __init__(self, db_path: Path) -> None:
+        if not db_path.exists():
+            raise SystemExit(f"SQLite stand-in missing: {db_path}")
+        self.db_path = db_path
+
+    def execute(self, chunk: Chunk) -> None:
+        sql = read_chunk_sql(chunk.path)
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        try:
+            # D1 runs a --file import atomically; BEGIN/COMMIT gives the stand-in the same semantics.
+            conn.executescript("BEGIN;\n" + sql + "\nCOMMIT;")
+        except sqlite3.Error as exc:
+            conn.rollback()
+            raise ChunkApplyError(f"{chunk.path.name}: {exc}") from exc
+        finally:
+            conn.close()
+
+
+class WranglerExecutor:
+    """Runs each chunk with ``wrangler d1 execute <database> --remote --file <chunk>``."""
+
+    name = "wrangler"
+
+    def __init__(self, database: str, wrangler: str, local: bool, timeout: float) -> None:
+        self.database = database
+        self.command = shlex.split(wrangler)
+        self.location_flag = "--local" if local else "--remote"
+        self.timeout = timeout
+
+    def execute(self, chunk: Chunk) -> None:
+        with tempfile.TemporaryDirectory(prefix="d1-chunk-") as tmp_dir:
+            path = chunk.path
+            if path.suffix == ".gz":
+                # wrangler only reads plain .sql files.
+                path = Path(tmp_dir) / path.with_suffix("").name
+                path.write_text(read_chunk_sql(chunk.path), encoding="utf-8")
+            args = [
+                *self.command, "d1", "execute", self.database, self.location_flag, "--yes", "--file", str(path)
+            ]
+            try:
+                result = subprocess.run(args, capture_output=True, text=True, timeout=self.timeout)
+            except subprocess.TimeoutExpired as exc:
+                raise ChunkApplyError(f"{chunk.path.name}: wrangler timed out after {self.timeout:.0f}s") from exc
+            except OSError as exc:
+                raise ChunkApplyError(f"{chunk.path.name}: could not run {self.command[0]}: {exc}") from exc
+        if result.returncode != 0:
+            detail = (result.stderr or result.stdout).strip().splitlines()
+            raise ChunkApplyError(
+                f"{chunk.path.name}: wrangler exited {result.returncode}: {' | '.join(detail[-3:])}"
+            )
+
+
+class Journal:
+    """Append-only JSONL record of chunk attempts; a chunk is done once a matching "done" line exists."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+
+    def completed(self) -> Dict[str, Optional[str]]:
+        done: Dict[str, Optional[str]] = {}
+        if not self.path.exists():
+            return done
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get("status") == "done":
+                done[entry["file"]] = entry.get("sha256")
+        return done
+
+    def record(self, chunk: Chunk, status: str, attempts: int, seconds: float, error: Optional[str] = None) -> None:
+        entry = {
+            "file": chunk.path.name,
+            "sha256": chunk.sha256,
+            "status": status,
+            "attempts": attempts,
+            "seconds": round(seconds, 3),
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        if error:
+            entry["error"] = error
+        with self.lock, self.path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def apply_chunk(executor, journal: Journal, chunk: Chunk, retries: int, backoff: float) -> float:
+    started = time.perf_counter()
+    for attempt in range(1, retries + 2):
+        try:
+            executor.execute(chunk)
+        except ChunkApplyError as exc:
+            if attempt > retries:
+                journal.record(chunk, "failed", attempt, time.perf_counter() - started, str(exc))
+                raise
+            delay = backoff * 2 ** (attempt - 1)
+            print(f"  {chunk.path.name}: attempt {attempt} failed ({exc}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        seconds = time.perf_counter() - started
+        journal.record(chunk, "done", attempt, seconds)
+        return seconds
+    raise AssertionError("unreachable")
+
+
+def report_promotion(row_manifest: Optional[Path]) -> None:
+    if row_manifest is not None:
+        print(f"Every chunk is applied; row manifest for the next --baseline is now {row_manifest}.")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Apply exported word-update chunks to D1 with resume support.")
+    parser.add_argument(
+        "--chunk-dir",
+        type=Path,
+        default=Path("word-updates-chunks"),
+        help="Directory written by export_word_updates_chunks.py.",
+    )
+    parser.add_argument(
+        "--executor",
+        choices=["wrangler", "sqlite"],
+        default="wrangler",
+        help="wrangler applies chunks to D1; sqlite applies them to --sqlite-db as a local stand-in.",
+    )
+    parser.add_argument("--database", default="knowledgemap", help="D1 database name passed to wrangler.")
+    parser.add_argument("--wrangler", default="npx wrangler", help="Command used to invoke wrangler.")
+    parser.add_argument("--local", action="store_true", help="Pass --local instead of --remote to wrangler.")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds before a wrangler call is abandoned.")
+    parser.add_argument("--sqlite-db", type=Path, help="SQLite file the sqlite executor writes to.")
+    parser.add_argument("--retries", type=int, default=3, help="Extra attempts per chunk after a failure.")
+    parser.add_argument("--backoff", type=float, default=2.0, help="First retry delay in seconds; doubles each retry.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Chunks applied at once. Only honoured when the manifest shows disjoint key ranges.",
+    )
+    parser.add_argument("--restart", action="store_true", help="Discard the journal and apply every chunk again.")
+    parser.add_argument("--dry-run", action="store_true", help="List the chunks that would be applied.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.chunk_dir.is_dir():
+        raise SystemExit(f"Chunk directory missing: {args.chunk_dir}")
+    chunks = load_chunks(args.chunk_dir)
+    if not chunks:
+        raise SystemExit(f"No word-update chunks found in {args.chunk_dir}")
+
+    journal = Journal(args.chunk_dir / JOURNAL_NAME)
+    if args.restart:
+        journal.path.unlink(missing_ok=True)
+    completed = journal.completed()
+    pending: List[Chunk] = []
+    for chunk in chunks:
+        if not chunk.path.exists():
+            raise SystemExit(f"Chunk listed in the manifest is missing: {chunk.path}")
+        if chunk.sha256 and file_sha256(chunk.path) != chunk.sha256:
+            raise SystemExit(f"Checksum mismatch for {chunk.path}; re-export the chunk set.")
+        if chunk.path.name in completed and completed[chunk.path.name] == chunk.sha256:
+            continue
+        pending.append(chunk)
+    print(f"{len(chunks) - len(pending)} of {len(chunks)} chunks already applied; {len(pending)} to go.")
+    if args.dry_run:
+        for chunk in pending:
+            print(f"  would apply {chunk.path.name}")
+        return
+    if not pending:
+        # An earlier run may have applied the last chunk and stopped before promoting.
+        report_promotion(promote_row_manifest(args.chunk_dir))
+        return
+
+    if args.executor == "sqlite":
+        if not args.sqlite_db:
+            raise SystemExit("--executor sqlite requires --sqlite-db.")
+        executor = SqliteExecutor(args.sqlite_db)
+    else:
+        executor = WranglerExecutor(args.database, args.wrangler, args.local, args.timeout)
+
+    concurrency = max(1, args.concurrency)
+    if concurrency > 1 and not ranges_are_disjoint(chunks):
+        print("Chunk key ranges are unknown or overlap; applying one chunk at a time.")
+        concurrency = 1
+
+    started = time.perf_counter()
+    applied = 0
+    failures: List[str] = []
+    in_flight: Dict[Future, Chunk] = {}
+    queue = list(reversed(pending))
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while queue or in_flight:
+            # Stop handing out new chunks after a failure so the journal ends at a clean resume point.
+            while queue and len(in_flight) < concurrency and not failures:
+                chunk = queue.pop()
+                in_flight[pool.submit(apply_chunk, executor, journal, chunk, args.retries, args.backoff)] = chunk
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = in_flight.pop(future)
+                try:
+                    seconds = future.result()
+                except ChunkApplyError as exc:
+                    failures.append(str(exc))
+                    print(f"Failed {chunk.path.name}: {exc}")
+                    continue
+                applied += 1
+                print(f"Applied {chunk.path.name} ({seconds:.2f}s) [{applied}/{len(pending)}]")
+
+    elapsed = time.perf_counter() - started
+    if failures:
+        raise SystemExit(
+            f"Applied {applied} of {len(pending)} chunks in {elapsed:.1f}s; {len(failures)} failed. "
+            "Rerun the same command to resume."
+        )
+    print(f"Applied {applied} chunks via {executor.name} in {elapsed:.1f}s.")
+    report_promotion(promote_row_manifest(args.chunk_dir))
+
+
+if __name__ == "__main__":
+    main()
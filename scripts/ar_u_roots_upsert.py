@@ -0,0 +1,99 @@
+"""Bulk upsert of ar_u_roots rows shared by the root importers.
+
+Rows go through ``executemany`` in chunks inside one transaction. The
+``DO UPDATE`` clause carries a ``WHERE`` that only fires when a column
+actually differs, so re-syncing an unchanged export leaves the table's
+pages untouched. Counts come from ``changes()`` (the cursor rowcount) and
+the table's row count: RETURNING rows are discarded by ``executemany``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+ROOTS_TABLE = "ar_u_roots"
+ROOTS_KEY = "ar_u_root"
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class UpsertStats:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.inserted + self.updated + self.unchanged
+
+    def summary(self) -> str:
+        return f"{self.inserted} inserted, {self.updated} updated, {self.unchanged} unchanged"
+
+
+def build_upsert_sql(columns: Sequence[str], update_columns: Optional[Sequence[str]] = None) -> str:
+    """INSERT ... ON CONFLICT(ar_u_root) DO UPDATE ... WHERE <any update column differs>."""
+    if ROOTS_KEY not in columns:
+        raise ValueError(f"Upsert columns must include {ROOTS_KEY}")
+    if update_columns is None:
+        update_columns = [column for column in columns if column != ROOTS_KEY]
+    unknown = set(update_columns) - set(columns)
+    if unknown:
+        raise ValueError(f"Update columns not inserted: {', '.join(sorted(unknown))}")
+    assignments = ",\n  ".join(f"{column} = excluded.{column}" for column in update_columns)
+    differs = "\n   OR ".join(f"{ROOTS_TABLE}.{column} IS NOT excluded.{column}" for column in update_columns)
+    return (
+        f"INSERT INTO {ROOTS_TABLE} ({', '.join(columns)})\n"
+        f"VALUES ({', '.join('?' for _ in columns)})\n"
+        f"ON CONFLICT({ROOTS_KEY}) DO UPDATE SET\n  {assignments}\n"
+        f"WHERE {differs}"
+    )
+
+
+def _chunks(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    chunk: List[Tuple] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def upsert_roots(
+    conn: sqlite3.Connection,
+    columns: Sequence[str],
+    rows: Iterable[Tuple],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> UpsertStats:
+    """Upsert ``rows`` (tuples ordered like ``columns``) and commit once; rolls back on error.
+
+    A key repeated within ``rows`` is counted as an update (or no-op) of its earlier row.
+    """
+    sql = build_upsert_sql(columns, update_columns)
+    width = len(columns)
+    stats = UpsertStats()
+    cursor = conn.cursor()
+    count_sql = f"SELECT COUNT(*) FROM {ROOTS_TABLE}"
+    try:
+        (before,) = cursor.execute(count_sql).fetchone()
+        for chunk in _chunks(rows, chunk_size):
+            for row in chunk:
+                if len(row) != width:
+                    raise ValueError(f"Row for {row[0] if row else '?'} has {len(row)} values for {width} columns")
+            cursor.executemany(sql, chunk)
+            changed = cursor.rowcount
+            (after,) = cursor.execute(count_sql).fetchone()
+            inserted = after - before
+            before = after
+            stats.inserted += inserted
+            stats.updated += changed - inserted
+            stats.unchanged += len(chunk) - changed
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return stats
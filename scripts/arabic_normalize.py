@@ -0,0 +1,109 @@
+"""Arabic text normalization shared by the import and linking scripts.
+
+Both normalizers are a single ``str.translate`` over precompiled tables
+instead of a regex pass plus chained ``str.replace`` calls:
+
+* ``normalize_arabic`` drops diacritics, folds alef variants to bare alef,
+  alef maqsura to yaa and taa marbuta to haa, and collapses whitespace runs
+  to single spaces (lemma_norm / word search keys).
+* ``normalize_root_arabic`` drops diacritics and removes all whitespace
+  (``"ك ت ب"`` -> ``"كتب"``) without any letter folding (root keys).
+
+The module-level functions are LRU-cached because the importers normalize
+the same lemma and root strings many times; the ``*_batch`` variants
+translate a whole list in one call.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+# Same code points as the DIACRITICS_RE character class the scripts used before.
+DIACRITIC_RANGES = (
+    (0x0610, 0x061A),
+    (0x064B, 0x065F),
+    (0x0670, 0x0670),
+    (0x06D6, 0x06ED),
+    (0x08D3, 0x08FF),
+    (0x0591, 0x05C7),
+)
+
+LETTER_FOLDS = {
+    "أ": "ا",
+    "إ": "ا",
+    "آ": "ا",
+    "ى": "ي",
+    "ة": "ه",
+}
+
+# Everything str.split() treats as a separator; U+3000 is the highest such code point.
+WHITESPACE = "".join(chr(code) for code in range(0x3001) if chr(code).isspace())
+
+# Joins batch items; it is neither whitespace nor touched by either table.
+_BATCH_SEPARATOR = "\x00"
+
+_Table = Dict[int, Optional[str]]
+
+
+def _diacritic_table() -> _Table:
+    return {code: None for start, end in DIACRITIC_RANGES for code in range(start, end + 1)}
+
+
+ARABIC_TABLE: _Table = {
+    **_diacritic_table(),
+    **str.maketrans(LETTER_FOLDS),
+    **{ord(char): " " for char in WHITESPACE},
+}
+ROOT_TABLE: _Table = {
+    **_diacritic_table(),
+    **{ord(char): None for char in WHITESPACE},
+}
+
+
+def fold_arabic(text: Optional[str]) -> str:
+    """Uncached ``normalize_arabic``."""
+    if not text:
+        return ""
+    return " ".join(text.translate(ARABIC_TABLE).split())
+
+
+def fold_root_arabic(text: Optional[str]) -> str:
+    """Uncached ``normalize_root_arabic``."""
+    if not text:
+        return ""
+    return text.translate(ROOT_TABLE)
+
+
+@lru_cache(maxsize=1 << 16)
+def normalize_arabic(text: Optional[str]) -> str:
+    return fold_arabic(text)
+
+
+@lru_cache(maxsize=1 << 14)
+def normalize_root_arabic(text: Optional[str]) -> str:
+    return fold_root_arabic(text)
+
+
+def _translate_joined(texts: List[Optional[str]], table: _Table) -> Optional[List[str]]:
+    """Translate all texts in one call, or return None if a text contains the separator."""
+    items = [text or "" for text in texts]
+    if any(_BATCH_SEPARATOR in item for item in items):
+        return None
+    return _BATCH_SEPARATOR.join(items).translate(table).split(_BATCH_SEPARATOR) if items else []
+
+
+def normalize_arabic_batch(texts: Iterable[Optional[str]]) -> List[str]:
+    texts = list(texts)
+    translated = _translate_joined(texts, ARABIC_TABLE)
+    if translated is None:
+        return [fold_arabic(text) for text in texts]
+    return [" ".join(item.split()) for item in translated]
+
+
+def normalize_root_arabic_batch(texts: Iterable[Optional[str]]) -> List[str]:
+    texts = list(texts)
+    translated = _translate_joined(texts, ROOT_TABLE)
+    if translated is None:
+        return [fold_root_arabic(text) for text in texts]
+    return translated
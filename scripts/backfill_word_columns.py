@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Set-based backfill of quran_ayah_lemma_location word columns from ar_occ_token."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from quran_tokens import TOKEN_STAGE_TABLE, stage_quran_tokens
+
+# Prefer the token at token_index - 1 and fall back to token_index, exactly as
+# update_word_columns_batch.py does row by row.
+BACKFILL_CHUNK_SQL = f"""
+    UPDATE quran_ayah_lemma_location AS loc
+    SET word_simple = COALESCE(NULLIF(tok.norm_ar, ''), tok.surface_ar),
+        word_diacritic = tok.surface_ar
+    FROM (
+        SELECT
+            l.id AS id,
+            CASE WHEN prev.pos_index IS NOT NULL THEN prev.surface_ar ELSE cur.surface_ar END AS surface_ar,
+            CASE WHEN prev.pos_index IS NOT NULL THEN prev.norm_ar ELSE cur.norm_ar END AS norm_ar
+        FROM quran_ayah_lemma_location AS l
+        LEFT JOIN temp.{TOKEN_STAGE_TABLE} AS prev
+            ON prev.surah = l.surah AND prev.ayah = l.ayah AND prev.pos_index = l.token_index - 1
+        LEFT JOIN temp.{TOKEN_STAGE_TABLE} AS cur
+            ON cur.surah = l.surah AND cur.ayah = l.ayah AND cur.pos_index = l.token_index
+        WHERE l.id > ? AND l.id <= ?
+          AND (l.word_simple IS NULL OR l.word_diacritic IS NULL)
+          AND (prev.pos_index IS NOT NULL OR cur.pos_index IS NOT NULL)
+    ) AS tok
+    WHERE loc.id = tok.id
+"""
+
+
+def read_progress(path: Path, target_db: Path) -> int:
+    if not path.exists():
+        return 0
+    state = json.loads(path.read_text(encoding="utf-8"))
+    if state.get("target_db") != str(target_db.resolve()):
+        raise SystemExit(f"Progress file {path} belongs to {state.get('target_db')}; pass --restart to discard it.")
+    return int(state.get("last_id") or 0)
+
+
+def write_progress(path: Path, target_db: Path, last_id: int) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps({"target_db": str(target_db.resolve()), "last_id": last_id}), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def pending_id_range(conn: sqlite3.Connection, after_id: int) -> Optional[tuple[int, int]]:
+    row = conn.execute(
+        """
+        SELECT MIN(id), MAX(id)
+        FROM quran_ayah_lemma_location
+        WHERE id > ? AND (word_simple IS NULL OR word_diacritic IS NULL)
+        """,
+        (after_id,),
+    ).fetchone()
+    if row is None or row[0] is None:
+        return None
+    return row[0], row[1]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Backfill quran_ayah_lemma_location word columns with one joined UPDATE per chunk."
+    )
+    parser.add_argument("--target-db", type=Path, default=Path("database/d1.db"), help="Target D1 SQLite file.")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Row ids covered by each UPDATE/commit.")
+    parser.add_argument(
+        "--progress-file",
+        type=Path,
+        default=Path("word-backfill.progress.json"),
+        help="Where the last committed row id is recorded so an interrupted run can resume.",
+    )
+    parser.add_argument("--restart", action="store_true", help="Ignore any saved progress and start from the first row.")
+    parser.add_argument("--dry-run", action="store_true", help="Run the updates, report counts, then roll back.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.target_db.exists():
+        raise SystemExit(f"Target DB missing: {args.target_db}")
+    if args.restart and args.progress_file.exists():
+        args.progress_file.unlink()
+    last_id = read_progress(args.progress_file, args.target_db)
+    if last_id:
+        print(f"Resuming after row id {last_id}.")
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(args.target_db)
+    staged = stage_quran_tokens(conn)
+    print(f"Staged {staged} Quran tokens in {time.perf_counter() - started:.2f}s.")
+
+    id_range = pending_id_range(conn, last_id)
+    if id_range is None:
+        print("No rows need word columns.")
+        conn.close()
+        args.progress_file.unlink(missing_ok=True)
+        return
+
+    low, high = id_range
+    cursor = conn.cursor()
+    updated = 0
+    chunk_start = max(last_id, low - 1)
+    while chunk_start < high:
+        chunk_end = min(chunk_start + args.chunk_size, high)
+        cursor.execute(BACKFILL_CHUNK_SQL, (chunk_start, chunk_end))
+        updated += cursor.rowcount
+        if args.dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+            write_progress(args.progress_file, args.target_db, chunk_end)
+        print(f"Rows {chunk_start + 1}-{chunk_end}: {cursor.rowcount} updated ({updated} total).")
+        chunk_start = chunk_end
+
+    elapsed = time.perf_counter() - started
+    if args.dry_run:
+        conn.close()
+        print(f"[dry-run] would have updated {updated} rows ({elapsed:.2f}s).")
+        return
+
+    remaining = conn.execute(
+        "SELECT COUNT(*) FROM quran_ayah_lemma_location WHERE word_simple IS NULL OR word_diacritic IS NULL"
+    ).fetchone()[0]
+    conn.close()
+    args.progress_file.unlink(missing_ok=True)
+    print(f"Updated {updated} rows in {elapsed:.2f}s; {remaining} rows still have NULL word columns.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,9 @@ from __future__ import annotations
 import argparse
 import sqlite3
 from pathlib import Path
-from typing import Iterable, List, Sequence
+from typing import Iterable, List, Mapping, Sequence
 
-from quran_words import load_salam_word_map
+from quran_words import WordKey, WordValue, open_salam_word_map
 
 
 def chunked(iterable: Sequence, size: int) -> Iterable[Sequence]:
@@ -29,7 +29,9 @@ def gather_rows(cursor: sqlite3.Cursor, targets: List[str]) -> List[sqlite3.Row]
     return list(cursor.execute(query, targets))
 
 
-def build_updates(rows: List[sqlite3.Row], word_map: dict, targets: List[str]) -> List[tuple]:
+def build_updates(
+    rows: List[sqlite3.Row], word_map: Mapping[WordKey, WordValue], targets: List[str]
+) -> List[tuple]:
     updates = []
     for row in rows:
         surah = row["surah"]
@@ -81,13 +83,14 @@ def main() -> None:
     args = parse_args()
     if not args.target_db.exists():
         raise SystemExit(f"Target DB missing: {args.target_db}")
-    word_map = load_salam_word_map(args.quran_words)
     targets = parse_targets(args.words)
 
     conn = sqlite3.connect(args.target_db)
     cursor = conn.cursor()
     rows = gather_rows(cursor, targets)
+    word_map = open_salam_word_map(args.quran_words)
     updates = build_updates(rows, word_map, targets)
+    word_map.close()
 
     if not updates:
         print("No updates to run; all target rows already match the surface map.")
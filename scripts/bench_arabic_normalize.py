@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Compare the legacy regex Arabic normalizers with arabic_normalize on the QUL lemma list."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from arabic_normalize import (
+    LETTER_FOLDS,
+    WHITESPACE,
+    fold_arabic,
+    fold_root_arabic,
+    normalize_arabic,
+    normalize_arabic_batch,
+    normalize_root_arabic,
+    normalize_root_arabic_batch,
+)
+
+# The implementations import-qul-word-lemmas.py and link_tokens_to_roots.py used, kept verbatim.
+LEGACY_DIACRITICS_RE = re.compile(
+    r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u08D3-\u08FF\u0591-\u05C7]+"
+)
+
+
+def legacy_normalize_arabic(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    normalized = text.strip()
+    normalized = LEGACY_DIACRITICS_RE.sub("", normalized)
+    normalized = " ".join(normalized.split())
+    normalized = normalized.replace("أ", "ا").replace("إ", "ا").replace("آ", "ا")
+    normalized = normalized.replace("ى", "ي").replace("ة", "ه")
+    return normalized
+
+
+def legacy_normalize_root_arabic(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    cleaned = LEGACY_DIACRITICS_RE.sub("", text)
+    cleaned = "".join(cleaned.split())
+    return cleaned
+
+
+def load_lemma_texts(lemmas_db: Path) -> List[Optional[str]]:
+    """Every text the lemma importer normalizes: text and text_clean of each lemma."""
+    conn = sqlite3.connect(lemmas_db)
+    texts: List[Optional[str]] = []
+    for text, text_clean in conn.execute("SELECT text, text_clean FROM lemmas"):
+        texts.extend((text, text_clean))
+    conn.close()
+    return texts
+
+
+def fuzz_texts(count: int, seed: int = 0) -> List[Optional[str]]:
+    """Random strings mixing Arabic letters, folded letters, marks from every range and odd whitespace."""
+    rng = random.Random(seed)
+    marks = [chr(code) for code in range(0x0591, 0x05C8)] + [chr(code) for code in range(0x0610, 0x0700)]
+    alphabet = (
+        [chr(code) for code in range(0x0621, 0x064B)]
+        + list(LETTER_FOLDS)
+        + marks
+        + [chr(code) for code in range(0x08D0, 0x0900)]
+        + list(WHITESPACE)
+        + list("abc 123")
+    )
+    texts: List[Optional[str]] = [None, "", " ", "ً", " أَب ة\t"]
+    for _ in range(count):
+        texts.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 24))))
+    return texts
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def check_identical(texts: Iterable[Optional[str]]) -> List[str]:
+    texts = list(texts)
+    failures = []
+    expected = [legacy_normalize_arabic(text) for text in texts]
+    expected_root = [legacy_normalize_root_arabic(text) for text in texts]
+    for name, got in (
+        ("fold_arabic", [fold_arabic(text) for text in texts]),
+        ("normalize_arabic", [normalize_arabic(text) for text in texts]),
+        ("normalize_arabic_batch", normalize_arabic_batch(texts)),
+    ):
+        if got != expected:
+            failures.append(name)
+    for name, got in (
+        ("fold_root_arabic", [fold_root_arabic(text) for text in texts]),
+        ("normalize_root_arabic", [normalize_root_arabic(text) for text in texts]),
+        ("normalize_root_arabic_batch", normalize_root_arabic_batch(texts)),
+    ):
+        if got != expected_root:
+            failures.append(name)
+    return failures
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the shared Arabic normalizers against the legacy ones.")
+    parser.add_argument("--lemmas-db", type=Path, required=True, help="QUL word-lemma SQLite file.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant; the fastest run is reported.")
+    parser.add_argument("--fuzz", type=int, default=20000, help="Random strings added to the identity check.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.lemmas_db.exists():
+        raise SystemExit(f"Word lemma DB missing: {args.lemmas_db}")
+
+    texts = load_lemma_texts(args.lemmas_db)
+    failures = check_identical(texts + fuzz_texts(args.fuzz))
+    if failures:
+        raise SystemExit(f"Normalizers disagree with the legacy implementation: {', '.join(failures)}")
+    print(f"Identical output on {len(texts)} lemma texts and {args.fuzz} random strings.")
+
+    variants = [
+        ("arabic", "legacy", lambda: [legacy_normalize_arabic(text) for text in texts]),
+        ("arabic", "translate", lambda: [fold_arabic(text) for text in texts]),
+        ("arabic", "batch", lambda: normalize_arabic_batch(texts)),
+        ("arabic", "cached", lambda: [normalize_arabic(text) for text in texts]),
+        ("root", "legacy", lambda: [legacy_normalize_root_arabic(text) for text in texts]),
+        ("root", "translate", lambda: [fold_root_arabic(text) for text in texts]),
+        ("root", "batch", lambda: normalize_root_arabic_batch(texts)),
+        ("root", "cached", lambda: [normalize_root_arabic(text) for text in texts]),
+    ]
+    print(f"{'normalizer':<10} {'variant':<10} {'seconds':>9} {'texts/sec':>12} {'speedup':>8}")
+    baseline = {}
+    for normalizer, variant, func in variants:
+        # The cached variants are warm after the identity check, as in a long import run.
+        seconds = best_of(args.repeat, func)
+        baseline.setdefault(normalizer, seconds)
+        rate = len(texts) / seconds if seconds else 0.0
+        speedup = baseline[normalizer] / seconds if seconds else 0.0
+        print(f"{normalizer:<10} {variant:<10} {seconds:>9.4f} {rate:>12,.0f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Check canonical_ids against golden ids and the legacy per-script helpers, then time them."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import re
+import time
+from typing import Callable, List, Optional, Tuple
+
+from canonical_ids import canonical_id, canonical_ids, canonicalize, canonicalize_lower, sha256_id, universal_id
+
+# Ids already stored in D1; these must never change.
+GOLDEN_IDS: List[Tuple[str, bool, str]] = [
+    ("ROOT|كتب", False, "690f22621b5793c382e6a116d1d043209daf9dbfaa1ad6bf3c36657177cba09d"),
+    ("ROOT|ktb", False, "c9dcbeda184bfdc0f2597be54701bcd6eccddb55e7b349c006aeeb3250ee46d0"),
+    ("ROOT|  K T\tB \n", False, "b4d31b47f47bc36594f897bdb75c051a62f238e0644547645153522d61a9c5cc"),
+    ("ROOT|كتب|1234", False, "e80d95337c50d591d698f62470ef1468051e4b64d9e37f33d74de809e94cc516"),
+    ("TOK|كِتَاب|noun", False, "8a85754db164f98e537ab577b4baa4b90ec3c5d3b22ef63a87027d92600c6e83"),
+    (
+        "GRAMUNIT|Madinah Arabic Book 1|chapter|03",
+        True,
+        "a8de9e8b47301904e7b0e55a208a7f71f21d9930c32d88bbe4f82dbfa58b3867",
+    ),
+    (
+        "GRAMUNIT|Madinah Arabic Book 1|section|3.1",
+        True,
+        "1e00d6490e3d5590687a9a57779ea93935f150236ae4b35f230b7df3838ae138",
+    ),
+    ("GRAMUNIT|ÉCOLE|book", True, "0f8b25f3bd985cbe0aeeaa3a90db0ac348af11c9523a997dee6c337031f9c95a"),
+]
+# import-qul-word-lemmas.py hashes "lemma_norm|pos" as-is, without canonicalizing.
+GOLDEN_TOKEN_ID = ("كتاب|noun", "2af06cb2ecda7909035f1e92f77b08a9594400f505c6218538526ed6bd43bcc1")
+
+
+# The helpers the root importers and extract-grammar-pdf.py each carried, kept verbatim.
+def legacy_canonicalize(value: str) -> str:
+    normalized = re.sub(r"\s+", " ", value or "").strip()
+    return re.sub(r"[A-Z]", lambda match: match.group(0).lower(), normalized)
+
+
+def legacy_sha256_hex(input_value: str) -> Tuple[str, str]:
+    canonical = legacy_canonicalize(input_value)
+    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return digest, canonical
+
+
+def legacy_grammar_canonicalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+
+def fuzz_inputs(count: int, seed: int = 0) -> List[Optional[str]]:
+    """Random KIND|... strings over ASCII, Latin-1 capitals, Arabic, and every Unicode space."""
+    rng = random.Random(seed)
+    spaces = [chr(code) for code in range(0x3001) if chr(code).isspace()] + [chr(0x200B), chr(0xFEFF)]
+    alphabet = (
+        list("ABCXYZabcxyz0189|-_.")
+        + [chr(code) for code in range(0x00C0, 0x0100)]
+        + [chr(code) for code in range(0x0130, 0x0132)]
+        + [chr(code) for code in range(0x0621, 0x0656)]
+        + [chr(0x1E9E), chr(0x212A), chr(0x0130)]
+        + spaces
+    )
+    inputs: List[Optional[str]] = [None, "", " ", "\t\n", "ROOT|"]
+    for _ in range(count):
+        kind = rng.choice(["ROOT", "TOK", "GRAMUNIT", "GRAMITEM", "SPAN"])
+        inputs.append(kind + "|" + "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30))))
+    return inputs
+
+
+def check_golden() -> List[str]:
+    failures = []
+    for raw, unicode_lower, expected in GOLDEN_IDS:
+        if universal_id(raw, unicode_lower)[0] != expected:
+            failures.append(f"golden {raw!r}")
+        kind, *parts = raw.split("|")
+        if canonical_id(kind, *parts, unicode_lower=unicode_lower)[0] != expected:
+            failures.append(f"canonical_id {raw!r}")
+    if sha256_id(GOLDEN_TOKEN_ID[0]) != GOLDEN_TOKEN_ID[1]:
+        failures.append("sha256_id token")
+    return failures
+
+
+def check_identical(inputs: List[Optional[str]], workers: int) -> List[str]:
+    failures = []
+    expected = [legacy_sha256_hex(value) for value in inputs]
+    if [canonicalize(value) for value in inputs] != [canonical for _, canonical in expected]:
+        failures.append("canonicalize")
+    if [canonicalize_lower(value) for value in inputs] != [legacy_grammar_canonicalize(value) for value in inputs]:
+        failures.append("canonicalize_lower")
+    texts = [value or "" for value in inputs]
+    if [universal_id(text) for text in texts] != expected:
+        failures.append("universal_id")
+    if canonical_ids(texts, workers=1) != expected:
+        failures.append("canonical_ids (serial)")
+    if canonical_ids(texts, workers=workers, chunk_size=1000, min_parallel=0) != expected:
+        failures.append("canonical_ids (pool)")
+    return failures
+
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check and benchmark the shared canonical-id helpers.")
+    parser.add_argument("--fuzz", type=int, default=20000, help="Random inputs added to the identity check.")
+    parser.add_argument("--count", type=int, default=400000, help="Inputs hashed in the timing run.")
+    parser.add_argument("--workers", type=int, default=4, help="Processes used by the bulk variant.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the fastest run is reported.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    failures = check_golden() + check_identical(fuzz_inputs(args.fuzz), args.workers)
+    if failures:
+        raise SystemExit(f"canonical_ids disagrees with the stored ids: {', '.join(failures)}")
+    print(f"Golden ids match; identical output on {args.fuzz} random inputs.")
+
+    inputs = [f"ROOT|Root {index % 9000}|{index}" for index in range(args.count)]
+    variants = [
+        ("legacy", lambda: [legacy_sha256_hex(value) for value in inputs]),
+        ("uncached", lambda: [universal_id.__wrapped__(value) for value in inputs]),
+        ("bulk", lambda: canonical_ids(inputs, workers=args.workers)),
+    ]
+    print(f"{'variant':<10} {'seconds':>9} {'ids/sec':>12} {'speedup':>8}")
+    baseline = None
+    for variant, func in variants:
+        seconds = best_of(args.repeat, func)
+        baseline = baseline or seconds
+        rate = len(inputs) / seconds if seconds else 0.0
+        speedup = baseline / seconds if seconds else 0.0
+        print(f"{variant:<10} {seconds:>9.4f} {rate:>12,.0f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
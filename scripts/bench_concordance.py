@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Benchmark and check the root concordance (quran_concordance.py) against the live join.
+
+Works on a copy of --db. Builds the concordance and checks every root's rows
+and lemma offsets against the ar_u_roots -> ar_u_tokens -> quran_ayah_lemmas
+-> quran_ayah_lemma_location join. Then deletes, inserts and edits locations
+and moves lemmas between roots through the triggers, times the incremental
+refresh against a full rewrite and checks again. Finally times root and
+lemma pages against the same pages read from the join.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from quran_concordance import lemma_page, refresh_concordance, root_page, source_roots
+
+LIVE_ROOT_PAGE_SQL = """
+    SELECT loc.lemma_id, loc.surah, loc.ayah, loc.token_index, loc.id, loc.word_simple, loc.word_diacritic
+    FROM ar_u_roots AS r
+    JOIN ar_u_tokens AS t ON t.ar_u_root = r.ar_u_root
+    JOIN quran_ayah_lemmas AS l ON l.primary_ar_u_token = t.ar_u_token
+    JOIN quran_ayah_lemma_location AS loc ON loc.lemma_id = l.lemma_id
+    WHERE r.ar_u_root = ?
+    ORDER BY loc.lemma_id, loc.surah, loc.ayah, loc.token_index, loc.id
+    LIMIT ? OFFSET ?
+"""
+
+LIVE_LEMMA_PAGE_SQL = """
+    SELECT loc.lemma_id, loc.surah, loc.ayah, loc.token_index, loc.id, loc.word_simple, loc.word_diacritic
+    FROM quran_ayah_lemma_location AS loc
+    JOIN quran_ayah_lemmas AS l ON l.lemma_id = loc.lemma_id
+    JOIN ar_u_tokens AS t ON t.ar_u_token = l.primary_ar_u_token
+    WHERE loc.lemma_id = ? AND t.ar_u_root IS NOT NULL
+    ORDER BY loc.surah, loc.ayah, loc.token_index, loc.id
+    LIMIT ? OFFSET ?
+"""
+
+
+def concordance_mismatches(conn: sqlite3.Connection) -> List[str]:
+    """Roots whose stored rows, counts or lemma offsets differ from the live join."""
+    stored: Dict[str, Tuple[int, int, int]] = {
+        ar_u_root: (root_id, occurrences, lemmas)
+        for root_id, ar_u_root, occurrences, lemmas in conn.execute(
+            "SELECT root_id, ar_u_root, occurrences, lemmas FROM quran_root_concordance_roots"
+        )
+    }
+    problems = []
+    for ar_u_root, rows in source_roots(conn):
+        if ar_u_root not in stored:
+            problems.append(f"{ar_u_root}: missing")
+            continue
+        root_id, occurrences, lemma_count = stored.pop(ar_u_root)
+        entries = [
+            tuple(row)
+            for row in conn.execute(
+                """
+                SELECT lemma_id, surah, ayah, token_index, location_id, word_simple, word_diacritic
+                FROM quran_root_concordance WHERE root_id = ? ORDER BY ordinal
+                """,
+                (root_id,),
+            )
+        ]
+        offsets: Dict[int, List[int]] = {}
+        for ordinal, row in enumerate(rows):
+            offsets.setdefault(row[0], [ordinal, 0])[1] += 1
+        stats = {
+            lemma_id: [first, count]
+            for lemma_id, first, count in conn.execute(
+                "SELECT lemma_id, first_ordinal, occurrences FROM quran_root_concordance_lemmas WHERE root_id = ?",
+                (root_id,),
+            )
+        }
+        if entries != rows or (occurrences, lemma_count) != (len(rows), len(offsets)) or stats != offsets:
+            problems.append(f"{ar_u_root}: differs")
+    problems.extend(f"{ar_u_root}: stale" for ar_u_root in stored)
+    (orphans,) = conn.execute(
+        """
+        SELECT COUNT(*) FROM quran_root_concordance_lemmas
+        WHERE root_id NOT IN (SELECT root_id FROM quran_root_concordance_roots)
+        """
+    ).fetchone()
+    if orphans:
+        problems.append(f"{orphans} lemma rows without a root")
+    return problems
+
+
+def mutate(conn: sqlite3.Connection, rng: random.Random) -> str:
+    """Change a handful of lemmas through the triggers; describe what changed."""
+    lemma_ids = [lemma_id for (lemma_id,) in conn.execute("SELECT lemma_id FROM quran_root_concordance_lemmas")]
+    tokens = [token for (token,) in conn.execute("SELECT ar_u_token FROM ar_u_tokens WHERE ar_u_root IS NOT NULL")]
+    roots = [root for (root,) in conn.execute("SELECT ar_u_root FROM ar_u_roots")]
+    deleted_from, inserted_into, edited = rng.sample(lemma_ids, 3)
+    moved, unrooted, renamed = rng.sample(tokens, 3)
+    with conn:
+        conn.execute(
+            "DELETE FROM quran_ayah_lemma_location WHERE lemma_id = ? AND id % 3 = 0", (deleted_from,)
+        )
+        conn.execute(
+            """
+            INSERT INTO quran_ayah_lemma_location (lemma_id, word_location, surah, ayah, token_index, word_simple)
+            SELECT ?, word_location || ':copy', surah, ayah, token_index, word_simple
+            FROM quran_ayah_lemma_location WHERE lemma_id = ? LIMIT 20
+            """,
+            (inserted_into, deleted_from),
+        )
+        conn.execute(
+            "UPDATE quran_ayah_lemma_location SET word_diacritic = word_simple WHERE lemma_id = ?", (edited,)
+        )
+        conn.execute("UPDATE ar_u_tokens SET ar_u_root = ? WHERE ar_u_token = ?", (rng.choice(roots), moved))
+        conn.execute("UPDATE ar_u_tokens SET ar_u_root = NULL WHERE ar_u_token = ?", (unrooted,))
+        # Its lemmas still point at the old id, so they drop out of the concordance.
+        conn.execute("UPDATE ar_u_tokens SET ar_u_token = ar_u_token || ':renamed' WHERE ar_u_token = ?", (renamed,))
+    (dirty,) = conn.execute("SELECT COUNT(*) FROM quran_root_concordance_dirty").fetchone()
+    return f"{dirty} dirty lemmas"
+
+
+def timed(action: Callable[[], object]) -> Tuple[object, float]:
+    started = time.perf_counter()
+    result = action()
+    return result, time.perf_counter() - started
+
+
+def time_pages(
+    conn: sqlite3.Connection,
+    label: str,
+    keys: Sequence[object],
+    sizes: Dict[object, int],
+    page: Callable[[object, int, int], List],
+    live_sql: str,
+    limit: int,
+) -> Tuple[List[str], int]:
+    concordance_seconds = live_seconds = 0.0
+    differences = 0
+    for key in keys:
+        offset = sizes[key] // 2
+        entries, seconds = timed(lambda: page(key, offset, limit))
+        concordance_seconds += seconds
+        live, seconds = timed(lambda: conn.execute(live_sql, (key, limit, offset)).fetchall())
+        live_seconds += seconds
+        differences += [
+            (e.lemma_id, e.surah, e.ayah, e.token_index, e.location_id, e.word_simple, e.word_diacritic) for e in entries
+        ] != [tuple(row) for row in live]
+    count = len(keys)
+    return [
+        f"{label} page from the middle, {count} samples:",
+        f"  {'concordance':<12} {concordance_seconds / count * 1000:>9.3f} ms",
+        f"  {'live join':<12} {live_seconds / count * 1000:>9.3f} ms",
+    ], differences
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark and check the root concordance on a copy of a D1 database.")
+    parser.add_argument("--db", type=Path, default=Path("database/d1.db"), help="Local D1 SQLite file (left untouched).")
+    parser.add_argument("--samples", type=int, default=100, help="Roots and lemmas paged through.")
+    parser.add_argument("--limit", type=int, default=50, help="Rows per page.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.db.exists():
+        raise SystemExit(f"Database not found: {args.db}")
+    rng = random.Random(args.seed)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        copy = Path(tmp_dir) / "concordance.db"
+        shutil.copyfile(args.db, copy)
+        conn = sqlite3.connect(copy)
+
+        counts, seconds = timed(lambda: refresh_concordance(conn, rewrite_all=True))
+        (occurrences,) = conn.execute("SELECT COALESCE(SUM(occurrences), 0) FROM quran_root_concordance_roots").fetchone()
+        print(f"Built {counts['new'] + counts['changed']} roots, {occurrences} occurrences in {seconds:.2f}s")
+        if not occurrences:
+            raise SystemExit("No locations resolve to a root; link ar_u_tokens to roots first.")
+        failures += [f"after build: {problem}" for problem in concordance_mismatches(conn)]
+
+        _, seconds = timed(lambda: refresh_concordance(conn))
+        print(f"Refresh with nothing dirty: {seconds * 1000:.1f} ms")
+        print(f"Mutated {mutate(conn, rng)}")
+        # Time the full rewrite on a second copy so the incremental refresh still sees the dirty lemmas.
+        rewrite_copy = Path(tmp_dir) / "rewrite.db"
+        shutil.copyfile(copy, rewrite_copy)
+        rewrite_conn = sqlite3.connect(rewrite_copy)
+        _, full_seconds = timed(lambda: refresh_concordance(rewrite_conn, rewrite_all=True))
+        rewrite_conn.close()
+        print(f"  full rewrite:        {full_seconds * 1000:>9.1f} ms")
+        counts, seconds = timed(lambda: refresh_concordance(conn))
+        print(f"  incremental refresh: {seconds * 1000:>9.1f} ms ({counts['changed']} roots changed, "
+              f"{counts['new']} new, {counts['deleted']} deleted, {counts['unchanged']} reread unchanged)")
+        failures += [f"after refresh: {problem}" for problem in concordance_mismatches(conn)]
+
+        root_sizes = dict(conn.execute("SELECT ar_u_root, occurrences FROM quran_root_concordance_roots"))
+        lemma_sizes = dict(conn.execute("SELECT lemma_id, occurrences FROM quran_root_concordance_lemmas"))
+        for label, sizes, page, live_sql in (
+            ("root", root_sizes, lambda key, offset, limit: root_page(conn, key, offset, limit), LIVE_ROOT_PAGE_SQL),
+            ("lemma", lemma_sizes, lambda key, offset, limit: lemma_page(conn, key, offset, limit), LIVE_LEMMA_PAGE_SQL),
+        ):
+            keys = rng.sample(sorted(sizes), min(args.samples, len(sizes)))
+            lines, differences = time_pages(conn, label, keys, sizes, page, live_sql, args.limit)
+            print("\n".join(lines))
+            if differences:
+                failures.append(f"{label} pages: {differences} differ from the live join")
+        conn.close()
+
+    if failures:
+        raise SystemExit("Concordance differs from the live join: " + "; ".join(failures[:20]))
+    print("Concordance matches the live join after the build and after the incremental refresh.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Benchmark the streaming phrases.json reader and the phrase interval lookups, and check both.
+
+Compares iter_phrases against json.load (peak memory, time, identical
+data), loads the phrases into a scratch SQLite file, then checks
+phrases_covering and phrases_by_word for every word of every ayah that has
+a phrase against a brute-force scan of the parsed JSON, and times a lookup
+both ways.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+from quran_phrases import COVERING_SQL, ensure_phrase_tables, phrases_by_word, phrases_covering, write_phrases
+from tarteel_phrases import iter_phrases, parse_ayah_key
+
+QURAN_META_DIR = Path("database/data/tarteel.ai/quran-meta")
+
+Ayah = Tuple[int, int]
+
+
+def measure(action: Callable[[], object]) -> Tuple[object, float, int]:
+    """Result, seconds and peak traced bytes of ``action``; timed on a separate, untraced call."""
+    started = time.perf_counter()
+    action()
+    seconds = time.perf_counter() - started
+    tracemalloc.start()
+    result = action()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def count_streamed(path: Path) -> int:
+    return sum(len(phrase.ranges) for phrase in iter_phrases(path))
+
+
+def count_loaded(path: Path) -> int:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return sum(len(pairs) for entry in data.values() for pairs in entry["ayah"].values())
+
+
+def brute_force_covering(data: Dict[str, dict], surah: int, ayah: int, word: int) -> Set[int]:
+    """What a request handler would do without the table: scan every phrase."""
+    key = f"{surah}:{ayah}"
+    return {
+        int(phrase_id)
+        for phrase_id, entry in data.items()
+        if any(word_from <= word <= word_to for word_from, word_to in entry["ayah"].get(key, ()))
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark and check the phrase reader and interval lookups.")
+    parser.add_argument("--phrases", type=Path, default=QURAN_META_DIR / "phrases.json", help="phrases.json export")
+    parser.add_argument("--queries", type=int, default=2000, help="Random (ayah, word) lookups to time.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.phrases.exists():
+        raise SystemExit(f"Phrases file not found: {args.phrases}")
+    rng = random.Random(args.seed)
+
+    print(f"{args.phrases.name} ({args.phrases.stat().st_size / 1024:.0f} KiB):")
+    for label, action in (("iter_phrases", count_streamed), ("json.load", count_loaded)):
+        ranges, seconds, peak = measure(lambda: action(args.phrases))
+        print(f"  {label:<13} {ranges} ranges  {seconds * 1000:>8.1f} ms  peak {peak / 1024:>8.0f} KiB")
+
+    data = json.loads(args.phrases.read_text(encoding="utf-8"))
+    streamed = {str(phrase.phrase_id): phrase for phrase in iter_phrases(args.phrases)}
+    failures: List[str] = []
+    if list(streamed) != list(data):
+        failures.append("streamed phrase ids differ from json.load")
+    for phrase_id, entry in data.items():
+        phrase = streamed.get(phrase_id)
+        expected = sorted((*parse_ayah_key(key), a, b) for key, pairs in entry["ayah"].items() for a, b in pairs)
+        if phrase is None or sorted(r[1:] for r in phrase.ranges) != expected:
+            failures.append(f"phrase {phrase_id}: ranges differ")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = sqlite3.connect(Path(tmp_dir) / "phrases.db")
+        ensure_phrase_tables(conn)
+        with conn:
+            write_phrases(conn, streamed.values())
+
+        words: Dict[Ayah, int] = {}
+        for entry in data.values():
+            for key, pairs in entry["ayah"].items():
+                ayah_key = parse_ayah_key(key)
+                words[ayah_key] = max(words.get(ayah_key, 0), *(word_to for _, word_to in pairs))
+        for (surah, ayah), last_word in words.items():
+            by_word = phrases_by_word(conn, surah, ayah)
+            for word in range(1, last_word + 2):
+                expected = brute_force_covering(data, surah, ayah, word)
+                covering = {hit.phrase_id for hit in phrases_covering(conn, surah, ayah, word)}
+                if covering != expected or set(by_word.get(word, ())) != expected:
+                    failures.append(f"{surah}:{ayah} word {word}")
+
+        samples = [
+            (surah, ayah, rng.randint(1, last + 1))
+            for (surah, ayah), last in rng.choices(list(words.items()), k=args.queries)
+        ]
+        timings = {
+            "phrases_covering": lambda: [phrases_covering(conn, *sample) for sample in samples],
+            "JSON scan": lambda: [brute_force_covering(data, *sample) for sample in samples],
+        }
+        print(f"Phrases covering one word, {len(samples)} lookups:")
+        for label, action in timings.items():
+            started = time.perf_counter()
+            action()
+            print(f"  {label:<17} {(time.perf_counter() - started) / len(samples) * 1e6:>9.1f} us/lookup")
+        plan = "; ".join(detail for *_, detail in conn.execute(f"EXPLAIN QUERY PLAN {COVERING_SQL}", samples[0]))
+        print(f"  plan: {plan}")
+        conn.close()
+
+    if failures:
+        raise SystemExit(f"{len(failures)} mismatches: " + "; ".join(failures[:20]))
+    print(f"Streamed phrases and every word lookup in {len(words)} ayahs match json.load.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Benchmark quran_search's FTS5 prefix search against the LIKE scans it replaces, and check the index.
+
+Works on a copy of --db. Builds the index and checks every FTS row against
+the folding view, then again after inserts, updates and deletes have gone
+through the triggers. Times a batch of word-column updates with and without
+the triggers, then times prefix searches against the '%term%' LIKE filters
+the API endpoints use today.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from quran_search import SOURCES, SearchSource, build_search_index, match_expression, search
+
+# The substring filters in functions/ar/quran/lemma-locations.ts, tokens.ts and roots.ts.
+LIKE_SQL: Dict[str, str] = {
+    "word": "SELECT id FROM quran_ayah_lemma_location WHERE word_simple LIKE ?1 OR word_diacritic LIKE ?1 LIMIT ?2",
+    "lemma": "SELECT rowid FROM ar_u_tokens WHERE lemma_ar LIKE ?1 OR lemma_norm LIKE ?1 LIMIT ?2",
+    "root": "SELECT rowid FROM ar_u_roots WHERE root LIKE ?1 OR search_keys_norm LIKE ?1 LIMIT ?2",
+}
+WORD_UPDATE_SQL = "UPDATE quran_ayah_lemma_location SET word_simple = word_diacritic WHERE id % 10 = 0"
+
+
+def index_mismatches(conn: sqlite3.Connection, source: SearchSource) -> int:
+    """FTS rows whose terms differ from the folding view's (whitespace aside), plus rows missing on either side."""
+    columns = ", ".join(source.columns)
+
+    def terms(sql: str) -> Dict[int, Tuple]:
+        return {doc_id: tuple((value or "").split() for value in values) for doc_id, *values in conn.execute(sql)}
+
+    indexed = terms(f"SELECT rowid, {columns} FROM {source.fts_table}")
+    expected = terms(f"SELECT doc_id, {columns} FROM {source.view}")
+    conn.execute(f"INSERT INTO {source.fts_table} ({source.fts_table}) VALUES ('integrity-check')")
+    return sum(indexed.get(doc_id) != row for doc_id, row in expected.items()) + len(indexed.keys() - expected.keys())
+
+
+def mutate(conn: sqlite3.Connection, source: SearchSource) -> None:
+    """Push updates and deletes (and, for words, inserts) through the triggers."""
+    column = source.columns[0]
+    with conn:
+        conn.execute(
+            f"UPDATE {source.table} SET {column} = (SELECT {column} FROM {source.table} ORDER BY random() LIMIT 1) "
+            f"WHERE {source.rowid} % 97 = 0"
+        )
+        conn.execute(f"DELETE FROM {source.table} WHERE {source.rowid} % 89 = 0")
+        if source.kind == "word":
+            conn.execute(
+                """
+                INSERT INTO quran_ayah_lemma_location
+                    (lemma_id, word_location, surah, ayah, token_index, word_simple, word_diacritic)
+                SELECT lemma_id, word_location || ':copy', surah, ayah, token_index, word_diacritic, word_simple
+                FROM quran_ayah_lemma_location
+                WHERE id % 101 = 0
+                """
+            )
+
+
+def time_word_update(conn: sqlite3.Connection) -> Tuple[int, float]:
+    conn.execute("SAVEPOINT bench")
+    started = time.perf_counter()
+    changed = conn.execute(WORD_UPDATE_SQL).rowcount
+    seconds = time.perf_counter() - started
+    conn.execute("ROLLBACK TO bench")
+    conn.execute("RELEASE bench")
+    return changed, seconds
+
+
+def sample_prefixes(conn: sqlite3.Connection, source: SearchSource, count: int, rng: random.Random) -> List[str]:
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.{source.fts_table}_vocab USING fts5vocab(main, {source.fts_table}, 'row')")
+    terms = [term for (term,) in conn.execute(f"SELECT term FROM temp.{source.fts_table}_vocab") if len(term) >= 2]
+    if not terms:
+        return []
+    return [term[: rng.randint(2, min(4, len(term)))] for term in (rng.choice(terms) for _ in range(count))]
+
+
+def time_searches(conn: sqlite3.Connection, source: SearchSource, prefixes: List[str], limit: int) -> List[str]:
+    fts_seconds = like_seconds = 0.0
+    fts_matches = like_matches = 0
+    for prefix in prefixes:
+        started = time.perf_counter()
+        search(conn, prefix, source.kind, limit)
+        fts_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        conn.execute(LIKE_SQL[source.kind], (f"%{prefix}%", limit)).fetchall()
+        like_seconds += time.perf_counter() - started
+        fts_matches += conn.execute(
+            f"SELECT COUNT(*) FROM {source.fts_table} WHERE {source.fts_table} MATCH ?", (match_expression(prefix),)
+        ).fetchone()[0]
+        like_matches += len(conn.execute(LIKE_SQL[source.kind], (f"%{prefix}%", -1)).fetchall())
+    count = len(prefixes)
+    return [
+        f"  {'fts prefix':<12} {fts_seconds / count * 1000:>9.3f} ms  {fts_matches / count:>9.1f} matches (ranked)",
+        f"  {'LIKE %term%':<12} {like_seconds / count * 1000:>9.3f} ms  {like_matches / count:>9.1f} matches",
+    ]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark and check the FTS5 search index on a copy of a D1 database.")
+    parser.add_argument("--db", type=Path, default=Path("database/d1.db"), help="Local D1 SQLite file (left untouched).")
+    parser.add_argument("--queries", type=int, default=200, help="Random prefixes per source.")
+    parser.add_argument("--limit", type=int, default=20, help="Rows fetched per search.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.db.exists():
+        raise SystemExit(f"Database not found: {args.db}")
+    rng = random.Random(args.seed)
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        copy = Path(tmp_dir) / "search.db"
+        shutil.copyfile(args.db, copy)
+        conn = sqlite3.connect(copy)
+        plain_update = time_word_update(conn)
+
+        started = time.perf_counter()
+        counts = build_search_index(conn)
+        print(f"Built index in {time.perf_counter() - started:.2f}s: {counts}")
+        indexed_update = time_word_update(conn)
+        for label, (changed, seconds) in (("without triggers", plain_update), ("with triggers", indexed_update)):
+            per_row = seconds / changed * 1e6 if changed else 0.0
+            print(f"Word-column UPDATE {label}: {changed} rows, {seconds:.3f}s ({per_row:.0f} us/row)")
+
+        sources = [source for source in SOURCES if source.kind in counts]
+        for source in sources:
+            for stage in ("build", "triggers"):
+                if stage == "triggers":
+                    mutate(conn, source)
+                mismatches = index_mismatches(conn, source)
+                if mismatches:
+                    failures.append(f"{source.kind} after {stage}: {mismatches} rows")
+
+        for source in sources:
+            prefixes = sample_prefixes(conn, source, args.queries, rng)
+            if not prefixes:
+                continue
+            print(f"{source.kind} ({source.table}, {counts[source.kind]} rows), {len(prefixes)} prefixes:")
+            for line in time_searches(conn, source, prefixes, args.limit):
+                print(line)
+        conn.close()
+
+    if failures:
+        raise SystemExit("FTS index differs from the folding view: " + "; ".join(failures))
+    print("FTS rows match the folding view after the build and after trigger maintenance.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Compare QuranWordIndex with the dict-of-tuples indexes it replaces: contents, memory and lookup speed."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Tuple
+
+from quran_tokens import load_quran_token_index
+from quran_word_index import QuranWordIndex
+from quran_words import WordKey, load_salam_word_map
+
+
+def measure(build: Callable[[], object]) -> Tuple[object, int, float]:
+    """Build an index and return it with the bytes it still holds and the build time."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = build()
+    seconds = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, current, seconds
+
+
+def probe_keys(keys: List[WordKey], count: int, seed: int = 0) -> List[WordKey]:
+    """Existing keys plus neighbours that miss, as resolve_token looks up token_index - 1 and token_index."""
+    rng = random.Random(seed)
+    probes = []
+    for _ in range(count):
+        surah, ayah, position = rng.choice(keys)
+        probes.append((surah, ayah, position))
+        probes.append((surah, ayah, position + rng.choice((1, 40))))
+    return probes
+
+
+def time_lookups(index: Mapping, probes: List[WordKey], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        for key in probes:
+            index.get(key)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def compare(name: str, build_dict: Callable[[], Dict], build_index: Callable[[], QuranWordIndex], args) -> bool:
+    reference, dict_bytes, dict_seconds = measure(build_dict)
+    index, index_bytes, index_seconds = measure(build_index)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        mapped = QuranWordIndex.open(index.save(Path(tmp_dir) / "words.qwidx"))
+        identical = dict(index.items()) == reference and dict(mapped.items()) == reference
+        probes = probe_keys(list(reference), args.lookups)
+        rows = [
+            ("dict", dict_bytes, dict_seconds, time_lookups(reference, probes, args.repeat)),
+            ("packed", index_bytes, index_seconds, time_lookups(index, probes, args.repeat)),
+            ("mmap", 0, 0.0, time_lookups(mapped, probes, args.repeat)),
+        ]
+        mapped.close()
+
+    print(f"{name}: {len(reference):,} words, {'identical' if identical else 'MISMATCH'}")
+    print(f"  {'variant':<8} {'heap MB':>8} {'B/word':>7} {'build s':>8} {'ns/lookup':>10}")
+    for variant, heap, build_seconds, lookup_seconds in rows:
+        per_word = heap / len(reference) if reference else 0.0
+        print(
+            f"  {variant:<8} {heap / 1e6:>8.2f} {per_word:>7.0f} {build_seconds:>8.3f} "
+            f"{lookup_seconds / len(probes) * 1e9:>10.0f}"
+        )
+    return identical
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark QuranWordIndex against dict-of-tuples indexes.")
+    parser.add_argument("--db", type=Path, help="SQLite database with ar_occ_token.")
+    parser.add_argument("--quran-words", type=Path, help="salamquran_quran_words.sql dump.")
+    parser.add_argument("--lookups", type=int, default=100000, help="Hit/miss lookup pairs per variant.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per lookup timing; the fastest is reported.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.db and not args.quran_words:
+        raise SystemExit("Pass --db, --quran-words or both.")
+    ok = True
+    if args.db:
+        if not args.db.exists():
+            raise SystemExit(f"Database not found: {args.db}")
+        conn = sqlite3.connect(args.db)
+        ok &= compare(
+            "ar_occ_token",
+            lambda: load_quran_token_index(conn),
+            lambda: QuranWordIndex.from_ar_occ_token(conn),
+            args,
+        )
+        conn.close()
+    if args.quran_words:
+        if not args.quran_words.exists():
+            raise SystemExit(f"Quran words dump missing: {args.quran_words}")
+        ok &= compare(
+            "salam",
+            lambda: load_salam_word_map(args.quran_words),
+            lambda: QuranWordIndex.from_salam_dump(args.quran_words),
+            args,
+        )
+    if not ok:
+        raise SystemExit("QuranWordIndex contents differ from the dict index.")
+
+
+if __name__ == "__main__":
+    main()
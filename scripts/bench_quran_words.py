@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Compare the legacy per-character Salam parser with quran_words.iter_salam_words."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from quran_words import (
+    WordKey,
+    WordValue,
+    _normalize_simple_spelling,
+    _normalize_value,
+    iter_salam_words,
+    open_salam_word_map,
+)
+
+
+def _legacy_parse_word_row(line: str) -> Optional[List[str]]:
+    """The original char-by-char row splitter, kept verbatim as the baseline."""
+    row = line.strip()
+    if not row or not row.startswith("("):
+        return None
+    row = row.rstrip(",;")
+    if row.startswith("("):
+        row = row[1:]
+    if row.endswith(")"):
+        row = row[:-1]
+
+    columns: List[str] = []
+    buffer: List[str] = []
+    in_quote = False
+    i = 0
+    while i < len(row):
+        ch = row[i]
+        if in_quote:
+            if ch == "\\" and i + 1 < len(row):
+                buffer.append(row[i + 1])
+                i += 2
+                continue
+            if ch == "'" and i + 1 < len(row) and row[i + 1] == "'":
+                buffer.append("'")
+                i += 2
+                continue
+            if ch == "'":
+                in_quote = False
+                i += 1
+                continue
+            buffer.append(ch)
+            i += 1
+            continue
+        if ch == "'":
+            in_quote = True
+            i += 1
+            continue
+        if ch == ",":
+            columns.append("".join(buffer).strip())
+            buffer = []
+            i += 1
+            continue
+        buffer.append(ch)
+        i += 1
+
+    if buffer:
+        columns.append("".join(buffer).strip())
+    return columns
+
+
+def legacy_load_salam_word_map(path: Path) -> Dict[WordKey, WordValue]:
+    mapping: Dict[WordKey, WordValue] = {}
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            columns = _legacy_parse_word_row(line)
+            if not columns or len(columns) < 7:
+                continue
+            try:
+                aya = int(columns[1])
+                surah = int(columns[2])
+                position = int(columns[3])
+            except ValueError:
+                continue
+            text = _normalize_value(columns[5])
+            simple = _normalize_simple_spelling(_normalize_value(columns[6]))
+            if text is None and simple is None:
+                continue
+            mapping[(surah, aya, position)] = (simple, text)
+    return mapping
+
+
+def _peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_variant(variant: str, path: Path) -> Dict[str, float]:
+    """Run one parser in the current process and return its measurements."""
+    baseline_rss = _peak_rss_kb()
+    started = time.perf_counter()
+    if variant == "legacy":
+        rows = len(legacy_load_salam_word_map(path))
+    elif variant == "map":
+        rows = len(dict(iter_salam_words(path)))
+    elif variant == "stream":
+        rows = sum(1 for _ in iter_salam_words(path))
+    elif variant == "cache":
+        # Measures a warm start: the parent builds the cache before timing.
+        with open_salam_word_map(path) as word_map:
+            rows = sum(1 for _ in word_map.items())
+    else:
+        raise ValueError(f"Unknown variant: {variant}")
+    elapsed = time.perf_counter() - started
+    return {
+        "variant": variant,
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "peak_rss_kb": _peak_rss_kb(),
+        "baseline_rss_kb": baseline_rss,
+    }
+
+
+def run_child(path: Path, variant: str) -> Dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, __file__, "--quran-words", str(path), "--variant", variant],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def check_identical(path: Path) -> bool:
+    return legacy_load_salam_word_map(path) == dict(iter_salam_words(path))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the Salam Quran words dump parsers.")
+    parser.add_argument(
+        "--quran-words",
+        type=Path,
+        default=Path("database/data/tarteel.ai/quran-meta/salamquran_quran_words.sql"),
+        help="Path to the Salam Quran words SQL dump.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the fastest run is reported.")
+    parser.add_argument("--variant", choices=["legacy", "map", "stream", "cache"], help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.quran_words.exists():
+        raise SystemExit(f"Quran words dump missing: {args.quran_words}")
+
+    if args.variant:
+        # Child mode: each variant runs in a fresh interpreter so peak RSS is not shared.
+        print(json.dumps(run_variant(args.variant, args.quran_words)))
+        return
+
+    # Build or validate the cache in a throwaway child before anything is timed.
+    run_child(args.quran_words, "cache")
+    print(f"{'variant':<8} {'rows':>8} {'rows/sec':>12} {'seconds':>9} {'peak RSS':>10}")
+    for variant in ("legacy", "map", "stream", "cache"):
+        runs = [run_child(args.quran_words, variant) for _ in range(max(1, args.repeat))]
+        best = min(runs, key=lambda run: run["seconds"])
+        peak_mb = (best["peak_rss_kb"] - best["baseline_rss_kb"]) / 1024
+        print(
+            f"{variant:<8} {best['rows']:>8} {best['rows_per_sec']:>12,.0f} "
+            f"{best['seconds']:>9.3f} {peak_mb:>8.1f}MB"
+        )
+
+    # Checked last: children inherit the parent's peak RSS, so the parent must stay small
+    # until every variant has been measured.
+    if not check_identical(args.quran_words):
+        raise SystemExit("Parsers disagree: iter_salam_words does not reproduce the legacy word map.")
+    print("Parsers produce identical word maps.")
+
+
+if __name__ == "__main__":
+    main()
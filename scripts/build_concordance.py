@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Create or refresh the root concordance (see quran_concordance.py) in a local D1 SQLite file."""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+
+from quran_concordance import refresh_concordance
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Materialize the root -> lemma -> occurrence concordance.")
+    parser.add_argument("--db", type=Path, default=Path("database/d1.db"), help="Local D1 SQLite file.")
+    parser.add_argument(
+        "--scan",
+        action="store_true",
+        help="Reread the whole join instead of only the roots of dirty lemmas, e.g. after edits made without the triggers.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rewrite every root, not only those whose occurrences changed since the last refresh.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.db.exists():
+        raise SystemExit(f"Database not found: {args.db}")
+    started = time.perf_counter()
+    conn = sqlite3.connect(args.db)
+    try:
+        counts = refresh_concordance(conn, rewrite_all=args.full, scan_all=args.scan)
+        occurrences, lemmas = conn.execute(
+            "SELECT COALESCE(SUM(occurrences), 0), COALESCE(SUM(lemmas), 0) FROM quran_root_concordance_roots"
+        ).fetchone()
+    except sqlite3.Error as exc:
+        raise SystemExit(f"{args.db}: {exc}") from exc
+    finally:
+        conn.close()
+    print(
+        f"Roots: {counts['new']} new, {counts['changed']} changed, {counts['unchanged']} unchanged, "
+        f"{counts['deleted']} deleted"
+    )
+    print(f"Concordance: {occurrences} occurrences of {lemmas} lemmas, refreshed in {time.perf_counter() - started:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Create or rebuild the FTS5 search index (see quran_search.py) in a local D1 SQLite file,
+or write the equivalent SQL for ``wrangler d1 execute``."""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+
+from quran_search import SOURCES_BY_KIND, build_search_index, render_search_index_sql
+
+SEARCH_INDEX_SQL = Path("database/migrations/create-search-fts.sql")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build the FTS5 word, lemma and root search index.")
+    parser.add_argument("--db", type=Path, default=Path("database/d1.db"), help="Local D1 SQLite file.")
+    parser.add_argument("--kinds", nargs="+", choices=sorted(SOURCES_BY_KIND), help="Sources to index (default: all).")
+    parser.add_argument("--rebuild", action="store_true", help="Drop and refill existing search tables.")
+    parser.add_argument(
+        "--write-sql",
+        type=Path,
+        nargs="?",
+        const=SEARCH_INDEX_SQL,
+        help=f"Write the DDL, triggers and fill as SQL instead (default path: {SEARCH_INDEX_SQL}).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.write_sql:
+        args.write_sql.write_text(render_search_index_sql(args.kinds), encoding="utf-8")
+        print(f"Wrote {args.write_sql}")
+        return
+    if not args.db.exists():
+        raise SystemExit(f"Database not found: {args.db}")
+    started = time.perf_counter()
+    conn = sqlite3.connect(args.db)
+    try:
+        counts = build_search_index(conn, args.kinds, rebuild=args.rebuild)
+    except sqlite3.Error as exc:
+        raise SystemExit(f"{args.db}: {exc}") from exc
+    finally:
+        conn.close()
+    if not counts:
+        raise SystemExit(f"None of the searchable tables exist in {args.db}.")
+    summary = ", ".join(f"{kind} {count}" for kind, count in counts.items())
+    print(f"Search index ready in {time.perf_counter() - started:.2f}s: {summary} rows.")
+
+
+if __name__ == "__main__":
+    main()
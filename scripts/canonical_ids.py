@@ -0,0 +1,68 @@
+"""Canonical inputs and SHA-256 ids for the ``ar_u_*`` and grammar tables.
+
+Python twin of ``canonicalize`` / ``universalId`` in
+functions/_utils/universal.ts: whitespace runs collapse to one space, the
+ends are trimmed, ASCII A-Z are lowercased (nothing else is), and the id is
+the hex SHA-256 of the UTF-8 canonical text. ``bench_canonical_ids.py``
+holds golden ids that must not change.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import string
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Below this many inputs a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 200_000
+
+UniversalId = Tuple[str, str]
+
+
+def canonicalize(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).translate(_ASCII_LOWER)
+
+
+def canonicalize_lower(value: Optional[str]) -> str:
+    """Variant with full Unicode ``str.lower()``, which the grammar PDF ids were built with."""
+    return " ".join((value or "").split()).lower()
+
+
+def sha256_id(canonical: str) -> str:
+    """Hex SHA-256 of text that is already canonical."""
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1 << 16)
+def universal_id(canonical_input: str, unicode_lower: bool = False) -> UniversalId:
+    """Return (id, canonical_input) for a raw ``KIND|part|...`` string."""
+    canonical = canonicalize_lower(canonical_input) if unicode_lower else canonicalize(canonical_input)
+    return sha256_id(canonical), canonical
+
+
+def canonical_id(kind: str, *parts: object, unicode_lower: bool = False) -> UniversalId:
+    """``universal_id`` of ``kind|part1|part2...``, e.g. ``canonical_id("ROOT", root_norm)``."""
+    return universal_id("|".join([kind, *map(str, parts)]), unicode_lower)
+
+
+def _universal_ids(inputs: List[str]) -> List[UniversalId]:
+    return [universal_id.__wrapped__(value) for value in inputs]
+
+
+def canonical_ids(
+    inputs: Iterable[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 20_000,
+    min_parallel: int = PARALLEL_THRESHOLD,
+) -> List[UniversalId]:
+    """(id, canonical_input) for every raw input, in order; large sets are hashed on a process pool."""
+    values = list(inputs)
+    if len(values) < min_parallel or workers == 1:
+        return _universal_ids(values)
+    chunks = [values[i : i + chunk_size] for i in range(0, len(values), chunk_size)]
+    with multiprocessing.Pool(workers) as pool:
+        return [item for chunk in pool.imap(_universal_ids, chunks) for item in chunk]
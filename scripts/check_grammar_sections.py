@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Check extract-grammar-pdf.py's indexed find_section_starts against the per-section scan it replaced.
+
+Builds a synthetic PDF whose page heads mix real section numbers with
+near-misses ("11.2", "1.23", "1.2.3", "x1.2"), runs both locators over
+random chapter ranges and section lists, and times them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+import fitz  # PyMuPDF
+
+SCRIPT = Path(__file__).with_name("extract-grammar-pdf.py")
+
+
+def load_extractor():
+    spec = importlib.util.spec_from_file_location("extract_grammar_pdf", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_find_section_starts(doc, chapter, sections, clean_lines):
+    """find_section_starts before the token index, kept verbatim apart from clean_lines being passed in."""
+    chapter_num = chapter["number"]
+    chapter_start = chapter["start_page"]
+    chapter_end = chapter["end_page"]
+    found = []
+    for section in sections:
+        if section["chapter_number"] != chapter_num:
+            continue
+        section_number = section["number"]
+        if not section_number:
+            continue
+        pattern = re.compile(rf"\b{re.escape(section_number)}\b")
+        start_page = None
+        for page_index in range(chapter_start - 1, chapter_end):
+            text = doc.load_page(page_index).get_text("text")
+            if not text:
+                continue
+            head = " ".join(clean_lines(text)[:8])
+            if pattern.search(head):
+                start_page = page_index + 1
+                break
+        if start_page:
+            found.append(
+                {
+                    "chapter_number": chapter_num,
+                    "number": section_number,
+                    "title": section["title"],
+                    "start_page": start_page,
+                }
+            )
+    return found
+
+
+def synthetic_page_lines(rng: random.Random, numbers: List[str]) -> List[str]:
+    lines = []
+    for _ in range(rng.randint(0, 12)):
+        number = rng.choice(numbers)
+        shape = rng.randrange(8)
+        if shape == 0:
+            lines.append(f"{number} Heading")
+        elif shape == 1:
+            lines.append(f"see {number}.{rng.randint(1, 9)} below")
+        elif shape == 2:
+            lines.append(f"{rng.randint(1, 9)}{number} and {number}{rng.randint(0, 9)}")
+        elif shape == 3:
+            lines.append(f"x{number} ({number})")
+        elif shape == 4:
+            lines.append(str(rng.randint(1, 400)))
+        else:
+            lines.append(f"Body text {rng.randint(0, 999)}")
+    return lines
+
+
+def build_pdf(path: Path, page_count: int, numbers: List[str], seed: int) -> None:
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for _ in range(page_count):
+        page = doc.new_page()
+        lines = synthetic_page_lines(rng, numbers)
+        if lines:
+            page.insert_text((72, 72), "\n".join(lines), fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare indexed and legacy grammar section locators.")
+    parser.add_argument("--pages", type=int, default=120, help="Pages in the synthetic PDF.")
+    parser.add_argument("--chapters", type=int, default=40, help="Random chapter ranges to compare.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    extractor = load_extractor()
+    rng = random.Random(args.seed)
+    numbers = [f"{chapter}.{section}" for chapter in range(1, 13) for section in range(1, 13)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = Path(tmp_dir) / "synthetic.pdf"
+        build_pdf(pdf_path, args.pages, numbers, args.seed)
+        doc = fitz.open(pdf_path)
+        pages = extractor.PageTexts.extract(pdf_path, workers=1)
+
+        legacy_seconds = indexed_seconds = 0.0
+        mismatches = 0
+        for number in range(1, args.chapters + 1):
+            start = rng.randint(1, args.pages)
+            chapter = {"number": number, "start_page": start, "end_page": rng.randint(start, args.pages)}
+            sections = [
+                {"chapter_number": number, "number": section_number, "title": f"Section {section_number}"}
+                for section_number in rng.sample(numbers, 20) + [None]
+            ]
+            sections.append({"chapter_number": number + 1, "number": "1.1", "title": "Other chapter"})
+
+            started = time.perf_counter()
+            expected = legacy_find_section_starts(doc, chapter, sections, extractor.clean_lines)
+            legacy_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            got = extractor.find_section_starts(pages, chapter, sections)
+            indexed_seconds += time.perf_counter() - started
+            if got != expected:
+                mismatches += 1
+                print(f"Chapter range {chapter['start_page']}-{chapter['end_page']} differs:")
+                print(f"  legacy:  {[(s['number'], s['start_page']) for s in expected]}")
+                print(f"  indexed: {[(s['number'], s['start_page']) for s in got]}")
+        doc.close()
+
+    if mismatches:
+        raise SystemExit(f"{mismatches} of {args.chapters} chapter ranges differ from the legacy locator.")
+    print(f"Identical section starts for {args.chapters} chapter ranges over {args.pages} pages.")
+    print(f"legacy scan {legacy_seconds:.3f}s, indexed {indexed_seconds:.3f}s (indexed reads pre-extracted text)")
+
+
+if __name__ == "__main__":
+    main()
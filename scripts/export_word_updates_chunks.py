@@ -1,23 +1,38 @@
 from __future__ import annotations
 
 import argparse
-import math
+import gzip
+import hashlib
+import json
 import sqlite3
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterator, Tuple, Union
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
 
+from word_updates_sql import (
+    D1_MAX_STATEMENT_BYTES,
+    DEFAULT_MAX_ROWS,
+    WordKey,
+    WordRow,
+    iter_changed_rows,
+    iter_update_batches,
+    iter_word_rows,
+    load_baseline,
+    write_row_manifest,
+)
 
-def _escape_sql_string(value: Union[str, None]) -> str:
-    if value is None:
-        return "NULL"
-    return "'" + value.replace("\\", "\\\\").replace("'", "''") + "'"
+T = TypeVar("T")
 
+CHUNK_MANIFEST_NAME = "manifest.json"
 
-def chunked_iterator(iterator: Iterator[str], chunk_size: int) -> Iterator[Tuple[int, list]]:
-    chunk: list[str] = []
+
+def chunked_iterator(iterator: Iterator[T], chunk_size: int) -> Iterator[Tuple[int, List[T]]]:
+    chunk: List[T] = []
     index = 1
-    for stmt in iterator:
-        chunk.append(stmt)
+    for item in iterator:
+        chunk.append(item)
         if len(chunk) >= chunk_size:
             yield index, chunk
             index += 1
@@ -26,28 +41,6 @@ def chunked_iterator(iterator: Iterator[str], chunk_size: int) -> Iterator[Tuple
         yield index, chunk
 
 
-def generate_updates(cursor: sqlite3.Cursor) -> Iterator[str]:
-    query = """
-        SELECT surah, ayah, token_index, word_simple, word_diacritic
-        FROM quran_ayah_lemma_location
-        WHERE word_simple IS NOT NULL OR word_diacritic IS NOT NULL
-        ORDER BY surah, ayah, token_index
-    """
-    for surah, ayah, token_index, word_simple, word_diacritic in cursor.execute(query):
-        yield (
-            "UPDATE quran_ayah_lemma_location\n"
-            "SET word_simple = %s, word_diacritic = %s\n"
-            "WHERE surah = %s AND ayah = %s AND token_index = %s;\n"
-            % (
-                _escape_sql_string(word_simple),
-                _escape_sql_string(word_diacritic),
-                surah,
-                ayah,
-                token_index,
-            )
-        )
-
-
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Export chunked surface-word SQL for remote D1.")
     parser.add_argument(
@@ -57,10 +50,24 @@ def parse_args() -> argparse.Namespace:
         help="Local D1 SQLite database containing the updated surface words.",
     )
     parser.add_argument(
+        "--max-statements",
         "--chunk-size",
+        dest="max_statements",
+        type=int,
+        default=50,
+        help="UPDATE statements per chunk file (each covers up to --max-rows locations).",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=D1_MAX_STATEMENT_BYTES,
+        help="Upper bound on the size of each UPDATE statement (D1 rejects statements over 100 KB).",
+    )
+    parser.add_argument(
+        "--max-rows",
         type=int,
-        default=500,
-        help="Number of UPDATE statements per chunk file.",
+        default=DEFAULT_MAX_ROWS,
+        help="Locations packed into each UPDATE ... FROM (VALUES ...) statement.",
     )
     parser.add_argument(
         "--out-dir",
@@ -68,6 +75,34 @@ def parse_args() -> argparse.Namespace:
         default=Path("word-updates-chunks"),
         help="Directory where chunk files will be written.",
     )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help=(
+            "Remote snapshot to diff against: a SQLite copy of the remote D1 or the row manifest "
+            "written by a previous export. Only rows whose words differ are exported."
+        ),
+    )
+    parser.add_argument(
+        "--row-manifest",
+        type=Path,
+        help=(
+            "Where this run's row hashes for the next --baseline end up (default: <out-dir>/word-rows.manifest.json). "
+            "They are written next to it with a .pending suffix and only moved into place by "
+            "apply_word_update_chunks.py once every chunk has been applied."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Threads writing (and compressing) chunk files concurrently.",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Write word-updates-NNN.sql.gz files; decompress them before `wrangler d1 execute --file`.",
+    )
     parser.add_argument(
         "--cleanup",
         action="store_true",
@@ -76,12 +111,78 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def write_chunk(out_dir: Path, chunk_index: int, chunk: list[str]) -> Path:
-    path = out_dir / f"word-updates-{chunk_index:03}.sql"
-    with path.open("w", encoding="utf-8") as fh:
-        for stmt in chunk:
-            fh.write(stmt)
-    return path
+def _format_key(row: WordRow) -> str:
+    return f"{row[0]}:{row[1]}:{row[2]}"
+
+
+class _HashingWriter:
+    """Binary file wrapper that counts and hashes every byte written through it."""
+
+    def __init__(self, fh: Any) -> None:
+        self.fh = fh
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.fh.write(data)
+
+    def flush(self) -> None:
+        self.fh.flush()
+
+
+def write_chunk(
+    out_dir: Path, chunk_index: int, chunk: List[Tuple[str, List[WordRow]]], compress: bool
+) -> Dict[str, Any]:
+    """Stream one chunk's statements to disk and describe the file for the chunk manifest."""
+    path = out_dir / f"word-updates-{chunk_index:03}.sql{'.gz' if compress else ''}"
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as raw:
+        hashed = _HashingWriter(raw)
+        # mtime=0 keeps the .gz bytes (and their sha256) reproducible across runs.
+        sink = gzip.GzipFile(filename="", mode="wb", fileobj=hashed, mtime=0) if compress else hashed
+        for stmt, _batch in chunk:
+            sink.write(stmt.encode("utf-8"))
+        if compress:
+            sink.close()
+    tmp_path.replace(path)
+    return {
+        "index": chunk_index,
+        "file": path.name,
+        "statements": len(chunk),
+        "rows": sum(len(batch) for _stmt, batch in chunk),
+        "bytes": hashed.size,
+        "first_key": _format_key(chunk[0][1][0]),
+        "last_key": _format_key(chunk[-1][1][-1]),
+        "sha256": hashed.sha256.hexdigest(),
+    }
+
+
+def pending_row_manifest(path: Path) -> Path:
+    return path.with_name(path.name + ".pending")
+
+
+def write_chunk_manifest(
+    path: Path, source: Path, chunks: List[Dict[str, Any]], row_manifest: Optional[Path] = None
+) -> None:
+    manifest = {
+        "source": str(source),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "total_chunks": len(chunks),
+        "total_statements": sum(chunk["statements"] for chunk in chunks),
+        "total_rows": sum(chunk["rows"] for chunk in chunks),
+        "chunks": chunks,
+    }
+    if row_manifest is not None:
+        # Promoted by apply_word_update_chunks.py once every chunk is journaled "done".
+        manifest["row_manifest"] = {
+            "pending": str(pending_row_manifest(row_manifest).resolve()),
+            "path": str(row_manifest.resolve()),
+        }
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    tmp_path.replace(path)
 
 
 def main() -> None:
@@ -90,29 +191,70 @@ def main() -> None:
         raise SystemExit(f"Local D1 missing: {args.target_db}")
     args.out_dir.mkdir(exist_ok=True, parents=True)
     if args.cleanup:
-        for existing in sorted(args.out_dir.glob("word-updates-*.sql")):
-            existing.unlink()
+        for pattern in ("word-updates-*.sql", "word-updates-*.sql.gz", CHUNK_MANIFEST_NAME):
+            for existing in sorted(args.out_dir.glob(pattern)):
+                existing.unlink()
+    row_manifest = args.row_manifest or args.out_dir / "word-rows.manifest.json"
+    try:
+        baseline = load_baseline(args.baseline) if args.baseline else {}
+    except (FileNotFoundError, ValueError) as exc:
+        raise SystemExit(str(exc))
     conn = sqlite3.connect(args.target_db)
-    cursor = conn.cursor()
-    updates = generate_updates(cursor)
-    written = 0
-    paths: list[Path] = []
-    for chunk_index, chunk in chunked_iterator(updates, args.chunk_size):
-        path = write_chunk(args.out_dir, chunk_index, chunk)
-        paths.append(path)
-        written += len(chunk)
-        print(f"Wrote chunk {chunk_index} ({len(chunk)} statements) to {path}")
+    current: Dict[WordKey, str] = {}
+    batches = iter_update_batches(
+        iter_changed_rows(iter_word_rows(conn), baseline, current), args.max_bytes, args.max_rows
+    )
+    chunks: List[Dict[str, Any]] = []
+
+    def record(future: Future) -> None:
+        entry = future.result()
+        chunks.append(entry)
+        print(
+            f"Wrote chunk {entry['index']} ({entry['statements']} statements, {entry['rows']} rows, "
+            f"{entry['first_key']}..{entry['last_key']}) to {args.out_dir / entry['file']}"
+        )
+
+    # The cursor is read on this thread; writers only get finished chunks. Capping the
+    # futures in flight keeps memory at a few chunks however large the export is.
+    workers = max(1, args.workers)
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk_index, chunk in chunked_iterator(batches, args.max_statements):
+            pending.append(pool.submit(write_chunk, args.out_dir, chunk_index, chunk, args.gzip))
+            if len(pending) >= workers * 2:
+                record(pending.popleft())
+        while pending:
+            record(pending.popleft())
     conn.close()
+    written = sum(chunk["statements"] for chunk in chunks)
+    rows = sum(chunk["rows"] for chunk in chunks)
+    paths = [chunk["file"] for chunk in chunks]
+    # The row manifest says what the remote holds, which is only true once every chunk is applied.
+    if chunks:
+        write_chunk_manifest(args.out_dir / CHUNK_MANIFEST_NAME, args.target_db, chunks, row_manifest)
+        write_row_manifest(pending_row_manifest(row_manifest), current, args.target_db)
+    else:
+        write_chunk_manifest(args.out_dir / CHUNK_MANIFEST_NAME, args.target_db, chunks)
+        write_row_manifest(row_manifest, current, args.target_db)
+    if args.baseline:
+        print(f"{rows} of {len(current)} rows differ from baseline {args.baseline}.")
+    if chunks:
+        print(
+            f"Wrote row manifest to {pending_row_manifest(row_manifest)}; applying every chunk moves it to "
+            f"{row_manifest} for the next --baseline."
+        )
+    else:
+        print(f"Wrote row manifest for the next --baseline to {row_manifest}.")
     total_chunks = len(paths)
     total_statements = written
     if total_statements == 0:
         print("No updates exported.")
         return
     print(
-        f"Exported {total_statements} statements across {total_chunks} chunk(s); "
-        f"chunks live under {args.out_dir}."
+        f"Exported {rows} rows as {total_statements} statements across {total_chunks} chunk(s); "
+        f"chunks live under {args.out_dir}; {CHUNK_MANIFEST_NAME} lists their sizes, key ranges and sha256."
     )
-    print("Execute the chunks sequentially with `wrangler d1 execute knowledgemap --file <chunk>.sql --remote`.")
+    print(f"Apply them with `python scripts/apply_word_update_chunks.py --chunk-dir {args.out_dir}` (resumable).")
 
 
 if __name__ == "__main__":
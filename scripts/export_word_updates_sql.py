@@ -3,35 +3,7 @@ from __future__ import annotations
 import argparse
 import sqlite3
 from pathlib import Path
-from typing import Iterator, Tuple, Union
-
-
-def _escape_sql_string(value: Union[str, None]) -> str:
-    if value is None:
-        return "NULL"
-    return "'" + value.replace("\\", "\\\\").replace("'", "''") + "'"
-
-
-def generate_updates(cursor: sqlite3.Cursor) -> Iterator[str]:
-    query = """
-        SELECT surah, ayah, token_index, word_simple, word_diacritic
-        FROM quran_ayah_lemma_location
-        WHERE word_simple IS NOT NULL OR word_diacritic IS NOT NULL
-        ORDER BY surah, ayah, token_index
-    """
-    for surah, ayah, token_index, word_simple, word_diacritic in cursor.execute(query):
-        yield (
-            "UPDATE quran_ayah_lemma_location\n"
-            "SET word_simple = %s, word_diacritic = %s\n"
-            "WHERE surah = %s AND ayah = %s AND token_index = %s;\n"
-            % (
-                _escape_sql_string(word_simple),
-                _escape_sql_string(word_diacritic),
-                surah,
-                ayah,
-                token_index,
-            )
-        )
+from word_updates_sql import D1_MAX_STATEMENT_BYTES, DEFAULT_MAX_ROWS, iter_update_batches, iter_word_rows
 
 
 def parse_args() -> argparse.Namespace:
@@ -48,6 +20,18 @@ def parse_args() -> argparse.Namespace:
         default=Path("word-updates.sql"),
         help="File path where the SQL script for the remote D1 will be written.",
     )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=D1_MAX_STATEMENT_BYTES,
+        help="Upper bound on the size of each UPDATE statement (D1 rejects statements over 100 KB).",
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        default=DEFAULT_MAX_ROWS,
+        help="Locations packed into each UPDATE ... FROM (VALUES ...) statement.",
+    )
     parser.add_argument(
         "--transaction",
         action="store_true",
@@ -61,16 +45,22 @@ def main() -> None:
     if not args.target_db.exists():
         raise SystemExit(f"Local D1 database missing: {args.target_db}")
     conn = sqlite3.connect(args.target_db)
-    cursor = conn.cursor()
+    statements = 0
+    rows = 0
     with args.out.open("w", encoding="utf-8") as out:
         if args.transaction:
             out.write("BEGIN TRANSACTION;\n")
-        for stmt in generate_updates(cursor):
+        for stmt, batch in iter_update_batches(iter_word_rows(conn), args.max_bytes, args.max_rows):
             out.write(stmt)
+            statements += 1
+            rows += len(batch)
         if args.transaction:
             out.write("COMMIT;\n")
     conn.close()
-    print(f"Wrote surface-word updates to {args.out} ({args.out.stat().st_size} bytes).")
+    print(
+        f"Wrote {rows} surface-word updates as {statements} statements to {args.out} "
+        f"({args.out.stat().st_size} bytes)."
+    )
 
 
 if __name__ == "__main__":
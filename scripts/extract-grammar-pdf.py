@@ -1,18 +1,88 @@
 import argparse
 import hashlib
 import json
+import multiprocessing
+import os
 import re
 from pathlib import Path
 
 import fitz  # PyMuPDF
 
+from canonical_ids import canonical_id
 
-def canonicalize(text: str) -> str:
-    return re.sub(r"\s+", " ", text or "").strip().lower()
 
+def grammar_id(kind: str, *parts) -> str:
+    # Grammar ids were first minted with a full Unicode lower(), not the ASCII-only one.
+    return canonical_id(kind, *parts, unicode_lower=True)[0]
 
-def sha256_hex(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+PAGE_CACHE_VERSION = 1
+PAGES_PER_TASK = 16
+
+_worker_doc = None
+
+
+def _open_worker_doc(pdf_path):
+    global _worker_doc
+    _worker_doc = fitz.open(pdf_path)
+
+
+def _extract_pages(page_range):
+    start, stop = page_range
+    return [_worker_doc.load_page(index).get_text("text") for index in range(start, stop)]
+
+
+class PageTexts:
+    """Text of every page, extracted once; all stages read pages from here instead of the PDF."""
+
+    def __init__(self, texts, toc):
+        self.texts = texts
+        self.toc = toc
+        self.page_count = len(texts)
+        self._lines = {}
+
+    def text(self, page_index):
+        return self.texts[page_index]
+
+    def lines(self, page_index):
+        lines = self._lines.get(page_index)
+        if lines is None:
+            lines = self._lines[page_index] = clean_lines(self.texts[page_index])
+        return lines
+
+    @classmethod
+    def extract(cls, pdf_path, workers):
+        with fitz.open(pdf_path) as doc:
+            page_count = doc.page_count
+            toc = doc.get_toc(simple=True)
+            if workers <= 1 or page_count <= PAGES_PER_TASK:
+                return cls([doc.load_page(index).get_text("text") for index in range(page_count)], toc)
+        ranges = [
+            (start, min(start + PAGES_PER_TASK, page_count)) for start in range(0, page_count, PAGES_PER_TASK)
+        ]
+        with multiprocessing.Pool(workers, initializer=_open_worker_doc, initargs=(str(pdf_path),)) as pool:
+            texts = [text for chunk in pool.imap(_extract_pages, ranges) for text in chunk]
+        return cls(texts, toc)
+
+    @classmethod
+    def load(cls, pdf_path, workers, cache_dir=None):
+        """Extract the PDF, or read a previous extraction from cache_dir keyed by the PDF's sha256."""
+        if cache_dir is None:
+            return cls.extract(pdf_path, workers)
+        with open(pdf_path, "rb") as fh:
+            pdf_sha = hashlib.file_digest(fh, "sha256").hexdigest()
+        cache_path = Path(cache_dir) / f"{pdf_sha}.pages.json"
+        if cache_path.exists():
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if cached.get("version") == PAGE_CACHE_VERSION:
+                return cls(cached["pages"], cached["toc"])
+        pages = cls.extract(pdf_path, workers)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        payload = {"version": PAGE_CACHE_VERSION, "sha256": pdf_sha, "toc": pages.toc, "pages": pages.texts}
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+        return pages
 
 
 def sql_escape(value):
@@ -34,11 +104,11 @@ def clean_lines(text: str):
     return cleaned
 
 
-def extract_toc_entries(doc, toc_page: int):
+def extract_toc_entries(pages, toc_page: int):
     lines = []
     started = False
-    for page_index in range(toc_page - 1, min(toc_page + 4, doc.page_count)):
-        text = doc.load_page(page_index).get_text("text")
+    for page_index in range(toc_page - 1, min(toc_page + 4, pages.page_count)):
+        text = pages.text(page_index)
         if not text:
             continue
         page_lines = [line.strip() for line in text.splitlines() if line.strip()]
@@ -99,14 +169,13 @@ def parse_toc_entries(entries):
     return chapters, sections
 
 
-def find_chapters(doc, start_page, end_page, toc_titles):
+def find_chapters(pages, start_page, end_page, toc_titles):
     chapters = []
     current = None
     for page_index in range(start_page - 1, end_page):
-        text = doc.load_page(page_index).get_text("text")
-        if not text:
+        if not pages.text(page_index):
             continue
-        lines = clean_lines(text)
+        lines = pages.lines(page_index)
         head = " ".join(lines[:12]).upper()
         if "CHAPTER" not in head:
             continue
@@ -137,10 +206,26 @@ def find_chapters(doc, start_page, end_page, toc_titles):
     return chapters
 
 
-def find_section_starts(doc, chapter, sections):
+# Every "N.M" in a line that \bN\.M\b would match; the lookahead also yields overlapping ones ("1.2.3").
+SECTION_TOKEN_RE = re.compile(r"(?=(?<!\w)(\d+\.\d+)(?!\w))")
+
+
+def index_section_tokens(pages, start_page, end_page, head_lines=8):
+    """Map each section-number token to the first (page, line) where it appears in a page head."""
+    positions = {}
+    for page_index in range(start_page - 1, end_page):
+        if not pages.text(page_index):
+            continue
+        for line_index, line in enumerate(pages.lines(page_index)[:head_lines]):
+            for token in SECTION_TOKEN_RE.findall(line):
+                positions.setdefault(token, (page_index + 1, line_index))
+    return positions
+
+
+def find_section_starts(pages, chapter, sections):
+    """Start page of each numbered section: the first page in the chapter whose head mentions its number."""
     chapter_num = chapter["number"]
-    chapter_start = chapter["start_page"]
-    chapter_end = chapter["end_page"]
+    positions = index_section_tokens(pages, chapter["start_page"], chapter["end_page"])
     found = []
     for section in sections:
         if section["chapter_number"] != chapter_num:
@@ -148,16 +233,7 @@ def find_section_starts(doc, chapter, sections):
         section_number = section["number"]
         if not section_number:
             continue
-        pattern = re.compile(rf"\b{re.escape(section_number)}\b")
-        start_page = None
-        for page_index in range(chapter_start - 1, chapter_end):
-            text = doc.load_page(page_index).get_text("text")
-            if not text:
-                continue
-            head = " ".join(clean_lines(text)[:8])
-            if pattern.search(head):
-                start_page = page_index + 1
-                break
+        start_page = positions.get(section_number, (None, None))[0]
         if start_page:
             found.append(
                 {
@@ -170,18 +246,16 @@ def find_section_starts(doc, chapter, sections):
     return found
 
 
-def extract_text_range(doc, start_page, end_page):
+def extract_text_range(pages, start_page, end_page):
     parts = []
     for page in range(start_page - 1, end_page):
-        text = doc.load_page(page).get_text("text")
-        if not text:
+        if not pages.text(page):
             continue
-        lines = clean_lines(text)
-        parts.append("\n".join(lines))
+        parts.append("\n".join(pages.lines(page)))
     return "\n".join(parts).strip()
 
 
-def build_units(doc, source_identifier):
+def build_units(pages, source_identifier):
     books = [
         {
             "key": "nahw_textbook",
@@ -216,7 +290,7 @@ def build_units(doc, source_identifier):
     for book in books:
         if not book["toc_page"]:
             continue
-        entries = extract_toc_entries(doc, book["toc_page"])
+        entries = extract_toc_entries(pages, book["toc_page"])
         chapters, sections = parse_toc_entries(entries)
         toc_titles[book["key"]] = {item["number"]: item["title"] for item in chapters}
         toc_sections[book["key"]] = sections
@@ -240,7 +314,7 @@ def build_units(doc, source_identifier):
         "sarf_textbook": start_pages["advanced_nahw"] - 1,
         "advanced_nahw": start_pages["advanced_structures"] - 1,
         "advanced_structures": start_pages["balagha"] - 1,
-        "balagha": doc.page_count,
+        "balagha": pages.page_count,
     }
 
     units = []
@@ -251,7 +325,7 @@ def build_units(doc, source_identifier):
         book_start = start_pages[book_key]
         book_end = end_pages[book_key]
 
-        book_unit_id = sha256_hex(canonicalize(f"GRAMUNIT|{book_key}|book"))
+        book_unit_id = grammar_id("GRAMUNIT", book_key, "book")
         units.append(
             {
                 "id": book_unit_id,
@@ -269,7 +343,7 @@ def build_units(doc, source_identifier):
 
         if book_key == "balagha":
             # use outline pages for balagha chapters
-            toc = doc.get_toc(simple=True)
+            toc = pages.toc
             balagha_chapters = []
             for level, title, page in toc:
                 if page and page >= balagha_start and title.lower().startswith("chapter"):
@@ -290,7 +364,7 @@ def build_units(doc, source_identifier):
                     if idx + 1 < len(balagha_chapters)
                     else book_end
                 )
-                chapter_id = sha256_hex(canonicalize(f"GRAMUNIT|{book_key}|chapter|{chapter['number']:02d}"))
+                chapter_id = grammar_id("GRAMUNIT", book_key, "chapter", f"{chapter['number']:02d}")
                 units.append(
                     {
                         "id": chapter_id,
@@ -305,9 +379,9 @@ def build_units(doc, source_identifier):
                         "meta": {"chapter_number": chapter["number"]},
                     }
                 )
-                content = extract_text_range(doc, chapter["start_page"], chapter_end)
+                content = extract_text_range(pages, chapter["start_page"], chapter_end)
                 if content:
-                    item_id = sha256_hex(canonicalize(f"GRAMITEM|{chapter_id}|1"))
+                    item_id = grammar_id("GRAMITEM", chapter_id, 1)
                     items.append(
                         {
                             "id": item_id,
@@ -323,7 +397,7 @@ def build_units(doc, source_identifier):
             continue
 
         # chapters for other books
-        chapters = find_chapters(doc, book_start, book_end, toc_titles.get(book_key, {}))
+        chapters = find_chapters(pages, book_start, book_end, toc_titles.get(book_key, {}))
         # set end pages
         for idx, chapter in enumerate(chapters):
             chapter_end = chapters[idx + 1]["start_page"] - 1 if idx + 1 < len(chapters) else book_end
@@ -332,9 +406,7 @@ def build_units(doc, source_identifier):
         sections_list = toc_sections.get(book_key, [])
 
         for chapter in chapters:
-            chapter_id = sha256_hex(
-                canonicalize(f"GRAMUNIT|{book_key}|chapter|{chapter['number']:02d}")
-            )
+            chapter_id = grammar_id("GRAMUNIT", book_key, "chapter", f"{chapter['number']:02d}")
             units.append(
                 {
                     "id": chapter_id,
@@ -350,7 +422,7 @@ def build_units(doc, source_identifier):
                 }
             )
 
-            section_starts = find_section_starts(doc, chapter, sections_list)
+            section_starts = find_section_starts(pages, chapter, sections_list)
             if section_starts:
                 # set end pages for sections
                 section_starts.sort(key=lambda s: s["start_page"])
@@ -360,11 +432,7 @@ def build_units(doc, source_identifier):
                         if idx + 1 < len(section_starts)
                         else chapter["end_page"]
                     )
-                    section_id = sha256_hex(
-                        canonicalize(
-                            f"GRAMUNIT|{book_key}|section|{section['number']}"
-                        )
-                    )
+                    section_id = grammar_id("GRAMUNIT", book_key, "section", section["number"])
                     units.append(
                         {
                             "id": section_id,
@@ -382,9 +450,9 @@ def build_units(doc, source_identifier):
                             },
                         }
                     )
-                    content = extract_text_range(doc, section["start_page"], section_end)
+                    content = extract_text_range(pages, section["start_page"], section_end)
                     if content:
-                        item_id = sha256_hex(canonicalize(f"GRAMITEM|{section_id}|1"))
+                        item_id = grammar_id("GRAMITEM", section_id, 1)
                         items.append(
                             {
                                 "id": item_id,
@@ -398,9 +466,9 @@ def build_units(doc, source_identifier):
                             }
                         )
             else:
-                content = extract_text_range(doc, chapter["start_page"], chapter["end_page"])
+                content = extract_text_range(pages, chapter["start_page"], chapter["end_page"])
                 if content:
-                    item_id = sha256_hex(canonicalize(f"GRAMITEM|{chapter_id}|1"))
+                    item_id = grammar_id("GRAMITEM", chapter_id, 1)
                     items.append(
                         {
                             "id": item_id,
@@ -454,14 +522,20 @@ def main():
     parser.add_argument("--out", default="/tmp/grammar_textbook_import.sql")
     parser.add_argument("--source-title", default="Dream Textbook")
     parser.add_argument("--source-identifier", default="dream_textbook_pdf")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Processes used to extract page text."
+    )
+    parser.add_argument(
+        "--page-cache-dir", help="Keep extracted page text here, keyed by the PDF's sha256, and reuse it."
+    )
     args = parser.parse_args()
 
     pdf_path = Path(args.pdf)
     if not pdf_path.exists():
         raise SystemExit(f"PDF not found: {pdf_path}")
 
-    doc = fitz.open(pdf_path)
-    units, items = build_units(doc, args.source_identifier)
+    pages = PageTexts.load(pdf_path, args.workers, args.page_cache_dir)
+    units, items = build_units(pages, args.source_identifier)
     sql = generate_sql(units, items, args.source_identifier, args.source_title)
     Path(args.out).write_text(sql, encoding="utf-8")
     print(f"Wrote {len(units)} units and {len(items)} items to {args.out}")
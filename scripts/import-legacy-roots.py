@@ -4,26 +4,37 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
-import re
 import sqlite3
 import sys
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Optional, Sequence, Union
 
-CANONICAL_PREFIX = "ROOT|"
-
-
-def canonicalize(value: str) -> str:
-    normalized = re.sub(r"\s+", " ", value or "").strip()
-    return re.sub(r"[A-Z]", lambda match: match.group(0).lower(), normalized)
+from ar_u_roots_upsert import upsert_roots
+from canonical_ids import universal_id
+from tarteel_roots import RootRow, load_tarteel_roots
 
-
-def sha256_hex(input_value: str) -> Tuple[str, str]:
-    canonical = canonicalize(input_value)
-    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
-    return digest, canonical
+CANONICAL_PREFIX = "ROOT|"
+ROOT_COLUMNS = (
+    "ar_u_root",
+    "canonical_input",
+    "root",
+    "arabic_trilateral",
+    "english_trilateral",
+    "root_latn",
+    "root_norm",
+    "alt_latn_json",
+    "search_keys_norm",
+    "status",
+    "difficulty",
+    "frequency",
+    "extracted_at",
+    "meta_json",
+    "created_at",
+    "updated_at",
+)
+# created_at keeps the value of the first import.
+UPDATE_COLUMNS = tuple(column for column in ROOT_COLUMNS if column not in ("ar_u_root", "created_at"))
 
 
 def normalize_text(value: Any) -> Optional[str]:
@@ -44,7 +55,7 @@ def parse_int(value: Optional[str]) -> Optional[int]:
         return None
 
 
-def build_meta(row: sqlite3.Row) -> Optional[str]:
+def build_meta(row: Union[sqlite3.Row, RootRow]) -> Optional[str]:
     meta: Dict[str, Any] = {}
     root_copy = normalize_text(row["c6"])
     if root_copy:
@@ -70,7 +81,7 @@ def build_meta(row: sqlite3.Row) -> Optional[str]:
     return json.dumps(meta, ensure_ascii=False) if meta else None
 
 
-def migrate(db_path: Path, dry_run: bool) -> None:
+def migrate(db_path: Path, dry_run: bool, roots_sql: Optional[Path] = None) -> None:
     if not db_path.exists():
         raise SystemExit(f"Database not found at {db_path}")
 
@@ -78,54 +89,24 @@ def migrate(db_path: Path, dry_run: bool) -> None:
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
-    if not cursor.execute(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='roots'"
-    ).fetchone():
-        raise SystemExit("Legacy roots table is missing; load database/data/roots/tarteel.ai/roots-only.sql first.")
-
-    rows = cursor.execute("SELECT * FROM roots").fetchall()
+    rows: Sequence[Union[sqlite3.Row, RootRow]]
+    if roots_sql is not None:
+        # Read the dump directly (via the parsed cache) instead of a staged legacy table.
+        rows = load_tarteel_roots(roots_sql, ordered=False)
+    else:
+        if not cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='roots'"
+        ).fetchone():
+            raise SystemExit(
+                "Legacy roots table is missing; load database/data/roots/tarteel.ai/roots-only.sql first "
+                "or pass --roots-sql."
+            )
+        rows = cursor.execute("SELECT * FROM roots").fetchall()
     if not rows:
         print("No legacy rows found in roots.")
         return
 
-    insert_sql = """
-    INSERT INTO ar_u_roots (
-      ar_u_root,
-      canonical_input,
-      root,
-      arabic_trilateral,
-      english_trilateral,
-      root_latn,
-      root_norm,
-      alt_latn_json,
-      search_keys_norm,
-      status,
-      difficulty,
-      frequency,
-      extracted_at,
-      meta_json,
-      created_at,
-      updated_at
-    )
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ON CONFLICT(ar_u_root) DO UPDATE SET
-      canonical_input = excluded.canonical_input,
-      root = excluded.root,
-      arabic_trilateral = excluded.arabic_trilateral,
-      english_trilateral = excluded.english_trilateral,
-      root_latn = excluded.root_latn,
-      root_norm = excluded.root_norm,
-      alt_latn_json = excluded.alt_latn_json,
-      search_keys_norm = excluded.search_keys_norm,
-      status = excluded.status,
-      difficulty = excluded.difficulty,
-      frequency = excluded.frequency,
-      extracted_at = excluded.extracted_at,
-      meta_json = excluded.meta_json,
-      updated_at = excluded.updated_at
-  """
-
-    migrated = 0
+    payloads = []
     for row in rows:
         root = normalize_text(row["c3"])
         if not root:
@@ -135,7 +116,7 @@ def migrate(db_path: Path, dry_run: bool) -> None:
             continue
 
         canonical_input = f"{CANONICAL_PREFIX}{root_norm}"
-        ar_u_root, canonical = sha256_hex(canonical_input)
+        ar_u_root, canonical = universal_id(canonical_input)
 
         payload = (
             ar_u_root,
@@ -158,20 +139,23 @@ def migrate(db_path: Path, dry_run: bool) -> None:
 
         if dry_run:
             print(f"Would migrate {root} ({root_norm}) → {ar_u_root}")
-        else:
-            cursor.execute(insert_sql, payload)
-        migrated += 1
+        payloads.append(payload)
 
     if dry_run:
-        print(f"Dry run: {migrated} rows would be touched.")
+        print(f"Dry run: {len(payloads)} rows would be touched.")
     else:
-        conn.commit()
-        print(f"Migrated {migrated} legacy rows into ar_u_roots.")
+        stats = upsert_roots(conn, ROOT_COLUMNS, payloads, UPDATE_COLUMNS)
+        print(f"Migrated {stats.total} legacy rows into ar_u_roots ({stats.summary()}).")
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Import tarteel.ai roots into ar_u_roots.")
     parser.add_argument("--db", type=Path, default=Path("database/d1.db"), help="Path to the SQLite database.")
+    parser.add_argument(
+        "--roots-sql",
+        type=Path,
+        help="Read rows straight from the tarteel.ai allroots.sql dump instead of the legacy roots table.",
+    )
     parser.add_argument("--dry-run", action="store_true", help="Show what would happen without modifying the database.")
     return parser.parse_args()
 
@@ -179,6 +163,8 @@ def parse_args() -> argparse.Namespace:
 if __name__ == "__main__":
     args = parse_args()
     try:
-        migrate(args.db, args.dry_run)
+        migrate(args.db, args.dry_run, args.roots_sql)
+    except FileNotFoundError as exc:
+        raise SystemExit(str(exc)) from exc
     except sqlite3.Error as exc:
         raise SystemExit(f"SQLite error: {exc}") from exc
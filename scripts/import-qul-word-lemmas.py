@@ -5,17 +5,17 @@ from __future__ import annotations
 
 import argparse
 import csv
-import hashlib
 import json
 import re
 import sqlite3
+import time
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
-
-DIACRITICS_RE = re.compile(
-    r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u08D3-\u08FF\u0591-\u05C7]+"
-)
+from arabic_normalize import normalize_arabic_batch, normalize_root_arabic
+from canonical_ids import sha256_id
+from import_manifest import ManifestDiff, ensure_manifest_tables, manifest_is_current, row_digest, source_fingerprint
+from import_progress import print_stage
 
 POS_KEYWORDS: Dict[str, List[str]] = {
     "verb": ["verb", "v", "فعل", "fi", "fiʿl"],
@@ -25,24 +25,7 @@ POS_KEYWORDS: Dict[str, List[str]] = {
     "phrase": ["phrase", "expression", "compound"],
 }
 
-
-def normalize_arabic(text: Optional[str]) -> str:
-    if not text:
-        return ""
-    normalized = text.strip()
-    normalized = DIACRITICS_RE.sub("", normalized)
-    normalized = " ".join(normalized.split())
-    normalized = normalized.replace("أ", "ا").replace("إ", "ا").replace("آ", "ا")
-    normalized = normalized.replace("ى", "ي").replace("ة", "ه")
-    return normalized
-
-
-def normalize_root_arabic(text: Optional[str]) -> str:
-    if not text:
-        return ""
-    cleaned = DIACRITICS_RE.sub("", text)
-    cleaned = "".join(cleaned.split())
-    return cleaned
+MANIFEST_SOURCE = "qul_word_lemmas"
 
 
 def canonical_pos(label: Optional[str]) -> Optional[str]:
@@ -82,11 +65,6 @@ def load_pos_mapping(path: Path) -> Dict[str, str]:
         return {row["word_location"]: row["pos"] for row in reader if row.get("pos")}
 
 
-def sha256_hex(value: str) -> str:
-    digest = hashlib.sha256(value.encode("utf-8")).hexdigest()
-    return digest
-
-
 def build_root_lookup(target_conn: sqlite3.Connection) -> Dict[str, str]:
     cursor = target_conn.execute("SELECT ar_u_root, root FROM ar_u_roots")
     lookup: Dict[str, str] = {}
@@ -97,6 +75,20 @@ def build_root_lookup(target_conn: sqlite3.Connection) -> Dict[str, str]:
     return lookup
 
 
+def live_token_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Tokens in this importer's manifest that still exist; ar_u_tokens is shared, so COUNT(*) would overcount."""
+    (tokens,) = conn.execute(
+        """
+        SELECT COUNT(*)
+        FROM import_manifest_rows AS manifest
+        JOIN ar_u_tokens AS token ON token.ar_u_token = substr(manifest.row_key, 7)
+        WHERE manifest.source = ? AND manifest.row_key LIKE 'token:%'
+        """,
+        (MANIFEST_SOURCE,),
+    ).fetchone()
+    return {"token": tokens}
+
+
 def choose_table(conn: sqlite3.Connection, candidates: List[str]) -> Optional[str]:
     cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
     available = {row[0] for row in cursor}
@@ -141,12 +133,38 @@ def load_lemmas(lemmas_db: Path) -> Tuple[Dict[int, sqlite3.Row], List[Tuple[int
     return lemmas, word_rows
 
 
+def prepare_lemmas(
+    lemmas: Dict[int, sqlite3.Row], word_locations: Iterable[Tuple[int, str]]
+) -> Dict[int, Tuple[str, str]]:
+    """Return (lemma_ar, lemma_norm) once per lemma id that has word locations."""
+    ordered_ids = dict.fromkeys(lemma_id for lemma_id, _location in word_locations)
+    lemma_ids = [lemma_id for lemma_id in ordered_ids if lemma_id in lemmas]
+    texts = [lemmas[lemma_id]["text"] or lemmas[lemma_id]["text_clean"] or "" for lemma_id in lemma_ids]
+    norms = normalize_arabic_batch(lemmas[lemma_id]["text_clean"] or text for lemma_id, text in zip(lemma_ids, texts))
+    return dict(zip(lemma_ids, zip(texts, norms)))
+
+
+def resolve_root(
+    root_info: Dict[str, Optional[str]], root_lookup: Dict[str, str]
+) -> Tuple[Optional[str], Optional[str]]:
+    normalized_root = normalize_root_arabic(root_info.get("arabic_trilateral"))
+    english = (root_info.get("english_trilateral") or "").replace(" ", "")
+    parts = [p for p in [english, normalized_root] if p]
+    return ("|".join(parts) if parts else None), root_lookup.get(normalized_root)
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Import QUL word lemma tokens.")
     parser.add_argument("--lemmas-db", type=Path, required=True, help="Path to the Word Lemma SQLite file")
     parser.add_argument("--roots-db", type=Path, required=True, help="Path to the Word Root SQLite file")
     parser.add_argument("--target-db", type=Path, default=Path("database/d1.db"), help="Target D1 database")
     parser.add_argument("--pos-file", type=Path, help="Optional word_location → POS mapping (CSV or JSON)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Tokens written per executemany call")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rewrite every token this importer owns even if the import manifest says nothing changed",
+    )
     parser.add_argument("--dry-run", action="store_true", help="Show what would be inserted without writing")
     return parser.parse_args()
 
@@ -161,18 +179,34 @@ def main() -> None:
     if not args.target_db.exists():
         raise SystemExit(f"Target database not found: {args.target_db}")
 
+    started = time.perf_counter()
+    target_conn = sqlite3.connect(args.target_db)
+    target_conn.row_factory = sqlite3.Row
+    ensure_manifest_tables(target_conn)
+    root_lookup = build_root_lookup(target_conn)
+    # ar_u_root ids come from the target DB, so its root table is part of the input too.
+    fingerprint = row_digest(
+        [
+            source_fingerprint([args.lemmas_db, args.roots_db, args.pos_file]),
+            row_digest(sorted(root_lookup.items())),
+        ]
+    )
+    live_counts = live_token_counts(target_conn)
+    if not args.full and manifest_is_current(target_conn, MANIFEST_SOURCE, fingerprint, live_counts):
+        target_conn.close()
+        print("QUL lemma and root inputs are unchanged since the last import; nothing to do (use --full to rewrite).")
+        return
+    diff = ManifestDiff(target_conn, MANIFEST_SOURCE, rewrite_all=args.full, live_counts=live_counts)
+
     pos_map = load_pos_mapping(args.pos_file) if args.pos_file else {}
 
     lemmas, word_locations = load_lemmas(args.lemmas_db)
     word_roots = load_word_roots(args.roots_db)
 
-    target_conn = sqlite3.connect(args.target_db)
-    target_conn.row_factory = sqlite3.Row
-    root_lookup = build_root_lookup(target_conn)
-
     existing: set[Tuple[str, str]] = set()
     for row in target_conn.execute("SELECT lemma_norm, pos FROM ar_u_tokens"):
         existing.add((row["lemma_norm"], row["pos"]))
+    load_seconds = time.perf_counter() - started
 
     insert_stmt = """
         INSERT INTO ar_u_tokens (
@@ -190,33 +224,52 @@ def main() -> None:
             meta_json = excluded.meta_json,
             updated_at = datetime('now')
     """
-    cursor = target_conn.cursor()
-
     stats = {
         "processed": 0,
         "inserted": 0,
+        "updated": 0,
+        "unchanged": 0,
         "duplicates": 0,
         "missing_root": 0,
         "missing_lemma": 0,
     }
 
+    # Normalization, POS and root resolution run once per distinct lemma, label
+    # and root; locations are still walked in source order so the first location
+    # of each (lemma_norm, pos) keeps supplying its root and meta, as before.
+    started = time.perf_counter()
+    prepared = prepare_lemmas(lemmas, word_locations)
+    pos_cache: Dict[Optional[str], str] = {}
+    root_cache: Dict[Tuple[Optional[str], Optional[str]], Tuple[Optional[str], Optional[str]]] = {}
+    handled: set[Tuple[str, str]] = set()
+    pending: List[Tuple] = []
+
     for lemma_id, location in word_locations:
         stats["processed"] += 1
-        lemma_row = lemmas.get(lemma_id)
-        if not lemma_row:
+        lemma = prepared.get(lemma_id)
+        if lemma is None:
             stats["missing_lemma"] += 1
             continue
-
-        lemma_text = lemma_row["text"] or lemma_row["text_clean"] or ""
-        lemma_norm = normalize_arabic(lemma_row["text_clean"] or lemma_text)
+        lemma_text, lemma_norm = lemma
         if not lemma_norm:
             continue
 
         pos_label = pos_map.get(location)
-        canonical_pos_value = canonical_pos(pos_label) or "noun"
-        canonical_input = f"{lemma_norm}|{canonical_pos_value}"
+        canonical_pos_value = pos_cache.get(pos_label)
+        if canonical_pos_value is None:
+            canonical_pos_value = pos_cache[pos_label] = canonical_pos(pos_label) or "noun"
         key = (lemma_norm, canonical_pos_value)
-        if key in existing:
+        if key in handled:
+            stats["duplicates"] += 1
+            continue
+        handled.add(key)
+
+        canonical_input = f"{lemma_norm}|{canonical_pos_value}"
+        canonical_hash = sha256_id(canonical_input)
+        token_key = f"token:{canonical_hash}"
+        # Tokens recorded in the manifest belong to this importer and are re-checked;
+        # any other existing token is left alone.
+        if key in existing and not diff.tracks(token_key):
             stats["duplicates"] += 1
             continue
 
@@ -224,12 +277,11 @@ def main() -> None:
         root_norm = None
         ar_u_root_id = None
         if root_info:
-            normalized_root = normalize_root_arabic(root_info.get("arabic_trilateral"))
-            ar_u_root_id = root_lookup.get(normalized_root)
-            english = (root_info.get("english_trilateral") or "").replace(" ", "")
-            parts = [p for p in [english, normalized_root] if p]
-            if parts:
-                root_norm = "|".join(parts)
+            root_key = (root_info.get("arabic_trilateral"), root_info.get("english_trilateral"))
+            resolved = root_cache.get(root_key)
+            if resolved is None:
+                resolved = root_cache[root_key] = resolve_root(root_info, root_lookup)
+            root_norm, ar_u_root_id = resolved
         else:
             stats["missing_root"] += 1
 
@@ -239,7 +291,6 @@ def main() -> None:
         if location:
             meta["word_location"] = location
 
-        canonical_hash = sha256_hex(canonical_input)
         params = (
             canonical_hash,
             canonical_input,
@@ -252,24 +303,45 @@ def main() -> None:
             json.dumps(meta, ensure_ascii=False),
         )
 
-        if args.dry_run:
-            print("DRY", params)
-        else:
-            cursor.execute(insert_stmt, params)
-        existing.add(key)
-        stats["inserted"] += 1
+        if not diff.check(token_key, row_digest(params)):
+            stats["unchanged"] += 1
+            continue
+        pending.append(params)
+        stats["updated" if diff.tracks(token_key) else "inserted"] += 1
+    prepare_seconds = time.perf_counter() - started
 
+    started = time.perf_counter()
+    if args.dry_run:
+        for params in pending:
+            print("DRY", params)
+    else:
+        # sqlite3 opens one implicit transaction for all chunks; it ends at commit().
+        for offset in range(0, len(pending), args.batch_size):
+            target_conn.executemany(insert_stmt, pending[offset : offset + args.batch_size])
+
+    # Tokens may still be referenced from ar_occ_token, so ones that vanished from
+    # the QUL data are only reported and dropped from the manifest, never deleted.
+    deleted_tokens = diff.deleted("token")
     if not args.dry_run:
+        diff.save(target_conn, fingerprint)
         target_conn.commit()
+    write_seconds = time.perf_counter() - started
 
     target_conn.close()
 
     print("QUL lemma import summary:")
     print(f"  processed   {stats['processed']}")
     print(f"  inserted    {stats['inserted']}")
+    print(f"  updated     {stats['updated']}")
+    print(f"  unchanged   {stats['unchanged']}")
+    print(f"  no longer in source {len(deleted_tokens)}")
     print(f"  duplicates  {stats['duplicates']}")
     print(f"  missing root {stats['missing_root']}")
     print(f"  missing lemma {stats['missing_lemma']}")
+    print("Stage timings:")
+    print_stage("load", len(word_locations), "locations", load_seconds)
+    print_stage("prepare", len(prepared), "lemmas", prepare_seconds)
+    print_stage("write", len(pending), "tokens", write_seconds)
 
     if args.dry_run:
         print("Dry run mode: no database changes were committed.")
@@ -4,11 +4,23 @@
 from __future__ import annotations
 
 import argparse
+import multiprocessing
 import sqlite3
+import time
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
-from quran_words import load_salam_word_map
+from import_manifest import ManifestDiff, ensure_manifest_tables, manifest_is_current, row_digest, source_fingerprint
+from import_progress import print_stage
+from quran_tokens import TokenKey, TokenRow, quran_token_digest, resolve_token
+from quran_word_index import QuranWordIndex
+from quran_words import open_salam_word_map
+
+MANIFEST_SOURCE = "qul_lemma_tables"
+
+# Per-process lookup state for resolve_chunk, set by init_resolver in each worker
+# (or once in-process when running with a single worker).
+_RESOLVER_STATE: Dict[str, object] = {}
 
 
 def parse_word_location(location: str) -> Optional[Tuple[int, int, int]]:
@@ -60,6 +72,8 @@ def ensure_tables(cursor: sqlite3.Cursor) -> None:
             token_index INTEGER NOT NULL,
             ar_token_occ_id TEXT,
             ar_u_token TEXT,
+            word_simple TEXT,
+            word_diacritic TEXT,
             created_at TEXT NOT NULL DEFAULT (datetime('now')),
             FOREIGN KEY (ar_token_occ_id) REFERENCES ar_occ_token(ar_token_occ_id),
             FOREIGN KEY (ar_u_token) REFERENCES ar_u_tokens(ar_u_token)
@@ -67,8 +81,13 @@ def ensure_tables(cursor: sqlite3.Cursor) -> None:
 
         CREATE UNIQUE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_unique
             ON quran_ayah_lemma_location (lemma_id, word_location);
-        CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_ref
-            ON quran_ayah_lemma_location (surah, ayah);
+        CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_position
+            ON quran_ayah_lemma_location (surah, ayah, token_index);
+        CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_word_simple
+            ON quran_ayah_lemma_location (word_simple, surah, ayah, token_index, word_location);
+        CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemma_location_missing_words
+            ON quran_ayah_lemma_location (id, surah, ayah, token_index)
+            WHERE word_simple IS NULL OR word_diacritic IS NULL;
         """
     )
 
@@ -83,24 +102,69 @@ def load_lemmas(lemmas_conn: sqlite3.Connection) -> Tuple[Dict[int, sqlite3.Row]
     return lemmas, word_rows
 
 
-def find_token(
-    cursor: sqlite3.Cursor,
-    surah: int,
-    ayah: int,
-    token_index: int,
-) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
-  unit_id = f"U:QURAN:{surah}:{ayah}"
-  pos_candidates = [token_index - 1, token_index]
-  for pos in pos_candidates:
-    if pos < 0:
-      continue
-    row = cursor.execute(
-      "SELECT ar_token_occ_id, ar_u_token, surface_ar, norm_ar FROM ar_occ_token WHERE unit_id = ? AND pos_index = ? LIMIT 1",
-      (unit_id, pos),
-    ).fetchone()
-    if row:
-      return row[0], row[1], row[2], row[3]
-  return None, None, None, None
+def live_row_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Rows per manifest kind in the tables this importer owns."""
+    (lemmas,) = conn.execute("SELECT COUNT(*) FROM quran_ayah_lemmas").fetchone()
+    (locations,) = conn.execute("SELECT COUNT(*) FROM quran_ayah_lemma_location").fetchone()
+    return {"lemma": lemmas, "loc": locations}
+
+
+def apply_primary_tokens(cursor: sqlite3.Cursor, primary_tokens: Dict[int, str]) -> None:
+    """Fill quran_ayah_lemmas.primary_ar_u_token where still NULL with one joined UPDATE."""
+    cursor.execute("DROP TABLE IF EXISTS temp.lemma_primary_stage")
+    cursor.execute("CREATE TEMP TABLE lemma_primary_stage (lemma_id INTEGER PRIMARY KEY, ar_u_token TEXT NOT NULL)")
+    cursor.executemany("INSERT INTO temp.lemma_primary_stage VALUES (?, ?)", primary_tokens.items())
+    cursor.execute(
+        """
+        UPDATE quran_ayah_lemmas AS lemma
+        SET primary_ar_u_token = stage.ar_u_token
+        FROM temp.lemma_primary_stage AS stage
+        WHERE stage.lemma_id = lemma.lemma_id AND lemma.primary_ar_u_token IS NULL
+        """
+    )
+
+
+def init_resolver(token_index_map: Mapping[TokenKey, TokenRow], quran_words: Path) -> None:
+    _RESOLVER_STATE["tokens"] = token_index_map
+    _RESOLVER_STATE["words"] = open_salam_word_map(quran_words)
+
+
+def resolve_chunk(chunk: List[Tuple[int, str]]) -> Tuple[List[Tuple], int]:
+    """Parse and resolve a chunk of (lemma_id, word_location) pairs into location rows.
+
+    Returns the rows in input order and the number of locations without a token.
+    """
+    token_index_map = _RESOLVER_STATE["tokens"]
+    word_map = _RESOLVER_STATE["words"]
+    rows: List[Tuple] = []
+    missing = 0
+    for lemma_id, location in chunk:
+        parsed = parse_word_location(location)
+        if not parsed:
+            continue
+        surah, ayah, token_index = parsed
+        token_occ_id, ar_u_token, surface_ar, norm_ar = resolve_token(token_index_map, surah, ayah, token_index)
+        if not token_occ_id and not ar_u_token:
+            missing += 1
+        word_simple, word_diacritic = word_map.get((surah, ayah, token_index), (None, None))
+        if word_simple is None:
+            word_simple = norm_ar or surface_ar
+        if word_diacritic is None:
+            word_diacritic = surface_ar
+        rows.append(
+            (
+                lemma_id,
+                location,
+                surah,
+                ayah,
+                token_index,
+                token_occ_id,
+                ar_u_token,
+                word_simple,
+                word_diacritic,
+            )
+        )
+    return rows, missing
 
 
 def group_locations(locations: Iterable[Tuple[int, str]]) -> Dict[int, List[str]]:
@@ -120,6 +184,23 @@ def parse_args() -> argparse.Namespace:
         default=Path("database/data/tarteel.ai/quran-meta/salamquran_quran_words.sql"),
         help="Path to the Salam Quran words SQL dump for actual word surface forms.",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5000,
+        help="Lemma locations resolved per work chunk and written per executemany call.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes that parse and resolve locations; a single writer applies their results in order.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-apply every lemma and location even if the import manifest says nothing changed.",
+    )
     parser.add_argument("--dry-run", action="store_true", help="Print actions without writing to target.")
     return parser.parse_args()
 
@@ -131,15 +212,33 @@ def main() -> None:
     if not args.target_db.exists():
         raise SystemExit(f"Target D1 DB missing: {args.target_db}")
 
+    started = time.perf_counter()
     lemmas_conn = sqlite3.connect(args.lemmas_db)
     target_conn = sqlite3.connect(args.target_db)
     target_cursor = target_conn.cursor()
     ensure_tables(target_cursor)
-    grouped_locations = group_locations(load_lemmas(lemmas_conn)[1])
-    lemmas_conn.row_factory = sqlite3.Row
-    total_locations = 0
-    missing_tokens = 0
-    word_map = load_salam_word_map(args.quran_words)
+    ensure_manifest_tables(target_conn)
+    # Token ids and the word fallback come from the target's ar_occ_token, so its rows count as input too.
+    fingerprint = row_digest([source_fingerprint([args.lemmas_db, args.quran_words]), quran_token_digest(target_conn)])
+    live_counts = live_row_counts(target_conn)
+    if not args.full and manifest_is_current(target_conn, MANIFEST_SOURCE, fingerprint, live_counts):
+        print("QUL lemmas, Salam dump and Quran tokens are unchanged since the last import; nothing to do (use --full to re-apply).")
+        lemmas_conn.close()
+        target_conn.close()
+        return
+    diff = ManifestDiff(target_conn, MANIFEST_SOURCE, rewrite_all=args.full, live_counts=live_counts)
+    lemmas, word_rows = load_lemmas(lemmas_conn)
+    grouped_locations = group_locations(word_rows)
+    work = [(lemma_id, location) for lemma_id in lemmas for location in grouped_locations.get(lemma_id, [])]
+    chunks = [work[i : i + args.batch_size] for i in range(0, len(work), args.batch_size)]
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    token_index_map = QuranWordIndex.from_ar_occ_token(target_conn)
+    # Build or validate the Salam cache once here so workers only ever map it read-only.
+    with open_salam_word_map(args.quran_words) as word_map:
+        len(word_map)
+    index_seconds = time.perf_counter() - started
 
     insert_lemma_sql = """
         INSERT INTO quran_ayah_lemmas (lemma_id, lemma_text, lemma_text_clean, words_count, uniq_words_count)
@@ -170,63 +269,92 @@ def main() -> None:
             word_diacritic = excluded.word_diacritic;
     """
 
-    for lemma_row in lemmas_conn.execute("SELECT id, text, text_clean, words_count, uniq_words_count FROM lemmas"):
-        lemma_id = lemma_row["id"]
-        target_cursor.execute(
-            insert_lemma_sql,
-            (
-                lemma_id,
-                lemma_row["text"],
-                lemma_row["text_clean"],
-                lemma_row["words_count"],
-                lemma_row["uniq_words_count"],
-            ),
+    write_started = time.perf_counter()
+    lemma_params = [
+        (
+            lemma_row["id"],
+            lemma_row["text"],
+            lemma_row["text_clean"],
+            lemma_row["words_count"],
+            lemma_row["uniq_words_count"],
         )
-        primary_set = False
-        for location in grouped_locations.get(lemma_id, []):
-            parsed = parse_word_location(location)
-            if not parsed:
-                continue
-            surah, ayah, token_index = parsed
-            token_occ_id, ar_u_token, surface_ar, norm_ar = find_token(
-                target_cursor, surah, ayah, token_index
-            )
-            if not token_occ_id and not ar_u_token:
-                missing_tokens += 1
-            else:
-                if not primary_set and ar_u_token:
-                    target_cursor.execute(
-                        "UPDATE quran_ayah_lemmas SET primary_ar_u_token = ? WHERE lemma_id = ? AND primary_ar_u_token IS NULL",
-                        (ar_u_token, lemma_id),
-                    )
-                    primary_set = True
-            word_simple, word_diacritic = word_map.get((surah, ayah, token_index), (None, None))
-            if word_simple is None:
-                word_simple = norm_ar or surface_ar
-            if word_diacritic is None:
-                word_diacritic = surface_ar
-            target_cursor.execute(
-                insert_location_sql,
-                (
-                    lemma_id,
-                    location,
-                    surah,
-                    ayah,
-                    token_index,
-                    token_occ_id,
-                    ar_u_token,
-                    word_simple,
-                    word_diacritic,
-                ),
-            )
-            total_locations += 1
+        for lemma_row in lemmas.values()
+    ]
+    target_cursor.executemany(
+        insert_lemma_sql,
+        [params for params in lemma_params if diff.check(f"lemma:{params[0]}", row_digest(params[1:]))],
+    )
+    write_seconds = time.perf_counter() - write_started
 
+    pool = None
+    if args.workers > 1:
+        pool = multiprocessing.Pool(args.workers, initializer=init_resolver, initargs=(token_index_map, args.quran_words))
+        results = pool.imap(resolve_chunk, chunks)
+    else:
+        init_resolver(token_index_map, args.quran_words)
+        results = map(resolve_chunk, chunks)
+
+    total_locations = 0
+    written_locations = 0
+    missing_tokens = 0
+    loop_write_seconds = 0.0
+    # First resolved ar_u_token per lemma, in location order; applied in one UPDATE at the end.
+    primary_tokens: Dict[int, str] = {}
+    # imap yields chunks in submission order, so the writer stays deterministic.
+    loop_started = time.perf_counter()
+    for rows, missing in results:
+        write_started = time.perf_counter()
+        missing_tokens += missing
+        total_locations += len(rows)
+        for row in rows:
+            if row[6]:
+                primary_tokens.setdefault(row[0], row[6])
+        changed_rows = [row for row in rows if diff.check(f"loc:{row[0]}:{row[1]}", row_digest(row[2:]))]
+        target_cursor.executemany(insert_location_sql, changed_rows)
+        written_locations += len(changed_rows)
+        loop_write_seconds += time.perf_counter() - write_started
+    # Wall time the writer spent waiting for resolved chunks; with workers, resolving overlaps the writes.
+    resolve_seconds = time.perf_counter() - loop_started - loop_write_seconds
+    write_seconds += loop_write_seconds
+    if pool is not None:
+        pool.close()
+        pool.join()
+    else:
+        _RESOLVER_STATE["words"].close()
+    write_started = time.perf_counter()
+    apply_primary_tokens(target_cursor, primary_tokens)
+    # Rows this importer wrote earlier that no longer exist in the QUL source.
+    target_cursor.executemany(
+        "DELETE FROM quran_ayah_lemma_location WHERE lemma_id = ? AND word_location = ?",
+        [key.split(":", 2)[1:] for key in diff.deleted("loc")],
+    )
+    target_cursor.executemany(
+        "DELETE FROM quran_ayah_lemmas WHERE lemma_id = ?",
+        [key.split(":", 1)[1:] for key in diff.deleted("lemma")],
+    )
+    diff.save(target_conn, fingerprint)
+
+    print(f"Lemmas:    {diff.summary('lemma')}")
+    print(f"Locations: {diff.summary('loc')}")
     if args.dry_run:
         target_conn.rollback()
-        print(f"[dry-run] would have added {total_locations} lemma locations, {missing_tokens} without tokens.")
+        print(
+            f"[dry-run] would have written {written_locations} of {total_locations} lemma locations, "
+            f"{missing_tokens} without tokens."
+        )
     else:
         target_conn.commit()
-        print(f"Imported {total_locations} lemma locations ({missing_tokens} without known tokens).")
+        print(
+            f"Imported {written_locations} of {total_locations} lemma locations "
+            f"({missing_tokens} without known tokens)."
+        )
+    write_seconds += time.perf_counter() - write_started
+
+    print(f"Stage throughput ({args.workers} worker{'s' if args.workers != 1 else ''}):")
+    print_stage("load", len(work), "locations", load_seconds)
+    print_stage("index", len(token_index_map), "tokens", index_seconds)
+    print_stage("resolve", len(work), "locations", resolve_seconds)
+    print_stage("write", total_locations, "rows", write_seconds)
 
     lemmas_conn.close()
     target_conn.close()
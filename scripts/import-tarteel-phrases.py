@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Import the tarteel.ai shared-phrase export into quran_phrases and quran_phrase_ranges.
+
+phrases.json is streamed one phrase at a time (see tarteel_phrases.py) and
+only phrases whose digest changed since the last run are rewritten.
+phrase_verses.json, the same data keyed by ayah, is streamed afterwards to
+check every ayah's phrase list against the imported ranges.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from import_manifest import ManifestDiff, ensure_manifest_tables, manifest_is_current, row_digest, source_fingerprint
+from quran_phrases import delete_phrases, ensure_phrase_tables, write_phrases
+from tarteel_phrases import Phrase, iter_phrase_verses, iter_phrases
+
+MANIFEST_SOURCE = "tarteel_phrases"
+QURAN_META_DIR = Path("database/data/tarteel.ai/quran-meta")
+
+
+def changed_phrases(path: Path, diff: ManifestDiff, stats: dict) -> Iterator[Phrase]:
+    for phrase in iter_phrases(path):
+        stats["phrases"] += 1
+        stats["ranges"] += len(phrase.ranges)
+        if diff.check(f"phrase:{phrase.phrase_id}", row_digest(phrase)):
+            yield phrase
+
+
+def live_phrase_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Imported phrases that still have their ranges; every phrase in the export has at least one."""
+    (phrases,) = conn.execute(
+        """
+        SELECT COUNT(*) FROM quran_phrases AS phrase
+        WHERE EXISTS (SELECT 1 FROM quran_phrase_ranges AS r WHERE r.phrase_id = phrase.phrase_id)
+        """
+    ).fetchone()
+    return {"phrase": phrases}
+
+
+def verse_mismatches(conn: sqlite3.Connection, path: Path) -> Tuple[int, List[str]]:
+    """Ayahs checked, and those whose phrase_verses.json ids differ from the imported ranges."""
+    checked = present = 0
+    mismatches: List[str] = []
+    for surah, ayah, phrase_ids in iter_phrase_verses(path):
+        checked += 1
+        imported = {
+            phrase_id
+            for (phrase_id,) in conn.execute(
+                "SELECT phrase_id FROM quran_phrase_ranges WHERE surah = ? AND ayah = ?", (surah, ayah)
+            )
+        }
+        present += bool(imported)
+        if imported != set(phrase_ids):
+            mismatches.append(f"{surah}:{ayah}")
+    (ayahs,) = conn.execute("SELECT COUNT(*) FROM (SELECT DISTINCT surah, ayah FROM quran_phrase_ranges)").fetchone()
+    if ayahs > present:
+        mismatches.append(f"{ayahs - present} imported ayahs missing from {path.name}")
+    return checked, mismatches
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import tarteel.ai phrases.json into the shared-phrase tables.")
+    parser.add_argument("--phrases", type=Path, default=QURAN_META_DIR / "phrases.json", help="phrases.json export")
+    parser.add_argument(
+        "--phrase-verses", type=Path, default=QURAN_META_DIR / "phrase_verses.json", help="phrase_verses.json export"
+    )
+    parser.add_argument("--target-db", type=Path, default=Path("database/d1.db"), help="Target D1 database")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rewrite every phrase even if the import manifest says nothing changed",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    for label, path in (("Phrases file", args.phrases), ("Phrase verses file", args.phrase_verses), ("Target database", args.target_db)):
+        if not path.exists():
+            raise SystemExit(f"{label} not found: {path}")
+
+    started = time.perf_counter()
+    conn = sqlite3.connect(args.target_db)
+    ensure_manifest_tables(conn)
+    ensure_phrase_tables(conn)
+    fingerprint = source_fingerprint([args.phrases, args.phrase_verses])
+    live_counts = live_phrase_counts(conn)
+    if not args.full and manifest_is_current(conn, MANIFEST_SOURCE, fingerprint, live_counts):
+        conn.close()
+        print("Phrase exports are unchanged since the last import; nothing to do (use --full to rewrite).")
+        return
+    diff = ManifestDiff(conn, MANIFEST_SOURCE, rewrite_all=args.full, live_counts=live_counts)
+
+    stats = {"phrases": 0, "ranges": 0}
+    try:
+        pending = changed_phrases(args.phrases, diff, stats)
+        if args.dry_run:
+            written = sum(len(phrase.ranges) for phrase in pending)
+        else:
+            written = write_phrases(conn, pending)
+        deleted = [int(key.split(":", 1)[1]) for key in diff.deleted("phrase")]
+        checked, mismatches = 0, []
+        if not args.dry_run:
+            delete_phrases(conn, deleted)
+            checked, mismatches = verse_mismatches(conn, args.phrase_verses)
+            diff.save(conn, fingerprint)
+            conn.commit()
+    except (ValueError, sqlite3.Error) as exc:
+        conn.rollback()
+        raise SystemExit(f"Phrase import failed: {exc}") from exc
+    finally:
+        conn.close()
+
+    print("Tarteel phrase import summary:")
+    print(f"  phrases   {stats['phrases']} ({diff.summary('phrase')})")
+    print(f"  ranges    {stats['ranges']} read, {written} written")
+    if args.dry_run:
+        print("Dry run mode: no database changes were committed.")
+    else:
+        print(f"  verses    {checked} ayahs checked against {args.phrase_verses.name}, {len(mismatches)} mismatched")
+        if mismatches:
+            print(f"  mismatched: {', '.join(mismatches[:20])}{' ...' if len(mismatches) > 20 else ''}")
+    print(f"Done in {time.perf_counter() - started:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
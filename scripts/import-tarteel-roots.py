@@ -4,41 +4,22 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
 import re
 import sqlite3
 from pathlib import Path
 from typing import Any
 
+from ar_u_roots_upsert import upsert_roots
+from canonical_ids import universal_id
+from tarteel_roots import RootRow, load_tarteel_roots
 
-INSERT_TEMPLATE = '''
-INSERT INTO ar_u_roots (
-  ar_u_root, canonical_input, root, root_norm,
-  arabic_trilateral, english_trilateral, root_latn, alt_latn_json,
-  search_keys_norm, cards_json, status, difficulty, frequency,
-  created_at, updated_at, extracted_at, meta_json
- ) VALUES (
-  ?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?
- )
-ON CONFLICT(ar_u_root) DO UPDATE SET
-  canonical_input = excluded.canonical_input,
-  root = excluded.root,
-  root_norm = excluded.root_norm,
-  arabic_trilateral = excluded.arabic_trilateral,
-  english_trilateral = excluded.english_trilateral,
-  root_latn = excluded.root_latn,
-  alt_latn_json = excluded.alt_latn_json,
-  search_keys_norm = excluded.search_keys_norm,
-  cards_json = excluded.cards_json,
-  status = excluded.status,
-  difficulty = excluded.difficulty,
-  frequency = excluded.frequency,
-  created_at = excluded.created_at,
-  updated_at = excluded.updated_at,
-  extracted_at = excluded.extracted_at,
-  meta_json = excluded.meta_json;
-'''
+ROOT_COLUMNS = (
+    "ar_u_root", "canonical_input", "root", "root_norm",
+    "arabic_trilateral", "english_trilateral", "root_latn", "alt_latn_json",
+    "search_keys_norm", "cards_json", "status", "difficulty", "frequency",
+    "created_at", "updated_at", "extracted_at", "meta_json",
+)
 
 
 def normalize_text(value: Any) -> str | None:
@@ -70,17 +51,6 @@ def parse_json_value(value: Any) -> Any | None:
         return norm
 
 
-def canonicalize(value: str) -> str:
-    normalized = re.sub(r"\s+", " ", value or "").strip()
-    return re.sub(r"[A-Z]", lambda match: match.group(0).lower(), normalized)
-
-
-def sha256_hex(input_value: str) -> tuple[str, str]:
-    canonical = canonicalize(input_value)
-    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
-    return digest, canonical
-
-
 def extract_first_string(value: Any) -> str | None:
     parsed = parse_json_value(value)
     if isinstance(parsed, list):
@@ -110,7 +80,7 @@ def collect_search_keys(values: list[tuple[Any, bool]]) -> str | None:
     return " ".join(tokens) if tokens else None
 
 
-def build_meta(row: sqlite3.Row) -> dict[str, Any] | None:
+def build_meta(row: RootRow) -> dict[str, Any] | None:
     meta: dict[str, Any] = {}
     root_copy = normalize_text(row["c6"])
     if root_copy:
@@ -138,17 +108,6 @@ def build_meta(row: sqlite3.Row) -> dict[str, Any] | None:
     return meta or None
 
 
-def load_roots(allroots: Path) -> list[sqlite3.Row]:
-    text = allroots.read_text()
-    inserts = [line for line in text.splitlines() if line.strip().startswith("INSERT INTO roots")]
-    script = "CREATE TABLE roots (" + ", ".join(f"c{i} TEXT" for i in range(1, 22)) + ");\n"
-    script += "\n".join(inserts)
-    conn = sqlite3.connect(":memory:")
-    conn.row_factory = sqlite3.Row
-    conn.executescript(script)
-    return sorted(conn.execute("SELECT * FROM roots"), key=lambda r: int(r["c1"] or 0))
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(description="Sync ar_u_roots with tarteel.ai roots export.")
     parser.add_argument(
@@ -170,25 +129,24 @@ def main() -> None:
     if not args.db.exists():
         raise SystemExit(f"Target database not found: {args.db}")
 
-    rows = load_roots(args.roots_sql)
+    rows = load_tarteel_roots(args.roots_sql)
     conn = sqlite3.connect(args.db)
     seen_canonical: set[str] = set()
     seen_root_norm: set[str] = set()
 
-    cursor = conn.cursor()
-    updated = 0
+    payloads: list[tuple] = []
     for row in rows:
         base_root_norm = normalize_text(row["c17"]) or normalize_text(row["c5"]) or ""
         root_norm_val = base_root_norm
         base_template = f"ROOT|{root_norm_val}"
-        ar_u_root, canonical_input = sha256_hex(base_template)
+        ar_u_root, canonical_input = universal_id(base_template)
 
         if canonical_input in seen_canonical or (root_norm_val and root_norm_val in seen_root_norm):
             row_id = normalize_text(row["c1"]) or str(row["c1"] or "")
             suffix = f"|{row_id}" if row_id else f"|r{len(seen_root_norm) + 1}"
             fallback_root_norm = f"{root_norm_val}{suffix}" if root_norm_val else suffix.lstrip("|")
             fallback_template = f"ROOT|{fallback_root_norm}"
-            ar_u_root, canonical_input = sha256_hex(fallback_template)
+            ar_u_root, canonical_input = universal_id(fallback_template)
             root_norm_val = fallback_root_norm
 
         seen_canonical.add(canonical_input)
@@ -224,12 +182,11 @@ def main() -> None:
             normalize_text(row["c16"]),
             meta_json,
         )
-        cursor.execute(INSERT_TEMPLATE, values)
-        updated += 1
+        payloads.append(values)
 
-    conn.commit()
+    stats = upsert_roots(conn, ROOT_COLUMNS, payloads)
     conn.close()
-    print(f"Synchronized {updated} root rows into {args.db}")
+    print(f"Synchronized {stats.total} root rows into {args.db} ({stats.summary()})")
 
 
 if __name__ == "__main__":
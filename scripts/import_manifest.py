@@ -0,0 +1,171 @@
+"""Per-source import manifests stored next to the imported data.
+
+Each importer records a fingerprint of its input files plus one digest per
+row it wrote. A re-run with identical inputs can stop after hashing the
+files; otherwise only rows whose digest is new or different are written and
+rows that disappeared from the source are reported as deleted.
+
+The digests only describe what the importer wrote, not what the target
+still holds: a schema reset, a reseed or another script can empty or edit
+the tables behind the manifest's back. Importers therefore pass the live
+row count of each kind they track; a kind whose count no longer matches
+the manifest is rewritten in full and never lets a run stop early.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+MANIFEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS import_manifest_sources (
+    source TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS import_manifest_rows (
+    source TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (source, row_key)
+) WITHOUT ROWID;
+"""
+
+
+def ensure_manifest_tables(conn: sqlite3.Connection) -> None:
+    conn.executescript(MANIFEST_SCHEMA)
+
+
+def file_sha256(path: Path) -> str:
+    with path.open("rb") as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
+def source_fingerprint(paths: Iterable[Optional[Path]]) -> str:
+    """Combine the names and sha256 of every input file into one fingerprint."""
+    parts = [f"{path.name}:{file_sha256(path)}" for path in paths if path is not None]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def row_digest(values: Sequence) -> str:
+    payload = json.dumps(list(values), ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def stored_fingerprint(conn: sqlite3.Connection, source: str) -> Optional[str]:
+    row = conn.execute("SELECT fingerprint FROM import_manifest_sources WHERE source = ?", (source,)).fetchone()
+    return row[0] if row else None
+
+
+def stored_row_counts(conn: sqlite3.Connection, source: str) -> Dict[str, int]:
+    """Rows recorded for ``source`` per kind (the part of the row key before the first colon)."""
+    return dict(
+        conn.execute(
+            """
+            SELECT substr(row_key, 1, instr(row_key, ':') - 1), COUNT(*)
+            FROM import_manifest_rows
+            WHERE source = ?
+            GROUP BY 1
+            """,
+            (source,),
+        )
+    )
+
+
+def stale_kinds(conn: sqlite3.Connection, source: str, live_counts: Mapping[str, int]) -> Set[str]:
+    """Kinds whose live row count differs from the number of rows the manifest recorded."""
+    stored = stored_row_counts(conn, source)
+    return {kind for kind, count in live_counts.items() if stored.get(kind, 0) != count}
+
+
+def manifest_is_current(
+    conn: sqlite3.Connection, source: str, fingerprint: str, live_counts: Mapping[str, int]
+) -> bool:
+    """True when the inputs are unchanged and every tracked table still holds as many rows as were imported."""
+    return stored_fingerprint(conn, source) == fingerprint and not stale_kinds(conn, source, live_counts)
+
+
+class ManifestDiff:
+    """Classify the rows of one import run against the digests stored for its source.
+
+    Row keys are ``"<kind>:<id>"`` strings so one source can track several
+    tables (e.g. ``lemma:12`` and ``loc:12:2:255:3``) and report them apart.
+    Kinds named in ``live_counts`` whose count differs from the manifest are
+    ``stale``: their unchanged rows are rewritten as with ``rewrite_all``.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        source: str,
+        rewrite_all: bool = False,
+        live_counts: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        self.source = source
+        self.rewrite_all = rewrite_all
+        self.stale = stale_kinds(conn, source, live_counts or {})
+        self.stored: Dict[str, str] = dict(
+            conn.execute("SELECT row_key, digest FROM import_manifest_rows WHERE source = ?", (source,))
+        )
+        self.seen: Dict[str, str] = {}
+        self.counts: Dict[str, Counter] = {}
+
+    def tracks(self, key: str) -> bool:
+        return key in self.stored
+
+    def check(self, key: str, digest: str) -> bool:
+        """Record a row and return True when it has to be written."""
+        self.seen[key] = digest
+        kind = key.split(":", 1)[0]
+        counts = self.counts.setdefault(kind, Counter())
+        previous = self.stored.get(key)
+        if previous is None:
+            counts["new"] += 1
+            return True
+        if previous != digest:
+            counts["changed"] += 1
+            return True
+        counts["unchanged"] += 1
+        return self.rewrite_all or kind in self.stale
+
+    def deleted(self, kind: Optional[str] = None) -> List[str]:
+        prefix = f"{kind}:" if kind else ""
+        return [key for key in self.stored if key.startswith(prefix) and key not in self.seen]
+
+    def save(self, conn: sqlite3.Connection, fingerprint: str) -> None:
+        """Persist the digests seen in this run; must run inside the import's transaction."""
+        gone = [(self.source, key) for key in self.deleted()]
+        conn.executemany("DELETE FROM import_manifest_rows WHERE source = ? AND row_key = ?", gone)
+        conn.executemany(
+            """
+            INSERT INTO import_manifest_rows (source, row_key, digest) VALUES (?, ?, ?)
+            ON CONFLICT(source, row_key) DO UPDATE SET digest = excluded.digest
+            WHERE digest IS NOT excluded.digest
+            """,
+            ((self.source, key, digest) for key, digest in self.seen.items()),
+        )
+        conn.execute(
+            """
+            INSERT INTO import_manifest_sources (source, fingerprint, row_count, updated_at)
+            VALUES (?, ?, ?, datetime('now'))
+            ON CONFLICT(source) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                row_count = excluded.row_count,
+                updated_at = excluded.updated_at
+            """,
+            (self.source, fingerprint, len(self.seen)),
+        )
+
+    def summary(self, kind: str) -> str:
+        counts = self.counts.get(kind, Counter())
+        stale = "; all rewritten, the target no longer matched the manifest" if kind in self.stale else ""
+        return (
+            f"{counts['new']} new, {counts['changed']} changed, {counts['unchanged']} unchanged, "
+            f"{len(self.deleted(kind))} deleted{stale}"
+        )
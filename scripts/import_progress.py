@@ -0,0 +1,8 @@
+"""Per-stage timing lines shared by the importers' summaries."""
+
+from __future__ import annotations
+
+
+def print_stage(name: str, count: int, unit: str, seconds: float) -> None:
+    rate = f"{count / seconds:,.0f} {unit}/s" if seconds else "-"
+    print(f"  {name:<8} {count:>8,} {unit:<10} {seconds:>7.2f}s  {rate}")
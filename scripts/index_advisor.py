@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""Check the quran_ayah_lemma_location hot-path queries against proposed indexes.
+
+Copies the database, rebuilds the table's indexes as create-quran-lemma-schema.sql
+defines them, and runs each query the word-column scripts and ayah endpoints
+issue through EXPLAIN QUERY PLAN and a timer. It then applies the index
+migration and repeats, flagging full table scans and temp-B-tree sorts in
+both plans. Writes only touch the copy and are rolled back after each run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from word_updates_sql import WORD_ROWS_SQL
+
+LOCATION_TABLE = "quran_ayah_lemma_location"
+SCHEMA_SQL = Path("database/migrations/create-quran-lemma-schema.sql")
+INDEX_MIGRATION_SQL = Path("database/migrations/add-quran-lemma-location-indexes.sql")
+
+_INDEX_STATEMENT_RE = re.compile(
+    rf"CREATE\s+(?:UNIQUE\s+)?INDEX\s+IF\s+NOT\s+EXISTS\s+\w+\s+ON\s+{LOCATION_TABLE}\b.*?;",
+    re.IGNORECASE | re.DOTALL,
+)
+_FULL_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+
+Sample = Dict[str, object]
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    source: str
+    sql: str
+    params: Callable[[Sample], Sequence[object]]
+
+
+HOT_QUERIES: Tuple[HotQuery, ...] = (
+    HotQuery(
+        "gather_rows",
+        "batch_update_specific_words.py",
+        f"""
+        SELECT id, surah, ayah, token_index, word_location, word_simple
+        FROM {LOCATION_TABLE}
+        WHERE word_simple IN (?, ?, ?)
+        ORDER BY surah, ayah, token_index
+        """,
+        lambda sample: sample["targets"],
+    ),
+    HotQuery(
+        "missing_words_batch",
+        "update_word_columns_batch.py / update_word_columns_fast.py",
+        f"""
+        SELECT id, surah, ayah, token_index
+        FROM {LOCATION_TABLE}
+        WHERE word_simple IS NULL OR word_diacritic IS NULL
+        LIMIT ?
+        """,
+        lambda sample: (2000,),
+    ),
+    HotQuery(
+        "pending_id_range",
+        "backfill_word_columns.py",
+        f"""
+        SELECT MIN(id), MAX(id)
+        FROM {LOCATION_TABLE}
+        WHERE id > ? AND (word_simple IS NULL OR word_diacritic IS NULL)
+        """,
+        lambda sample: (sample["mid_id"],),
+    ),
+    HotQuery(
+        "remaining_count",
+        "backfill_word_columns.py",
+        f"SELECT COUNT(*) FROM {LOCATION_TABLE} WHERE word_simple IS NULL OR word_diacritic IS NULL",
+        lambda sample: (),
+    ),
+    HotQuery(
+        "update_by_position",
+        "update_word_columns_from_quran_words.py (default per-row path)",
+        f"""
+        UPDATE {LOCATION_TABLE}
+        SET word_simple = ?, word_diacritic = ?
+        WHERE surah = ? AND ayah = ? AND token_index = ?
+        """,
+        lambda sample: ("w", "w", sample["surah"], sample["ayah"], sample["token_index"]),
+    ),
+    HotQuery(
+        "word_rows",
+        "word_updates_sql.py",
+        WORD_ROWS_SQL,
+        lambda sample: (),
+    ),
+    HotQuery(
+        "ayah_words",
+        "functions/ar/quran/ayahs.ts",
+        f"""
+        SELECT id, surah, ayah, token_index, word_location, word_simple, word_diacritic,
+               lemma_id, ar_u_token, ar_token_occ_id
+        FROM {LOCATION_TABLE}
+        WHERE surah = ? AND ayah BETWEEN ? AND ?
+        ORDER BY ayah ASC, token_index ASC
+        """,
+        lambda sample: (sample["surah"], sample["ayah"], sample["ayah"] + 5),
+    ),
+)
+
+
+@dataclass
+class QueryReport:
+    plan: List[str]
+    seconds: float
+
+    @property
+    def flags(self) -> List[str]:
+        flags = []
+        for detail in self.plan:
+            match = _FULL_SCAN_RE.match(detail)
+            if match:
+                flags.append(f"full scan of {match.group(1)}")
+            elif detail.startswith("USE TEMP B-TREE"):
+                flags.append(detail[len("USE ") :].lower())
+        return flags
+
+
+def index_statements(path: Path) -> List[str]:
+    """CREATE INDEX statements for quran_ayah_lemma_location in a migration file."""
+    return _INDEX_STATEMENT_RE.findall(path.read_text(encoding="utf-8"))
+
+
+def copy_database(source: Path, target: Path) -> sqlite3.Connection:
+    shutil.copyfile(source, target)
+    # Autocommit, so timing runs can wrap writes in their own savepoint.
+    return sqlite3.connect(target, isolation_level=None)
+
+
+def reset_indexes(conn: sqlite3.Connection, statements: Sequence[str]) -> None:
+    """Drop every explicit index on the table, then create ``statements``."""
+    names = [
+        name
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (LOCATION_TABLE,),
+        )
+    ]
+    for name in names:
+        conn.execute(f"DROP INDEX {name}")
+    for statement in statements:
+        conn.execute(statement)
+
+
+def sample_values(conn: sqlite3.Connection) -> Sample:
+    """Realistic parameters: a row from the middle of the table and its commonest word_simple values."""
+    row = conn.execute(
+        f"""
+        SELECT id, surah, ayah, token_index
+        FROM {LOCATION_TABLE}
+        WHERE id >= (SELECT (MIN(id) + MAX(id)) / 2 FROM {LOCATION_TABLE})
+        ORDER BY id
+        LIMIT 1
+        """
+    ).fetchone()
+    if row is None:
+        raise SystemExit(f"{LOCATION_TABLE} is empty; nothing to advise on.")
+    targets = [
+        word
+        for (word,) in conn.execute(
+            f"""
+            SELECT word_simple FROM {LOCATION_TABLE}
+            WHERE word_simple IS NOT NULL
+            GROUP BY word_simple
+            ORDER BY COUNT(*) DESC
+            LIMIT 3
+            """
+        )
+    ]
+    targets += [""] * (3 - len(targets))
+    return {"mid_id": row[0], "surah": row[1], "ayah": row[2], "token_index": row[3], "targets": targets}
+
+
+def run_query(conn: sqlite3.Connection, query: HotQuery, params: Sequence[object], repeat: int) -> QueryReport:
+    plan = [detail for *_, detail in conn.execute(f"EXPLAIN QUERY PLAN {query.sql}", params)]
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        conn.execute("SAVEPOINT index_advisor")
+        try:
+            started = time.perf_counter()
+            conn.execute(query.sql, params).fetchall()
+            best = min(best, time.perf_counter() - started)
+        finally:
+            conn.execute("ROLLBACK TO index_advisor")
+            conn.execute("RELEASE index_advisor")
+    return QueryReport(plan, best)
+
+
+def run_all(conn: sqlite3.Connection, sample: Sample, repeat: int) -> Dict[str, QueryReport]:
+    return {query.name: run_query(conn, query, query.params(sample), repeat) for query in HOT_QUERIES}
+
+
+def print_report(without: Dict[str, QueryReport], with_indexes: Dict[str, QueryReport]) -> List[str]:
+    """Print both plans per query; return the names that still scan the table with the migration applied."""
+    still_flagged = []
+    for query in HOT_QUERIES:
+        before = without[query.name]
+        after = with_indexes[query.name]
+        speedup = before.seconds / after.seconds if after.seconds else float("inf")
+        print(f"{query.name} ({query.source}): {speedup:.1f}x")
+        for label, report in (("without", before), ("with", after)):
+            flags = f"  [{', '.join(report.flags)}]" if report.flags else ""
+            print(f"  {label:<8} {report.seconds * 1000:>9.3f} ms  {'; '.join(report.plan)}{flags}")
+        if any(flag.startswith("full scan") for flag in after.flags):
+            still_flagged.append(query.name)
+    return still_flagged
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare quran_ayah_lemma_location query plans with and without the index migration.")
+    parser.add_argument("--db", type=Path, default=Path("database/d1.db"), help="Local D1 SQLite file (left untouched).")
+    parser.add_argument("--schema", type=Path, default=SCHEMA_SQL, help="Migration defining the baseline indexes.")
+    parser.add_argument("--migration", type=Path, default=INDEX_MIGRATION_SQL, help="Index migration to evaluate.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the fastest is reported.")
+    parser.add_argument("--analyze", action="store_true", help="Run ANALYZE on the copy before each pass.")
+    parser.add_argument("--work-dir", type=Path, help="Directory for the database copy (default: system temp).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    for path in (args.db, args.schema, args.migration):
+        if not path.exists():
+            raise SystemExit(f"File not found: {path}")
+    baseline = index_statements(args.schema)
+    if not baseline:
+        raise SystemExit(f"No {LOCATION_TABLE} indexes found in {args.schema}")
+
+    with tempfile.TemporaryDirectory(dir=args.work_dir) as tmp_dir:
+        conn = copy_database(args.db, Path(tmp_dir) / "advisor.db")
+        try:
+            reset_indexes(conn, baseline)
+            if args.analyze:
+                conn.execute("ANALYZE")
+            sample = sample_values(conn)
+            without = run_all(conn, sample, args.repeat)
+
+            conn.executescript(args.migration.read_text(encoding="utf-8"))
+            if args.analyze:
+                conn.execute("ANALYZE")
+            with_indexes = run_all(conn, sample, args.repeat)
+            indexes = [
+                name
+                for (name,) in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? ORDER BY name",
+                    (LOCATION_TABLE,),
+                )
+            ]
+        except sqlite3.Error as exc:
+            raise SystemExit(f"{args.db}: {exc}") from exc
+        finally:
+            conn.close()
+
+    print(f"Indexes with {args.migration.name}: {', '.join(indexes)}\n")
+    still_flagged = print_report(without, with_indexes)
+    if still_flagged:
+        print(f"\nStill scanning with the migration applied: {', '.join(still_flagged)}")
+
+
+if __name__ == "__main__":
+    main()
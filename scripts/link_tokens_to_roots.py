@@ -3,80 +3,113 @@
 
 from __future__ import annotations
 
-import re
+import argparse
+import csv
 import sqlite3
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
-DIACRITICS_RE = re.compile(
-    r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u08D3-\u08FF\u0591-\u05C7]+"
-)
+from arabic_normalize import normalize_root_arabic
 
+PENDING_CHUNK_SQL = """
+    SELECT rowid, root_norm FROM ar_u_tokens
+    WHERE rowid > ? AND ar_u_root IS NULL AND root_norm IS NOT NULL AND root_norm != ''
+    ORDER BY rowid
+    LIMIT ?
+"""
 
-def normalize_root_arabic(text: str | None) -> str:
-    if not text:
-        return ""
-    cleaned = DIACRITICS_RE.sub("", text)
-    cleaned = "".join(cleaned.split())
-    return cleaned
 
+def build_root_lookups(conn: sqlite3.Connection) -> Tuple[Dict[str, str], Dict[str, str]]:
+    root_lookup: Dict[str, str] = {}
+    english_lookup: Dict[str, str] = {}
+    for ar_u_root, root, english_trilateral in conn.execute(
+        "SELECT ar_u_root, root, english_trilateral FROM ar_u_roots"
+    ):
+        root_norm = normalize_root_arabic(root)
+        if root_norm:
+            root_lookup.setdefault(root_norm, ar_u_root)
+        english = (english_trilateral or "").replace(" ", "")
+        if english:
+            english_lookup.setdefault(english.lower(), ar_u_root)
+    return root_lookup, english_lookup
 
-def main() -> None:
-    db_path = Path("database/d1.db")
-    if not db_path.exists():
-        raise SystemExit(f"Database not found at {db_path}")
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+def make_resolver(root_lookup: Dict[str, str], english_lookup: Dict[str, str]) -> Callable[[str], Optional[str]]:
+    """Map a token root_norm ("english|arabic") to an ar_u_root, Arabic first, then English."""
 
-    root_lookup: dict[str, str] = {}
-    english_lookup: dict[str, str] = {}
+    @lru_cache(maxsize=1 << 16)
+    def resolve(root_norm: str) -> Optional[str]:
+        parts = root_norm.split("|")
+        ar_u_root = root_lookup.get(normalize_root_arabic(parts[-1].strip()))
+        if not ar_u_root:
+            ar_u_root = english_lookup.get(parts[0].strip().lower())
+        return ar_u_root
 
-    for row in conn.execute("SELECT ar_u_root, root, english_trilateral FROM ar_u_roots"):
-        root_norm = normalize_root_arabic(row["root"])
-        if root_norm:
-            root_lookup.setdefault(root_norm, row["ar_u_root"])
-        english = (row["english_trilateral"] or "").replace(" ", "")
-        if english:
-            english_lookup.setdefault(english.lower(), row["ar_u_root"])
+    return resolve
 
-    rows = conn.execute(
-        "SELECT rowid, root_norm FROM ar_u_tokens WHERE ar_u_root IS NULL AND root_norm IS NOT NULL AND root_norm != ''"
-    ).fetchall()
 
-    updated = 0
-    cursor = conn.cursor()
+def write_report(path: Path, unmatched: Counter) -> None:
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["root_norm", "tokens"])
+        writer.writerows(unmatched.most_common())
 
-    for item in rows:
-        rowid = item["rowid"]
-        root_norm = item["root_norm"] or ""
-        parts = root_norm.split("|")
-        arabic = parts[-1].strip() if parts else ""
-        normalized_arabic = normalize_root_arabic(arabic)
 
-        ar_u_root = root_lookup.get(normalized_arabic)
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Link ar_u_tokens without ar_u_root to ar_u_roots by root_norm.")
+    parser.add_argument("--target-db", type=Path, default=Path("database/d1.db"), help="Target D1 SQLite file.")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Tokens resolved and updated per chunk.")
+    parser.add_argument("--report", type=Path, help="Write unmatched root_norm values and token counts to this CSV.")
+    parser.add_argument("--dry-run", action="store_true", help="Resolve and report without writing.")
+    return parser.parse_args()
 
-        if not ar_u_root:
-            english = parts[0].strip().lower() if parts else ""
-            ar_u_root = english_lookup.get(english)
 
-        if not ar_u_root:
-            continue
+def main() -> None:
+    args = parse_args()
+    if not args.target_db.exists():
+        raise SystemExit(f"Database not found at {args.target_db}")
 
-        cursor.execute(
-            "UPDATE ar_u_tokens SET ar_u_root = ? WHERE rowid = ?",
-            (ar_u_root, rowid),
-        )
-        updated += 1
+    conn = sqlite3.connect(args.target_db)
+    resolve = make_resolver(*build_root_lookups(conn))
 
-    conn.commit()
+    updated = 0
+    scanned = 0
+    unmatched: Counter = Counter()
+    last_rowid = 0
+    # Walk the pending tokens by rowid so only one chunk is held in memory at a time.
+    while True:
+        chunk: List[Tuple[int, str]] = conn.execute(PENDING_CHUNK_SQL, (last_rowid, args.chunk_size)).fetchall()
+        if not chunk:
+            break
+        last_rowid = chunk[-1][0]
+        scanned += len(chunk)
+
+        updates = []
+        for rowid, root_norm in chunk:
+            ar_u_root = resolve(root_norm)
+            if ar_u_root:
+                updates.append((ar_u_root, rowid))
+            elif args.report:
+                unmatched[root_norm] += 1
+        conn.executemany("UPDATE ar_u_tokens SET ar_u_root = ? WHERE rowid = ?", updates)
+        updated += len(updates)
+        if args.dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
 
     remaining = conn.execute("SELECT COUNT(*) FROM ar_u_tokens WHERE ar_u_root IS NULL").fetchone()
     remaining_count = remaining[0] if remaining else 0
-
-    print(f"Updated {updated} tokens; {remaining_count} still null.")
-
     conn.close()
 
+    if args.report:
+        write_report(args.report, unmatched)
+        print(f"Wrote {len(unmatched)} unmatched root_norm values to {args.report}.")
+    prefix = "[dry-run] would have updated" if args.dry_run else "Updated"
+    print(f"{prefix} {updated} of {scanned} tokens; {remaining_count} still null.")
+
 
 if __name__ == "__main__":
     main()
@@ -4,27 +4,38 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
 import json
-import re
 import sqlite3
 import sys
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
-CANONICAL_PREFIX = "ROOT|"
-
-
-def canonicalize(value: str) -> str:
-    """Collapse whitespace and lowercase ASCII letters only."""
-    normalized = re.sub(r"\s+", " ", value or "").strip()
-    return re.sub(r"[A-Z]", lambda match: match.group(0).lower(), normalized)
+from ar_u_roots_upsert import upsert_roots
+from canonical_ids import universal_id
 
-
-def sha256_hex(input_value: str) -> Tuple[str, str]:
-    canonical = canonicalize(input_value)
-    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
-    return digest, canonical
+CANONICAL_PREFIX = "ROOT|"
+ROOT_COLUMNS = (
+    "ar_u_root",
+    "canonical_input",
+    "root",
+    "arabic_trilateral",
+    "english_trilateral",
+    "root_latn",
+    "root_norm",
+    "alt_latn_json",
+    "search_keys_norm",
+    "status",
+    "difficulty",
+    "frequency",
+    "extracted_at",
+    "meta_json",
+    "created_at",
+    "updated_at",
+)
+# An existing root keeps its canonical_input and created_at.
+UPDATE_COLUMNS = tuple(
+    column for column in ROOT_COLUMNS if column not in ("ar_u_root", "canonical_input", "created_at")
+)
 
 
 def build_meta(row: sqlite3.Row) -> Optional[str]:
@@ -53,7 +64,7 @@ def build_insert_payload(row: sqlite3.Row) -> Tuple[str, str, Tuple]:
     if not root_norm:
         root_norm = row["root"] or ""
     canonical_input = f"{CANONICAL_PREFIX}{root_norm}"
-    ar_u_root, canonical = sha256_hex(canonical_input)
+    ar_u_root, canonical = universal_id(canonical_input)
 
     status_raw = row["status"] or "active"
     status = status_raw.strip().lower()
@@ -100,60 +111,22 @@ def migrate(db_path: Path, dry_run: bool = False) -> None:
         print("No rows found in ar_roots; nothing to migrate.")
         return
 
-    insert_sql = """
-    INSERT INTO ar_u_roots (
-      ar_u_root,
-      canonical_input,
-      root,
-      arabic_trilateral,
-      english_trilateral,
-      root_latn,
-      root_norm,
-      alt_latn_json,
-      search_keys_norm,
-      status,
-      difficulty,
-      frequency,
-      extracted_at,
-      meta_json,
-      created_at,
-      updated_at
-    )
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ON CONFLICT(ar_u_root) DO UPDATE SET
-      root = excluded.root,
-      arabic_trilateral = excluded.arabic_trilateral,
-      english_trilateral = excluded.english_trilateral,
-      root_latn = excluded.root_latn,
-      root_norm = excluded.root_norm,
-      alt_latn_json = excluded.alt_latn_json,
-      search_keys_norm = excluded.search_keys_norm,
-      status = excluded.status,
-      difficulty = excluded.difficulty,
-      frequency = excluded.frequency,
-      extracted_at = excluded.extracted_at,
-      meta_json = excluded.meta_json,
-      updated_at = excluded.updated_at
-  """
-
     seen_canonical: set[str] = set()
     seen_root_norm: set[str] = set()
-    migrated = 0
+    payloads = []
     for row in rows:
         canonical_input, root_norm, payload = build_insert_payload(row)
         if canonical_input in seen_canonical or root_norm in seen_root_norm:
             continue
         seen_canonical.add(canonical_input)
         seen_root_norm.add(root_norm)
-        if dry_run:
-            migrated += 1
-            continue
-        cursor.execute(insert_sql, payload)
-        migrated += 1
+        payloads.append(payload)
 
-    if not dry_run:
-        conn.commit()
-    print(f"Migrated {migrated} row(s) from ar_roots into ar_u_roots.")
+    if dry_run:
+        print(f"Migrated {len(payloads)} row(s) from ar_roots into ar_u_roots.")
+        return
+    stats = upsert_roots(conn, ROOT_COLUMNS, payloads, UPDATE_COLUMNS)
+    print(f"Migrated {stats.total} row(s) from ar_roots into ar_u_roots ({stats.summary()}).")
 
 
 def parse_args() -> argparse.Namespace:
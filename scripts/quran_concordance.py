@@ -0,0 +1,321 @@
+"""Materialized root -> lemma -> occurrence concordance.
+
+Listing every occurrence of a root means joining ar_u_roots, ar_u_tokens
+(on ar_u_root), quran_ayah_lemmas (on primary_ar_u_token) and
+quran_ayah_lemma_location at query time. The concordance stores the result
+of that join once, sorted by root, lemma and position:
+
+* ``quran_root_concordance`` holds one row per occurrence, keyed by
+  ``(root_id, ordinal)`` where ``ordinal`` counts occurrences within the
+  root in (lemma_id, surah, ayah, token_index) order.
+* ``quran_root_concordance_roots`` maps each ar_u_root to a compact
+  ``root_id`` and records its occurrence and lemma counts plus a digest of
+  its rows.
+* ``quran_root_concordance_lemmas`` records each lemma's root, the ordinal
+  of its first occurrence and its occurrence count.
+
+A page of a root is then ``root_id = ? AND ordinal >= ?`` and a page of a
+lemma is the same range scan, offset by its ``first_ordinal``. Lemmas whose
+token has no ar_u_root are not in the concordance.
+
+Triggers on quran_ayah_lemma_location, quran_ayah_lemmas and ar_u_tokens
+record the lemmas whose occurrences or root may have changed in
+``quran_root_concordance_dirty``. ``refresh_concordance`` (or
+build_concordance.py) rereads the join for those lemmas' old and new roots
+only and rewrites the roots whose digest changed, so moving, adding or
+deleting lemma locations touches the affected roots alone. root_id values
+stay put across refreshes.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from import_manifest import row_digest
+
+CONCORDANCE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quran_root_concordance_roots (
+    root_id INTEGER PRIMARY KEY,
+    ar_u_root TEXT NOT NULL UNIQUE,
+    occurrences INTEGER NOT NULL,
+    lemmas INTEGER NOT NULL,
+    digest TEXT,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS quran_root_concordance_lemmas (
+    lemma_id INTEGER PRIMARY KEY,
+    root_id INTEGER NOT NULL,
+    first_ordinal INTEGER NOT NULL,
+    occurrences INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_quran_root_concordance_lemmas_root
+    ON quran_root_concordance_lemmas (root_id, first_ordinal);
+
+CREATE TABLE IF NOT EXISTS quran_root_concordance (
+    root_id INTEGER NOT NULL,
+    ordinal INTEGER NOT NULL,
+    lemma_id INTEGER NOT NULL,
+    surah INTEGER NOT NULL,
+    ayah INTEGER NOT NULL,
+    token_index INTEGER NOT NULL,
+    location_id INTEGER NOT NULL,
+    word_simple TEXT,
+    word_diacritic TEXT,
+    PRIMARY KEY (root_id, ordinal)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS quran_root_concordance_dirty (
+    lemma_id INTEGER PRIMARY KEY
+);
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_location_ai
+AFTER INSERT ON quran_ayah_lemma_location BEGIN
+    INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (new.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_location_ad
+AFTER DELETE ON quran_ayah_lemma_location BEGIN
+    INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_location_au
+AFTER UPDATE OF lemma_id, surah, ayah, token_index, word_simple, word_diacritic ON quran_ayah_lemma_location BEGIN
+    INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id), (new.lemma_id);
+END;
+
+-- Dropped first so databases created with the earlier body (new.lemma_id only) get this one.
+DROP TRIGGER IF EXISTS quran_root_concordance_lemma_au;
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_lemma_au
+AFTER UPDATE OF lemma_id, primary_ar_u_token ON quran_ayah_lemmas BEGIN
+    INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id), (new.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_lemma_ad
+AFTER DELETE ON quran_ayah_lemmas BEGIN
+    INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id) VALUES (old.lemma_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_token_ai
+AFTER INSERT ON ar_u_tokens BEGIN
+    INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id)
+    SELECT lemma_id FROM quran_ayah_lemmas WHERE primary_ar_u_token = new.ar_u_token;
+END;
+
+-- Dropped first so databases created with the earlier body (ar_u_root only) get this one.
+DROP TRIGGER IF EXISTS quran_root_concordance_token_au;
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_token_au
+AFTER UPDATE OF ar_u_token, ar_u_root ON ar_u_tokens BEGIN
+    INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id)
+    SELECT lemma_id FROM quran_ayah_lemmas WHERE primary_ar_u_token IN (old.ar_u_token, new.ar_u_token);
+END;
+
+CREATE TRIGGER IF NOT EXISTS quran_root_concordance_token_ad
+AFTER DELETE ON ar_u_tokens BEGIN
+    INSERT OR IGNORE INTO quran_root_concordance_dirty (lemma_id)
+    SELECT lemma_id FROM quran_ayah_lemmas WHERE primary_ar_u_token = old.ar_u_token;
+END;
+
+-- Lemmas of a token, for the ar_u_tokens triggers and refreshes limited to a few roots.
+CREATE INDEX IF NOT EXISTS idx_quran_ayah_lemmas_primary_ar_u_token
+    ON quran_ayah_lemmas (primary_ar_u_token);
+"""
+
+# Every occurrence with a root, in concordance order. Keep in step with
+# database/migrations/create-quran-root-concordance.sql.
+SOURCE_ROWS_SQL = """
+    SELECT t.ar_u_root, loc.lemma_id, loc.surah, loc.ayah, loc.token_index, loc.id,
+           loc.word_simple, loc.word_diacritic
+    FROM quran_ayah_lemma_location AS loc
+    JOIN quran_ayah_lemmas AS l ON l.lemma_id = loc.lemma_id
+    JOIN ar_u_tokens AS t ON t.ar_u_token = l.primary_ar_u_token
+    WHERE t.ar_u_root IS NOT NULL
+    ORDER BY t.ar_u_root, loc.lemma_id, loc.surah, loc.ayah, loc.token_index, loc.id
+"""
+
+# The same rows for the roots in a JSON array, read through the ar_u_root and lemma indexes.
+ROOT_SOURCE_ROWS_SQL = """
+    SELECT t.ar_u_root, loc.lemma_id, loc.surah, loc.ayah, loc.token_index, loc.id,
+           loc.word_simple, loc.word_diacritic
+    FROM json_each(?) AS wanted
+    JOIN ar_u_tokens AS t ON t.ar_u_root = wanted.value
+    JOIN quran_ayah_lemmas AS l ON l.primary_ar_u_token = t.ar_u_token
+    JOIN quran_ayah_lemma_location AS loc ON loc.lemma_id = l.lemma_id
+    ORDER BY t.ar_u_root, loc.lemma_id, loc.surah, loc.ayah, loc.token_index, loc.id
+"""
+
+# Roots a refresh has to revisit for the dirty lemmas: where each lemma is now and where it was.
+DIRTY_ROOTS_SQL = """
+    SELECT t.ar_u_root
+    FROM quran_root_concordance_dirty AS d
+    JOIN quran_ayah_lemmas AS l ON l.lemma_id = d.lemma_id
+    JOIN ar_u_tokens AS t ON t.ar_u_token = l.primary_ar_u_token
+    WHERE t.ar_u_root IS NOT NULL
+    UNION
+    SELECT r.ar_u_root
+    FROM quran_root_concordance_dirty AS d
+    JOIN quran_root_concordance_lemmas AS s ON s.lemma_id = d.lemma_id
+    JOIN quran_root_concordance_roots AS r ON r.root_id = s.root_id
+"""
+
+ROOT_PAGE_SQL = """
+    SELECT c.ordinal, c.lemma_id, c.surah, c.ayah, c.token_index, c.location_id, c.word_simple, c.word_diacritic
+    FROM quran_root_concordance_roots AS r
+    JOIN quran_root_concordance AS c ON c.root_id = r.root_id AND c.ordinal >= ?1
+    WHERE r.ar_u_root = ?2
+    ORDER BY c.ordinal
+    LIMIT ?3
+"""
+
+LEMMA_PAGE_SQL = """
+    SELECT c.ordinal, c.lemma_id, c.surah, c.ayah, c.token_index, c.location_id, c.word_simple, c.word_diacritic
+    FROM quran_root_concordance_lemmas AS s
+    JOIN quran_root_concordance AS c
+      ON c.root_id = s.root_id
+     AND c.ordinal >= s.first_ordinal + ?1
+     AND c.ordinal < s.first_ordinal + s.occurrences
+    WHERE s.lemma_id = ?2
+    ORDER BY c.ordinal
+    LIMIT ?3
+"""
+
+_INSERT_ROW_SQL = """
+    INSERT INTO quran_root_concordance
+        (root_id, ordinal, lemma_id, surah, ayah, token_index, location_id, word_simple, word_diacritic)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# (lemma_id, surah, ayah, token_index, location_id, word_simple, word_diacritic)
+SourceRow = Tuple[int, int, int, int, int, Optional[str], Optional[str]]
+
+
+@dataclass(frozen=True)
+class ConcordanceEntry:
+    ordinal: int
+    lemma_id: int
+    surah: int
+    ayah: int
+    token_index: int
+    location_id: int
+    word_simple: Optional[str]
+    word_diacritic: Optional[str]
+
+
+def ensure_concordance_tables(conn: sqlite3.Connection) -> None:
+    conn.executescript(CONCORDANCE_SCHEMA)
+
+
+def source_roots(
+    conn: sqlite3.Connection, roots: Optional[Sequence[str]] = None
+) -> Iterator[Tuple[str, List[SourceRow]]]:
+    """Yield ``(ar_u_root, rows)`` from the live join (for ``roots`` only, if given), rows in concordance order."""
+    if roots is None:
+        cursor = conn.execute(SOURCE_ROWS_SQL)
+    elif roots:
+        cursor = conn.execute(ROOT_SOURCE_ROWS_SQL, (json.dumps(list(roots)),))
+    else:
+        return
+    for ar_u_root, rows in groupby(cursor, key=itemgetter(0)):
+        yield ar_u_root, [row[1:] for row in rows]
+
+
+def _write_root(conn: sqlite3.Connection, root_id: int, rows: Sequence[SourceRow]) -> None:
+    conn.executemany(_INSERT_ROW_SQL, ((root_id, ordinal, *row) for ordinal, row in enumerate(rows)))
+    lemmas: Dict[int, List[int]] = {}
+    for ordinal, row in enumerate(rows):
+        lemmas.setdefault(row[0], [ordinal, 0])[1] += 1
+    conn.executemany(
+        "INSERT INTO quran_root_concordance_lemmas (lemma_id, root_id, first_ordinal, occurrences) VALUES (?, ?, ?, ?)",
+        ((lemma_id, root_id, first, count) for lemma_id, (first, count) in lemmas.items()),
+    )
+
+
+def _clear_root(conn: sqlite3.Connection, root_id: int) -> None:
+    conn.execute("DELETE FROM quran_root_concordance WHERE root_id = ?", (root_id,))
+    conn.execute("DELETE FROM quran_root_concordance_lemmas WHERE root_id = ?", (root_id,))
+
+
+def refresh_concordance(conn: sqlite3.Connection, rewrite_all: bool = False, scan_all: bool = False) -> Counter:
+    """Bring the concordance in line with the live join; return root counts by outcome.
+
+    Only the roots of lemmas the triggers marked dirty are reread, unless
+    the concordance is empty or ``scan_all`` is set; then the whole join is
+    read, which also catches changes made while the triggers were missing.
+    Reread roots whose rows hash to the stored digest are left alone unless
+    ``rewrite_all`` is set. Cleared roots are all deleted before any are
+    rewritten, so a lemma can move between roots in one refresh.
+    """
+    counts: Counter = Counter()
+    with conn:
+        ensure_concordance_tables(conn)
+        stored: Dict[str, Tuple[int, Optional[str]]] = {
+            ar_u_root: (root_id, digest)
+            for root_id, ar_u_root, digest in conn.execute(
+                "SELECT root_id, ar_u_root, digest FROM quran_root_concordance_roots"
+            )
+        }
+        roots: Optional[List[str]] = None
+        if stored and not (scan_all or rewrite_all):
+            roots = [ar_u_root for (ar_u_root,) in conn.execute(DIRTY_ROOTS_SQL)]
+            stored = {ar_u_root: stored[ar_u_root] for ar_u_root in roots if ar_u_root in stored}
+        pending: List[Tuple[str, Optional[int], str, List[SourceRow]]] = []
+        for ar_u_root, rows in source_roots(conn, roots):
+            digest = row_digest(rows)
+            root_id, previous = stored.pop(ar_u_root, (None, None))
+            if root_id is None:
+                counts["new"] += 1
+            elif previous != digest:
+                counts["changed"] += 1
+            else:
+                counts["unchanged"] += 1
+                if not rewrite_all:
+                    continue
+            pending.append((ar_u_root, root_id, digest, rows))
+
+        for root_id, _ in stored.values():
+            _clear_root(conn, root_id)
+            conn.execute("DELETE FROM quran_root_concordance_roots WHERE root_id = ?", (root_id,))
+        counts["deleted"] = len(stored)
+        for _, root_id, _, _ in pending:
+            if root_id is not None:
+                _clear_root(conn, root_id)
+
+        for ar_u_root, root_id, digest, rows in pending:
+            lemma_count = len({row[0] for row in rows})
+            if root_id is None:
+                root_id = conn.execute(
+                    """
+                    INSERT INTO quran_root_concordance_roots (ar_u_root, occurrences, lemmas, digest)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (ar_u_root, len(rows), lemma_count, digest),
+                ).lastrowid
+            else:
+                conn.execute(
+                    """
+                    UPDATE quran_root_concordance_roots
+                    SET occurrences = ?, lemmas = ?, digest = ?, updated_at = datetime('now')
+                    WHERE root_id = ?
+                    """,
+                    (len(rows), lemma_count, digest, root_id),
+                )
+            _write_root(conn, root_id, rows)
+        conn.execute("DELETE FROM quran_root_concordance_dirty")
+    return counts
+
+
+def root_page(conn: sqlite3.Connection, ar_u_root: str, offset: int = 0, limit: int = 50) -> List[ConcordanceEntry]:
+    """Occurrences ``offset`` .. ``offset + limit - 1`` of a root, grouped by lemma."""
+    return [ConcordanceEntry(*row) for row in conn.execute(ROOT_PAGE_SQL, (offset, ar_u_root, limit))]
+
+
+def lemma_page(conn: sqlite3.Connection, lemma_id: int, offset: int = 0, limit: int = 50) -> List[ConcordanceEntry]:
+    """Occurrences ``offset`` .. ``offset + limit - 1`` of a lemma in mushaf order."""
+    return [ConcordanceEntry(*row) for row in conn.execute(LEMMA_PAGE_SQL, (offset, lemma_id, limit))]
@@ -0,0 +1,129 @@
+"""Shared-phrase tables and word-level lookups.
+
+import-tarteel-phrases.py streams tarteel.ai's phrases.json into two tables:
+
+* ``quran_phrases``: one row per phrase with its source ayah and range and
+  the counts the export declares.
+* ``quran_phrase_ranges``: one row per occurrence, an inclusive 1-based
+  word range ``[word_from, word_to]`` of one ayah. Its primary key
+  ``(surah, ayah, word_from, word_to, phrase_id)`` is the interval index:
+  the phrases covering word N of S:A are a seek to (S, A) followed by a
+  scan of that ayah's ranges starting at or before N, kept when they end
+  at or after N. No ayah holds more than seven ranges in the current
+  export, so a lookup reads a handful of index entries.
+  ``idx_quran_phrase_ranges_phrase`` lists one phrase's occurrences.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, List
+
+from tarteel_phrases import Phrase, PhraseRange
+
+PHRASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quran_phrases (
+    phrase_id INTEGER PRIMARY KEY,
+    source_surah INTEGER NOT NULL,
+    source_ayah INTEGER NOT NULL,
+    source_from INTEGER NOT NULL,
+    source_to INTEGER NOT NULL,
+    surahs INTEGER NOT NULL,
+    ayahs INTEGER NOT NULL,
+    occurrences INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS quran_phrase_ranges (
+    phrase_id INTEGER NOT NULL,
+    surah INTEGER NOT NULL,
+    ayah INTEGER NOT NULL,
+    word_from INTEGER NOT NULL,
+    word_to INTEGER NOT NULL,
+    PRIMARY KEY (surah, ayah, word_from, word_to, phrase_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_quran_phrase_ranges_phrase
+    ON quran_phrase_ranges (phrase_id, surah, ayah, word_from);
+"""
+
+COVERING_SQL = """
+    SELECT phrase_id, surah, ayah, word_from, word_to
+    FROM quran_phrase_ranges
+    WHERE surah = ?1 AND ayah = ?2 AND word_from <= ?3 AND word_to >= ?3
+    ORDER BY word_from, word_to, phrase_id
+"""
+
+AYAH_RANGES_SQL = """
+    SELECT phrase_id, surah, ayah, word_from, word_to
+    FROM quran_phrase_ranges
+    WHERE surah = ? AND ayah = ?
+    ORDER BY word_from, word_to, phrase_id
+"""
+
+PHRASE_RANGES_SQL = """
+    SELECT phrase_id, surah, ayah, word_from, word_to
+    FROM quran_phrase_ranges
+    WHERE phrase_id = ?
+    ORDER BY surah, ayah, word_from
+"""
+
+
+def ensure_phrase_tables(conn: sqlite3.Connection) -> None:
+    conn.executescript(PHRASE_SCHEMA)
+
+
+def write_phrases(conn: sqlite3.Connection, phrases: Iterable[Phrase]) -> int:
+    """Insert or replace each phrase and its ranges; returns the number of distinct ranges written."""
+    written = 0
+    for phrase in phrases:
+        conn.execute("DELETE FROM quran_phrase_ranges WHERE phrase_id = ?", (phrase.phrase_id,))
+        conn.execute(
+            """
+            INSERT INTO quran_phrases
+                (phrase_id, source_surah, source_ayah, source_from, source_to, surahs, ayahs, occurrences)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(phrase_id) DO UPDATE SET
+                source_surah = excluded.source_surah,
+                source_ayah = excluded.source_ayah,
+                source_from = excluded.source_from,
+                source_to = excluded.source_to,
+                surahs = excluded.surahs,
+                ayahs = excluded.ayahs,
+                occurrences = excluded.occurrences
+            """,
+            phrase[:-1],
+        )
+        # A range listed twice for the same ayah (phrase 75 in 16:28 is) is one occurrence.
+        written += conn.executemany(
+            "INSERT OR IGNORE INTO quran_phrase_ranges (phrase_id, surah, ayah, word_from, word_to) VALUES (?, ?, ?, ?, ?)",
+            phrase.ranges,
+        ).rowcount
+    return written
+
+
+def delete_phrases(conn: sqlite3.Connection, phrase_ids: Iterable[int]) -> None:
+    params = [(phrase_id,) for phrase_id in phrase_ids]
+    conn.executemany("DELETE FROM quran_phrase_ranges WHERE phrase_id = ?", params)
+    conn.executemany("DELETE FROM quran_phrases WHERE phrase_id = ?", params)
+
+
+def phrases_covering(conn: sqlite3.Connection, surah: int, ayah: int, word: int) -> List[PhraseRange]:
+    """Occurrences of every phrase whose range in ``surah:ayah`` includes ``word`` (1-based)."""
+    return [PhraseRange(*row) for row in conn.execute(COVERING_SQL, (surah, ayah, word))]
+
+
+def phrases_by_word(conn: sqlite3.Connection, surah: int, ayah: int) -> Dict[int, List[int]]:
+    """Phrase ids per word of ``surah:ayah``, for highlighting a whole ayah with one query.
+
+    Words outside every phrase are left out.
+    """
+    words: Dict[int, List[int]] = {}
+    for phrase_id, _, _, word_from, word_to in conn.execute(AYAH_RANGES_SQL, (surah, ayah)):
+        for word in range(word_from, word_to + 1):
+            words.setdefault(word, []).append(phrase_id)
+    return dict(sorted(words.items()))
+
+
+def phrase_occurrences(conn: sqlite3.Connection, phrase_id: int) -> List[PhraseRange]:
+    """Every range of one phrase in mushaf order."""
+    return [PhraseRange(*row) for row in conn.execute(PHRASE_RANGES_SQL, (phrase_id,))]
@@ -0,0 +1,347 @@
+"""FTS5 search over Quran words, ar_u_tokens lemmas and ar_u_roots search keys.
+
+Each source table gets an FTS5 table keyed by the source rowid, with 2-4
+character prefix indexes. FTS5's unicode61 tokenizer cannot fold Arabic
+diacritics (harakat are either separators or kept inside the token), so
+every indexed column goes through ``sql_fold_arabic``, a pure-SQL walk
+that strips the same diacritics and folds the same letters as
+``arabic_normalize.normalize_arabic``. The folding lives in one view per
+source, and AFTER INSERT/UPDATE/DELETE triggers copy rows from that view.
+The triggers use only core SQL, so they keep the index current for every
+writer: the import scripts, D1 and the sqlite3 shell.
+
+ar_u_tokens and ar_u_roots have TEXT primary keys, so their FTS rows follow
+the implicit rowid, which VACUUM may renumber and which dropping the table
+(as the ar_u_roots seed does) discards along with the triggers. Their FTS
+tables therefore also store the primary key as an UNINDEXED column:
+``search`` only returns hits whose rowid still carries that key, and
+``build_search_index`` refills an index whose triggers are missing or whose
+rows no longer line up with the source.
+
+``search`` folds the query with ``fold_arabic`` and returns hits ranked by
+bm25. ``build_search_index`` (or build_search_index.py) creates and fills
+the tables; ``render_search_index_sql`` emits the same DDL for D1.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from arabic_normalize import DIACRITIC_RANGES, LETTER_FOLDS, fold_arabic, normalize_arabic
+
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+FTS_PREFIXES = "2 3 4"
+DEFAULT_LIMIT = 20
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    kind: str
+    table: str
+    fts_table: str
+    # Column the FTS rowid mirrors: an INTEGER PRIMARY KEY or the implicit rowid.
+    rowid: str
+    columns: Tuple[str, ...]
+    # Source columns returned with each hit.
+    fields: Tuple[str, ...]
+    # TEXT primary key stored UNINDEXED next to an implicit rowid, to detect renumbered rows.
+    key: Optional[str] = None
+
+    @property
+    def view(self) -> str:
+        return f"{self.fts_table}_source"
+
+    @property
+    def stored(self) -> Tuple[str, ...]:
+        """Every FTS column: the indexed ones, then the key."""
+        return (*self.columns, self.key) if self.key else self.columns
+
+    @property
+    def triggers(self) -> Tuple[str, ...]:
+        return tuple(f"{self.fts_table}_{suffix}" for suffix in ("ai", "ad", "au"))
+
+
+SOURCES: Tuple[SearchSource, ...] = (
+    SearchSource(
+        "word",
+        "quran_ayah_lemma_location",
+        "quran_word_fts",
+        "id",
+        ("word_simple", "word_diacritic"),
+        ("surah", "ayah", "token_index", "lemma_id", "word_simple", "word_diacritic"),
+    ),
+    SearchSource(
+        "lemma",
+        "ar_u_tokens",
+        "ar_u_token_fts",
+        "rowid",
+        ("lemma_norm",),
+        ("ar_u_token", "lemma_ar", "lemma_norm", "pos", "ar_u_root"),
+        "ar_u_token",
+    ),
+    SearchSource(
+        "root",
+        "ar_u_roots",
+        "ar_u_root_fts",
+        "rowid",
+        ("search_keys_norm",),
+        ("ar_u_root", "root", "root_norm", "search_keys_norm"),
+        "ar_u_root",
+    ),
+)
+SOURCES_BY_KIND: Dict[str, SearchSource] = {source.kind: source for source in SOURCES}
+
+
+@dataclass
+class SearchHit:
+    kind: str
+    doc_id: int
+    # bm25 score: lower is a better match.
+    score: float
+    fields: Dict[str, object]
+
+
+def _glob_any(codes: Sequence[int]) -> str:
+    """SQL GLOB pattern matching text that contains any of ``codes`` (contiguous runs become ranges)."""
+    runs: List[List[int]] = []
+    for code in sorted(codes):
+        if runs and code == runs[-1][1] + 1:
+            runs[-1][1] = code
+        else:
+            runs.append([code, code])
+    members = ", ".join(str(start) if start == end else f"{start}, 45, {end}" for start, end in runs)
+    return f"'*[' || char({members}) || ']*'"
+
+
+def sql_fold_arabic(column: str) -> str:
+    """SQL expression equal to ``fold_arabic(column)`` up to whitespace, which the tokenizer splits on.
+
+    A recursive CTE walks the value one character at a time, dropping
+    diacritics and folding letters by code point; values with nothing to
+    fold skip the walk after one GLOB.
+    """
+    code = "unicode(rest)"
+    diacritic = " OR ".join(
+        f"{code} = {start}" if start == end else f"{code} BETWEEN {start} AND {end}" for start, end in DIACRITIC_RANGES
+    )
+    folds = " ".join(f"WHEN {ord(source)} THEN char({ord(target)})" for source, target in LETTER_FOLDS.items())
+    pattern = _glob_any(
+        [code for start, end in DIACRITIC_RANGES for code in range(start, end + 1)] + [ord(source) for source in LETTER_FOLDS]
+    )
+    return f"""CASE WHEN {column} GLOB {pattern} THEN (
+    WITH RECURSIVE walk(rest, out) AS (
+      SELECT {column}, ''
+      UNION ALL
+      SELECT substr(rest, 2), out || CASE
+        WHEN {diacritic} THEN ''
+        ELSE CASE {code} {folds} ELSE substr(rest, 1, 1) END
+      END
+      FROM walk
+      WHERE rest <> ''
+    )
+    SELECT out FROM walk WHERE rest = ''
+  ) ELSE {column} END"""
+
+
+def _fold_view_sql(source: SearchSource) -> str:
+    folded = ",\n  ".join(f"{sql_fold_arabic(f'src.{column}')} AS {column}" for column in source.columns)
+    if source.key:
+        folded += f",\n  src.{source.key} AS {source.key}"
+    return f"CREATE VIEW IF NOT EXISTS {source.view} AS\nSELECT\n  src.{source.rowid} AS doc_id,\n  {folded}\nFROM {source.table} AS src"
+
+
+def _source_sql(source: SearchSource) -> List[str]:
+    columns = ", ".join(source.stored)
+    # The implicit rowid cannot be named in UPDATE OF; an INTEGER PRIMARY KEY can.
+    watched = source.stored if source.rowid == "rowid" else (*source.stored, source.rowid)
+    copy_row = f"INSERT INTO {source.fts_table} (rowid, {columns}) SELECT doc_id, {columns} FROM {source.view}"
+    definitions = ", ".join(source.columns) + (f", {source.key} UNINDEXED" if source.key else "")
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {source.fts_table} USING fts5(\n"
+        f"  {definitions},\n  tokenize = '{FTS_TOKENIZER}',\n  prefix = '{FTS_PREFIXES}'\n)",
+        _fold_view_sql(source),
+        f"CREATE TRIGGER IF NOT EXISTS {source.triggers[0]} AFTER INSERT ON {source.table} BEGIN\n"
+        f"  {copy_row} WHERE doc_id = new.{source.rowid};\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {source.triggers[1]} AFTER DELETE ON {source.table} BEGIN\n"
+        f"  DELETE FROM {source.fts_table} WHERE rowid = old.{source.rowid};\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {source.triggers[2]}\n"
+        f"AFTER UPDATE OF {', '.join(watched)} ON {source.table} BEGIN\n"
+        f"  DELETE FROM {source.fts_table} WHERE rowid = old.{source.rowid};\n"
+        f"  {copy_row} WHERE doc_id = new.{source.rowid};\nEND",
+    ]
+
+
+def _insert_sql(source: SearchSource) -> str:
+    columns = source.stored
+    return f"INSERT INTO {source.fts_table} (rowid, {', '.join(columns)}) VALUES (?, {', '.join('?' for _ in columns)})"
+
+
+def _fill_index(conn: sqlite3.Connection, source: SearchSource) -> None:
+    """Same rows as the view's fill, folded in Python: far cheaper than the sql_fold_arabic walk per row."""
+    width = len(source.columns)
+    rows = conn.execute(f"SELECT {source.rowid}, {', '.join(source.stored)} FROM {source.table}")
+    conn.execute(f"DELETE FROM {source.fts_table}")
+    conn.executemany(
+        _insert_sql(source),
+        (
+            (row[0], *(None if value is None else normalize_arabic(value) for value in row[1 : 1 + width]), *row[1 + width :])
+            for row in rows
+        ),
+    )
+
+
+def _populate_sql(source: SearchSource) -> List[str]:
+    columns = ", ".join(source.stored)
+    return [
+        f"DELETE FROM {source.fts_table}",
+        f"INSERT INTO {source.fts_table} (rowid, {columns}) SELECT doc_id, {columns} FROM {source.view}",
+    ]
+
+
+def _drop_sql(source: SearchSource) -> List[str]:
+    return [
+        *(f"DROP TRIGGER IF EXISTS {trigger}" for trigger in source.triggers),
+        f"DROP VIEW IF EXISTS {source.view}",
+        f"DROP TABLE IF EXISTS {source.fts_table}",
+    ]
+
+
+def _resolve_sources(kinds: Optional[Iterable[str]]) -> List[SearchSource]:
+    if kinds is None:
+        return list(SOURCES)
+    unknown = set(kinds) - set(SOURCES_BY_KIND)
+    if unknown:
+        raise ValueError(f"Unknown search kinds: {', '.join(sorted(unknown))}")
+    return [source for source in SOURCES if source.kind in kinds]
+
+
+def render_search_index_sql(kinds: Optional[Iterable[str]] = None, rebuild: bool = True, header: bool = True) -> str:
+    """DDL, triggers and (with ``rebuild``) the initial fill, as one script for ``wrangler d1 execute``.
+
+    Without ``header`` the "generated by" comment is left out, for scripts
+    that embed the statements (the ar_u_roots seed does).
+    """
+    statements: List[str] = []
+    if header:
+        statements += ["-- Generated by scripts/build_search_index.py --write-sql; edit quran_search.py instead.", ""]
+    for source in _resolve_sources(kinds):
+        statements.append(f"-- {source.kind}: {source.table} ({', '.join(source.columns)})")
+        if rebuild:
+            statements.extend(f"{statement};" for statement in _drop_sql(source))
+        statements.extend(f"{statement};" for statement in _source_sql(source))
+        if rebuild:
+            statements.extend(f"{statement};" for statement in _populate_sql(source))
+        statements.append("")
+    return "\n".join(statements)
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+
+def index_is_stale(conn: sqlite3.Connection, source: SearchSource) -> bool:
+    """True unless the FTS table, its columns and triggers exist and its rows line up with the source.
+
+    Rows line up when both sides have the same count and, for sources keyed
+    by an implicit rowid, every FTS row's rowid still carries its stored key.
+    """
+    if not _table_exists(conn, source.fts_table):
+        return True
+    triggers = {
+        name
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?", (source.table,))
+    }
+    if not triggers.issuperset(source.triggers):
+        return True
+    if tuple(row[1] for row in conn.execute(f"PRAGMA table_info({source.fts_table})")) != source.stored:
+        return True
+    (indexed,) = conn.execute(f"SELECT COUNT(*) FROM {source.fts_table}").fetchone()
+    (rows,) = conn.execute(f"SELECT COUNT(*) FROM {source.table}").fetchone()
+    if indexed != rows:
+        return True
+    if source.key:
+        return (
+            conn.execute(
+                f"""
+                SELECT 1 FROM {source.fts_table} AS fts
+                LEFT JOIN {source.table} AS src ON src.{source.rowid} = fts.rowid
+                WHERE src.{source.key} IS NOT fts.{source.key}
+                LIMIT 1
+                """
+            ).fetchone()
+            is not None
+        )
+    return False
+
+
+def build_search_index(
+    conn: sqlite3.Connection, kinds: Optional[Iterable[str]] = None, rebuild: bool = False
+) -> Dict[str, int]:
+    """Create the FTS tables, views and triggers; refill stale (or, with ``rebuild``, all) indexes.
+
+    See ``index_is_stale``: a source whose table was dropped and recreated,
+    renumbered by VACUUM or written while the triggers were missing is
+    refilled. Sources whose table is missing are skipped. Returns indexed
+    rows per kind.
+    """
+    counts: Dict[str, int] = {}
+    with conn:
+        for source in _resolve_sources(kinds):
+            if not _table_exists(conn, source.table):
+                continue
+            stale = rebuild or index_is_stale(conn, source)
+            if stale:
+                for statement in _drop_sql(source):
+                    conn.execute(statement)
+            for statement in _source_sql(source):
+                conn.execute(statement)
+            if stale:
+                _fill_index(conn, source)
+            (counts[source.kind],) = conn.execute(f"SELECT COUNT(*) FROM {source.fts_table}").fetchone()
+    return counts
+
+
+def match_expression(text: str, prefix: bool = True) -> str:
+    """FTS5 query matching every folded term of ``text`` (as a prefix unless ``prefix`` is False)."""
+    suffix = "*" if prefix else ""
+    return " ".join('"' + term.replace('"', '""') + '"' + suffix for term in fold_arabic(text).split())
+
+
+def search(
+    conn: sqlite3.Connection, text: str, kind: str = "word", limit: int = DEFAULT_LIMIT, prefix: bool = True
+) -> List[SearchHit]:
+    """Best ``limit`` rows of one source matching ``text``, best first."""
+    source = _resolve_sources([kind])[0]
+    expression = match_expression(text, prefix)
+    if not expression:
+        return []
+    key_match = f" AND src.{source.key} = fts.{source.key}" if source.key else ""
+    rows = conn.execute(
+        f"""
+        SELECT fts.rowid, bm25({source.fts_table}), {', '.join(f'src.{field}' for field in source.fields)}
+        FROM {source.fts_table} AS fts
+        JOIN {source.table} AS src ON src.{source.rowid} = fts.rowid{key_match}
+        WHERE {source.fts_table} MATCH ?
+        ORDER BY bm25({source.fts_table})
+        LIMIT ?
+        """,
+        (expression, limit),
+    )
+    return [SearchHit(source.kind, doc_id, score, dict(zip(source.fields, values))) for doc_id, score, *values in rows]
+
+
+def search_all(
+    conn: sqlite3.Connection,
+    text: str,
+    kinds: Optional[Sequence[str]] = None,
+    limit: int = DEFAULT_LIMIT,
+    prefix: bool = True,
+) -> Dict[str, List[SearchHit]]:
+    """``search`` every indexed source. bm25 scores are only comparable within one kind."""
+    return {
+        source.kind: search(conn, text, source.kind, limit, prefix)
+        for source in _resolve_sources(kinds)
+        if _table_exists(conn, source.fts_table)
+    }
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from typing import Dict, Mapping, Optional, Tuple
+
+QURAN_UNIT_PREFIX = "U:QURAN:"
+TOKEN_STAGE_TABLE = "quran_token_stage"
+
+
+def stage_quran_tokens(conn: sqlite3.Connection, table: str = TOKEN_STAGE_TABLE) -> int:
+    """Copy Quran ar_occ_token rows into a temp table keyed by integer (surah, ayah, pos_index).
+
+    ar_occ_token is only indexed by (container_id, unit_id, pos_index) and
+    keys ayahs by "U:QURAN:<surah>:<ayah>" strings; the staged copy lets
+    set-based statements join on the integer columns that
+    quran_ayah_lemma_location already stores. When several containers hold
+    the same position, the first row in rowid order wins, matching the old
+    ``LIMIT 1`` lookups. Returns the number of staged tokens.
+    """
+    conn.executescript(
+        f"""
+        DROP TABLE IF EXISTS temp.{table};
+        CREATE TEMP TABLE {table} (
+            surah INTEGER NOT NULL,
+            ayah INTEGER NOT NULL,
+            pos_index INTEGER NOT NULL,
+            ar_token_occ_id TEXT,
+            ar_u_token TEXT,
+            surface_ar TEXT,
+            norm_ar TEXT,
+            PRIMARY KEY (surah, ayah, pos_index)
+        ) WITHOUT ROWID;
+        """
+    )
+    prefix_len = len(QURAN_UNIT_PREFIX)
+    conn.execute(
+        f"""
+        INSERT OR IGNORE INTO temp.{table}
+            (surah, ayah, pos_index, ar_token_occ_id, ar_u_token, surface_ar, norm_ar)
+        SELECT
+            CAST(substr(ref, 1, instr(ref, ':') - 1) AS INTEGER),
+            CAST(substr(ref, instr(ref, ':') + 1) AS INTEGER),
+            pos_index,
+            ar_token_occ_id,
+            ar_u_token,
+            surface_ar,
+            norm_ar
+        FROM (
+            SELECT substr(unit_id, {prefix_len + 1}) AS ref, *
+            FROM ar_occ_token
+            WHERE unit_id LIKE '{QURAN_UNIT_PREFIX}%'
+            ORDER BY rowid
+        )
+        WHERE instr(ref, ':') > 0
+        """
+    )
+    return conn.execute(f"SELECT COUNT(*) FROM temp.{table}").fetchone()[0]
+
+
+def quran_token_digest(conn: sqlite3.Connection) -> str:
+    """Row count and content hash of the Quran rows of ar_occ_token, in rowid order.
+
+    Importers that resolve words through these tokens mix it into their
+    manifest fingerprint, so re-seeded or edited tokens force a re-run even
+    when their own input files are unchanged.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    count = 0
+    rows = conn.execute(
+        f"""
+        SELECT unit_id, pos_index, ar_token_occ_id, ar_u_token, surface_ar, norm_ar
+        FROM ar_occ_token
+        WHERE unit_id LIKE '{QURAN_UNIT_PREFIX}%'
+        ORDER BY rowid
+        """
+    )
+    for row in rows:
+        digest.update(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+        count += 1
+    return f"{count}:{digest.hexdigest()}"
+
+
+TokenKey = Tuple[int, int, int]
+# (ar_token_occ_id, ar_u_token, surface_ar, norm_ar)
+TokenRow = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+MISSING_TOKEN: TokenRow = (None, None, None, None)
+
+
+def load_quran_token_index(conn: sqlite3.Connection) -> Dict[TokenKey, TokenRow]:
+    """Index every Quran token by (surah, ayah, pos_index) with a single scan of ar_occ_token."""
+    stage_quran_tokens(conn)
+    return {
+        (surah, ayah, pos_index): (occ_id, u_token, surface, norm)
+        for surah, ayah, pos_index, occ_id, u_token, surface, norm in conn.execute(
+            f"""
+            SELECT surah, ayah, pos_index, ar_token_occ_id, ar_u_token, surface_ar, norm_ar
+            FROM temp.{TOKEN_STAGE_TABLE}
+            """
+        )
+    }
+
+
+def resolve_token(index: Mapping[TokenKey, TokenRow], surah: int, ayah: int, token_index: int) -> TokenRow:
+    """Return the token at token_index - 1, falling back to token_index, like the old per-row lookups."""
+    for pos in (token_index - 1, token_index):
+        if pos < 0:
+            continue
+        row = index.get((surah, ayah, pos))
+        if row:
+            return row
+    return MISSING_TOKEN
@@ -0,0 +1,271 @@
+"""Compact, array-backed index of Quran words keyed by (surah, ayah, position).
+
+The dict-of-tuples indexes the importers used to build cost a few hundred
+bytes per word. ``QuranWordIndex`` keeps one sorted ``array("I")`` of
+``pack_word_key`` values, a dense per-ayah table of where each ayah's keys
+start, and each word's fields as one ``\x1f``-separated UTF-8 span in a
+shared pool addressed by an offsets array (a per-word NULL bitmask keeps
+NULL distinct from ""). A lookup jumps to the word's slot inside its ayah,
+checks the key, and decodes only that span.
+
+Build it from ``ar_occ_token`` (fields: ar_token_occ_id, ar_u_token,
+surface_ar, norm_ar) or from the Salam dump (fields: simple, text), and
+``save`` it to a file that ``QuranWordIndex.open`` memory-maps read-only.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+from quran_tokens import TOKEN_STAGE_TABLE, stage_quran_tokens
+from quran_words import WordKey, iter_salam_words, pack_word_key, unpack_word_key
+
+TOKEN_FIELDS = ("ar_token_occ_id", "ar_u_token", "surface_ar", "norm_ar")
+SALAM_FIELDS = ("simple", "text")
+
+# File layout: header, field names (JSON), keys, surah slots, ayah starts and
+# row offsets (uint32), NULL masks (uint8), then the UTF-8 string pool.
+INDEX_MAGIC = b"QWIDX001"
+_INDEX_HEADER = struct.Struct("<8s?3xIIIIIQ")
+
+FIELD_SEPARATOR = "\x1f"
+MAX_FIELDS = 8
+
+IndexValue = Tuple[Optional[str], ...]
+_Buffer = Union[array, memoryview]
+
+
+class QuranWordIndex(Mapping):
+    """Read-only (surah, ayah, position) -> tuple-of-fields mapping over packed arrays."""
+
+    def __init__(
+        self,
+        fields: Sequence[str],
+        keys: _Buffer,
+        surah_slots: _Buffer,
+        ayah_starts: _Buffer,
+        offsets: _Buffer,
+        nulls: _Buffer,
+        blob: Union[bytes, memoryview],
+    ) -> None:
+        self.fields = tuple(fields)
+        self._width = len(self.fields)
+        self._keys = keys
+        self._surah_slots = surah_slots
+        self._ayah_starts = ayah_starts
+        self._offsets = offsets
+        self._nulls = nulls
+        self._blob = blob
+        self._mmap: Optional[mmap.mmap] = None
+
+    # --- building -------------------------------------------------------------
+
+    @classmethod
+    def from_rows(
+        cls, fields: Sequence[str], rows: Iterable[Tuple[WordKey, Sequence[Optional[str]]]]
+    ) -> "QuranWordIndex":
+        """Build from ((surah, ayah, position), values) pairs; the first pair per key wins."""
+        width = len(fields)
+        if not 0 < width <= MAX_FIELDS:
+            raise ValueError(f"QuranWordIndex holds 1 to {MAX_FIELDS} fields, got {width}")
+        by_key = {}
+        for key, values in rows:
+            if len(values) != width:
+                raise ValueError(f"Expected {width} values for {key}, got {len(values)}")
+            by_key.setdefault(pack_word_key(*key), values)
+
+        keys = array("I", sorted(by_key))
+        offsets = array("I", [0])
+        nulls = array("B")
+        blob = bytearray()
+        max_ayah = {}
+        for packed in keys:
+            values = by_key[packed]
+            mask = 0
+            for column, value in enumerate(values):
+                if value is None:
+                    mask |= 1 << column
+                elif FIELD_SEPARATOR in value:
+                    raise ValueError(f"Value for {unpack_word_key(packed)} contains the field separator")
+            nulls.append(mask)
+            blob += FIELD_SEPARATOR.join(value or "" for value in values).encode("utf-8")
+            offsets.append(len(blob))
+            surah, ayah, _ = unpack_word_key(packed)
+            max_ayah[surah] = max(ayah, max_ayah.get(surah, 0))
+
+        # Slot surah_slots[s] + a holds (s, a); ayah_starts[slot:slot + 2] bound its keys.
+        top_surah = max(max_ayah, default=-1)
+        surah_slots = array("I", [0] * (top_surah + 2))
+        for surah in range(top_surah + 1):
+            surah_slots[surah + 1] = surah_slots[surah] + max_ayah.get(surah, -1) + 1
+        ayah_starts = array("I", [0] * (surah_slots[-1] + 1))
+        for index, packed in enumerate(keys):
+            surah, ayah, _ = unpack_word_key(packed)
+            ayah_starts[surah_slots[surah] + ayah + 1] = index + 1
+        for slot in range(1, len(ayah_starts)):
+            # Slots without words end where the previous one did.
+            ayah_starts[slot] = max(ayah_starts[slot], ayah_starts[slot - 1])
+        return cls(fields, keys, surah_slots, ayah_starts, offsets, nulls, bytes(blob))
+
+    @classmethod
+    def from_ar_occ_token(cls, conn: sqlite3.Connection) -> "QuranWordIndex":
+        """Index every Quran token; duplicate positions resolve like stage_quran_tokens (first row wins)."""
+        stage_quran_tokens(conn)
+        rows = conn.execute(
+            f"""
+            SELECT surah, ayah, pos_index, ar_token_occ_id, ar_u_token, surface_ar, norm_ar
+            FROM temp.{TOKEN_STAGE_TABLE}
+            """
+        )
+        return cls.from_rows(TOKEN_FIELDS, (((surah, ayah, pos), values) for surah, ayah, pos, *values in rows))
+
+    @classmethod
+    def from_salam_dump(cls, path: Path) -> "QuranWordIndex":
+        """Index the Salam words dump; as with load_salam_word_map, the last row per key wins."""
+        return cls.from_rows(SALAM_FIELDS, dict(iter_salam_words(path)).items())
+
+    # --- persistence ----------------------------------------------------------
+
+    def _parts(self) -> Tuple[_Buffer, ...]:
+        return self._keys, self._surah_slots, self._ayah_starts, self._offsets, self._nulls
+
+    def save(self, path: Path) -> Path:
+        names = json.dumps(self.fields).encode("utf-8")
+        header = _INDEX_HEADER.pack(
+            INDEX_MAGIC,
+            sys.byteorder == "little",
+            self._width,
+            len(self._keys),
+            len(self._surah_slots),
+            len(self._ayah_starts),
+            len(names),
+            len(self._blob),
+        )
+        tmp_path = path.with_name(path.name + ".tmp")
+        with tmp_path.open("wb") as fh:
+            fh.write(header)
+            fh.write(names)
+            for part in self._parts():
+                fh.write(part)
+            fh.write(self._blob)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def open(cls, path: Path) -> "QuranWordIndex":
+        """Memory-map an index written by ``save``; the arrays stay in the page cache, not the heap."""
+        with path.open("rb") as fh:
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _INDEX_HEADER.unpack_from(mapped)
+        magic, little_endian, width, count, surah_len, ayah_len, names_len, blob_len = header
+        if magic != INDEX_MAGIC or little_endian != (sys.byteorder == "little"):
+            mapped.close()
+            raise ValueError(f"{path} is not a Quran word index for this platform")
+        view = memoryview(mapped)
+        position = _INDEX_HEADER.size
+        fields = json.loads(bytes(view[position : position + names_len]))
+        position += names_len
+        parts = []
+        for length, code in (
+            (count, "I"),
+            (surah_len, "I"),
+            (ayah_len, "I"),
+            (count + 1, "I"),
+            (count, "B"),
+        ):
+            size = length * array(code).itemsize
+            parts.append(view[position : position + size].cast(code))
+            position += size
+        index = cls(fields, *parts, view[position : position + blob_len])
+        index._mmap = mapped
+        return index
+
+    def close(self) -> None:
+        if self._mmap is None:
+            return
+        for part in (*self._parts(), self._blob):
+            part.release()
+        self._mmap.close()
+        self._mmap = None
+
+    def __enter__(self) -> "QuranWordIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __reduce__(self):
+        # Pickled for worker processes: ship plain arrays, even when this copy is memory-mapped.
+        parts = tuple(part if isinstance(part, array) else array(part.format, part) for part in self._parts())
+        return type(self), (self.fields, *parts, bytes(self._blob))
+
+    # --- lookups --------------------------------------------------------------
+
+    def _find(self, surah: int, ayah: int, position: int) -> int:
+        """Row index of the key, or -1."""
+        if surah < 0 or ayah < 0 or not 0 <= position < 1024:
+            return -1
+        packed = (surah << 20) | (ayah << 10) | position
+        try:
+            slot = self._surah_slots[surah] + ayah
+            lo = self._ayah_starts[slot]
+            hi = self._ayah_starts[slot + 1]
+        except IndexError:
+            return -1
+        # An ayah past the surah's end lands in a later slot; the key check below rejects it.
+        keys = self._keys
+        if lo < hi:
+            # Positions within an ayah are nearly always consecutive: try the direct slot first.
+            guess = lo + position - (keys[lo] & 0x3FF)
+            if lo <= guess < hi and keys[guess] == packed:
+                return guess
+            index = bisect_left(keys, packed, lo, hi)
+            if index < hi and keys[index] == packed:
+                return index
+        return -1
+
+    def _row(self, index: int) -> IndexValue:
+        values = str(self._blob[self._offsets[index] : self._offsets[index + 1]], "utf-8").split(FIELD_SEPARATOR)
+        mask = self._nulls[index]
+        if mask:
+            return tuple(None if mask >> column & 1 else value for column, value in enumerate(values))
+        return tuple(values)
+
+    def get(self, key: WordKey, default=None):
+        index = self._find(*key)
+        return self._row(index) if index >= 0 else default
+
+    def __getitem__(self, key: WordKey) -> IndexValue:
+        try:
+            index = self._find(*key)
+        except TypeError:
+            raise KeyError(key) from None
+        if index < 0:
+            raise KeyError(key)
+        return self._row(index)
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            return self._find(*key) >= 0  # type: ignore[misc]
+        except TypeError:
+            return False
+
+    def __iter__(self) -> Iterator[WordKey]:
+        return (unpack_word_key(packed) for packed in self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def nbytes(self) -> int:
+        """Bytes held by the arrays and string pool."""
+        return sum(part.itemsize * len(part) for part in self._parts()) + len(self._blob)
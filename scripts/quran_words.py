@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import csv
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import ItemsView, Mapping
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
 
 WordKey = Tuple[int, int, int]
@@ -19,54 +28,28 @@ SIMPLE_SPELLING_OVERRIDES = {
 }
 
 
-def _parse_word_row(line: str) -> Optional[List[str]]:
-    """Split a single INSERT row into individual column strings."""
-    row = line.strip()
-    if not row or not row.startswith("("):
-        return None
-    row = row.rstrip(",;")
-    if row.startswith("("):
-        row = row[1:]
-    if row.endswith(")"):
-        row = row[:-1]
-
-    columns: List[str] = []
-    buffer: List[str] = []
-    in_quote = False
-    i = 0
-    while i < len(row):
-        ch = row[i]
-        if in_quote:
-            if ch == "\\" and i + 1 < len(row):
-                buffer.append(row[i + 1])
-                i += 2
-                continue
-            if ch == "'" and i + 1 < len(row) and row[i + 1] == "'":
-                buffer.append("'")
-                i += 2
-                continue
-            if ch == "'":
-                in_quote = False
-                i += 1
-                continue
-            buffer.append(ch)
-            i += 1
-            continue
-        if ch == "'":
-            in_quote = True
-            i += 1
-            continue
-        if ch == ",":
-            columns.append("".join(buffer).strip())
-            buffer = []
-            i += 1
-            continue
-        buffer.append(ch)
-        i += 1
+# Rows in the dump are MySQL-style value tuples: strings are single-quoted,
+# with both backslash escapes and doubled quotes.
+SALAM_ROW_DIALECT = {
+    "delimiter": ",",
+    "quotechar": "'",
+    "escapechar": "\\",
+    "doublequote": True,
+    "skipinitialspace": True,
+    "strict": False,
+}
+
 
-    if buffer:
-        columns.append("".join(buffer).strip())
-    return columns
+def _iter_row_bodies(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the inside of every ``(...)`` value tuple, one per dump line."""
+    for line in lines:
+        row = line.strip()
+        if not row.startswith("("):
+            continue
+        row = row.rstrip(",;")[1:]
+        if row.endswith(")"):
+            row = row[:-1]
+        yield row
 
 
 def _normalize_value(value: str) -> Optional[str]:
@@ -82,15 +65,17 @@ def _normalize_simple_spelling(value: Optional[str]) -> Optional[str]:
     return SIMPLE_SPELLING_OVERRIDES.get(value, value)
 
 
-def load_salam_word_map(path: Path) -> Dict[WordKey, WordValue]:
-    """Load the salamquran_quran_words dataset and return (surah, ayah, position) -> (simple, text)."""
+def iter_salam_words(path: Path) -> Iterator[Tuple[WordKey, WordValue]]:
+    """Stream ((surah, ayah, position), (simple, text)) pairs from the salamquran_quran_words dump.
+
+    Rows are yielded in file order as they are parsed; nothing is buffered, so
+    callers can start writing before the dump has been read to the end.
+    """
     if not path.exists():
         raise FileNotFoundError(f"Quran words dump missing: {path}")
-    mapping: Dict[WordKey, WordValue] = {}
-    with path.open(encoding="utf-8") as fh:
-        for line in fh:
-            columns = _parse_word_row(line)
-            if not columns or len(columns) < 7:
+    with path.open(encoding="utf-8", newline="") as fh:
+        for columns in csv.reader(_iter_row_bodies(fh), **SALAM_ROW_DIALECT):
+            if len(columns) < 7:
                 continue
             try:
                 aya = int(columns[1])
@@ -102,5 +87,198 @@ def load_salam_word_map(path: Path) -> Dict[WordKey, WordValue]:
             simple = _normalize_simple_spelling(_normalize_value(columns[6]))
             if text is None and simple is None:
                 continue
-            mapping[(surah, aya, position)] = (simple, text)
-    return mapping
+            yield (surah, aya, position), (simple, text)
+
+
+def load_salam_word_map(path: Path) -> Dict[WordKey, WordValue]:
+    """Load the salamquran_quran_words dataset and return (surah, ayah, position) -> (simple, text)."""
+    return dict(iter_salam_words(path))
+
+
+# On-disk word cache layout: header, sorted packed keys (uint32), 2n+1 string
+# offsets (uint32) and a UTF-8 blob holding simple/text back to back per key.
+SALAM_CACHE_MAGIC = b"SALAMWC1"
+SALAM_CACHE_SUFFIX = ".wordcache"
+_CACHE_HEADER = struct.Struct("<8s?3xIQQ32sI")
+
+
+def pack_word_key(surah: int, ayah: int, position: int) -> int:
+    """Pack (surah, ayah, position) into one sortable 32-bit integer."""
+    if not (0 <= ayah < 1024 and 0 <= position < 1024 and 0 <= surah < 4096):
+        raise ValueError(f"Word key out of range: {surah}:{ayah}:{position}")
+    return (surah << 20) | (ayah << 10) | position
+
+
+def unpack_word_key(packed: int) -> WordKey:
+    return packed >> 20, (packed >> 10) & 0x3FF, packed & 0x3FF
+
+
+def default_cache_path(path: Path) -> Path:
+    return path.with_name(path.name + SALAM_CACHE_SUFFIX)
+
+
+def _file_sha256(path: Path) -> bytes:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def build_salam_word_cache(path: Path, cache_path: Optional[Path] = None) -> Path:
+    """Parse the dump once and write the memory-mappable word cache next to it."""
+    cache_path = cache_path or default_cache_path(path)
+    # Fingerprint before parsing so an edit made mid-build invalidates the result.
+    stat = path.stat()
+    sha = _file_sha256(path)
+    words = dict(iter_salam_words(path))
+
+    keys = array("I")
+    offsets = array("I", [0])
+    blob = bytearray()
+    for key in sorted(words):
+        simple, text = words[key]
+        keys.append(pack_word_key(*key))
+        blob += (simple or "").encode("utf-8")
+        offsets.append(len(blob))
+        blob += (text or "").encode("utf-8")
+        offsets.append(len(blob))
+
+    header = _CACHE_HEADER.pack(
+        SALAM_CACHE_MAGIC,
+        sys.byteorder == "little",
+        len(keys),
+        stat.st_size,
+        stat.st_mtime_ns,
+        sha,
+        len(blob),
+    )
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    with tmp_path.open("wb") as fh:
+        fh.write(header)
+        keys.tofile(fh)
+        offsets.tofile(fh)
+        fh.write(blob)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def _cache_is_fresh(path: Path, cache_path: Path) -> bool:
+    """Check the cache header against the dump's size, mtime and sha256."""
+    try:
+        with cache_path.open("rb") as fh:
+            raw = fh.read(_CACHE_HEADER.size)
+    except FileNotFoundError:
+        return False
+    if len(raw) != _CACHE_HEADER.size:
+        return False
+    magic, little_endian, count, size, mtime_ns, sha, blob_len = _CACHE_HEADER.unpack(raw)
+    if magic != SALAM_CACHE_MAGIC or little_endian != (sys.byteorder == "little"):
+        return False
+    stat = path.stat()
+    if stat.st_size != size:
+        return False
+    if stat.st_mtime_ns == mtime_ns:
+        return True
+    if _file_sha256(path) != sha:
+        return False
+    # Same content with a new mtime (e.g. a fresh checkout): refresh the header
+    # so the next run skips hashing again.
+    with cache_path.open("r+b") as fh:
+        fh.write(_CACHE_HEADER.pack(magic, little_endian, count, size, stat.st_mtime_ns, sha, blob_len))
+    return True
+
+
+class _SalamItemsView(ItemsView):
+    def __iter__(self) -> Iterator[Tuple[WordKey, WordValue]]:
+        yield from self._mapping._iter_items()
+
+
+class SalamWordMap(Mapping):
+    """Read-only (surah, ayah, position) -> (simple, text) view over the word cache.
+
+    The cache is validated (and rebuilt if the dump changed) on first access,
+    then memory-mapped; lookups bisect the packed key table and decode only
+    the two strings they return.
+    """
+
+    def __init__(self, path: Path, cache_path: Optional[Path] = None) -> None:
+        if not path.exists():
+            raise FileNotFoundError(f"Quran words dump missing: {path}")
+        self.path = path
+        self.cache_path = cache_path or default_cache_path(path)
+        self._mmap: Optional[mmap.mmap] = None
+        self._keys: Optional[memoryview] = None
+        self._offsets: Optional[memoryview] = None
+        self._blob: Optional[memoryview] = None
+
+    def _load(self) -> memoryview:
+        if self._keys is not None:
+            return self._keys
+        if not _cache_is_fresh(self.path, self.cache_path):
+            build_salam_word_cache(self.path, self.cache_path)
+        with self.cache_path.open("rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _CACHE_HEADER.unpack_from(self._mmap)
+        count, blob_len = header[2], header[6]
+        view = memoryview(self._mmap)
+        start = _CACHE_HEADER.size
+        keys_end = start + 4 * count
+        offsets_end = keys_end + 4 * (2 * count + 1)
+        self._keys = view[start:keys_end].cast("I")
+        self._offsets = view[keys_end:offsets_end].cast("I")
+        self._blob = view[offsets_end : offsets_end + blob_len]
+        return self._keys
+
+    def _value_at(self, index: int) -> WordValue:
+        offsets = self._offsets
+        blob = self._blob
+        start, middle, end = offsets[2 * index], offsets[2 * index + 1], offsets[2 * index + 2]
+        simple = str(blob[start:middle], "utf-8") if middle > start else None
+        text = str(blob[middle:end], "utf-8") if end > middle else None
+        return simple, text
+
+    def _iter_items(self) -> Iterator[Tuple[WordKey, WordValue]]:
+        keys = self._load()
+        for index, packed in enumerate(keys):
+            yield unpack_word_key(packed), self._value_at(index)
+
+    def __getitem__(self, key: WordKey) -> WordValue:
+        keys = self._load()
+        try:
+            packed = pack_word_key(*key)
+        except (TypeError, ValueError):
+            raise KeyError(key) from None
+        index = bisect_left(keys, packed)
+        if index == len(keys) or keys[index] != packed:
+            raise KeyError(key)
+        return self._value_at(index)
+
+    def __iter__(self) -> Iterator[WordKey]:
+        return (unpack_word_key(packed) for packed in self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def items(self) -> _SalamItemsView:
+        return _SalamItemsView(self)
+
+    def close(self) -> None:
+        for view in (self._keys, self._offsets, self._blob):
+            if view is not None:
+                view.release()
+        self._keys = self._offsets = self._blob = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "SalamWordMap":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def open_salam_word_map(path: Path, cache_path: Optional[Path] = None) -> SalamWordMap:
+    """Return a lazily loaded, cache-backed word map for the Salam dump."""
+    return SalamWordMap(path, cache_path)
@@ -1,29 +1,88 @@
 #!/usr/bin/env python3
-"""Rebuild database/data/roots/tarteel.ai/roots-only.sql with the current ar_u_roots schema."""
+"""Rebuild database/data/roots/tarteel.ai/roots-only.sql with the current ar_u_roots schema.
+
+The seed is streamed to disk as multi-row INSERT statements kept under D1's
+per-statement limit, in legacy-id order, then rebuilds the ar_u_roots search
+index (dropping the table drops its FTS triggers) and ends with a checksum
+comment.
+``--snapshot`` also writes the rows as JSONL for seed_ar_u_roots.py.
+"""
 
 from __future__ import annotations
 
+import argparse
+import gzip
 import hashlib
 import json
 import os
 import re
-import sqlite3
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from canonical_ids import canonical_ids
+from quran_search import render_search_index_sql
+from word_updates_sql import D1_MAX_STATEMENT_BYTES, DEFAULT_MAX_ROWS
+from tarteel_roots import RootRow, load_tarteel_roots
 
 ROOTS_SQL = Path("database/data/roots/tarteel.ai/allroots.sql")
 TARGET_SQL = Path("database/data/roots/tarteel.ai/roots-only.sql")
 
+ROOT_COLUMNS = (
+    "ar_u_root",
+    "canonical_input",
+    "root",
+    "root_norm",
+    "arabic_trilateral",
+    "english_trilateral",
+    "root_latn",
+    "alt_latn_json",
+    "search_keys_norm",
+    "status",
+    "difficulty",
+    "frequency",
+    "created_at",
+    "updated_at",
+    "extracted_at",
+    "meta_json",
+)
+SCHEMA_SQL = """CREATE TABLE ar_u_roots (
+  ar_u_root        TEXT PRIMARY KEY,
+  canonical_input  TEXT NOT NULL UNIQUE,
 
-def canonicalize(value: str) -> str:
-    normalized = re.sub(r"\s+", " ", value or "").strip()
-    return re.sub(r"[A-Z]", lambda match: match.group(0).lower(), normalized)
+  root             TEXT NOT NULL,
+  root_norm        TEXT NOT NULL UNIQUE,
 
+  arabic_trilateral TEXT,
+  english_trilateral TEXT,
+  root_latn         TEXT,
 
-def sha256_hex(input_value: str) -> Tuple[str, str]:
-    canonical = canonicalize(input_value)
-    digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
-    return digest, canonical
+  alt_latn_json     JSON CHECK (alt_latn_json IS NULL OR json_valid(alt_latn_json)),
+  search_keys_norm  TEXT,
+
+  status            TEXT NOT NULL DEFAULT 'active',
+  difficulty        INTEGER,
+  frequency         TEXT,
+
+  created_at        TEXT NOT NULL DEFAULT (datetime('now')),
+  updated_at        TEXT,
+  extracted_at      TEXT,
+  meta_json         JSON CHECK (meta_json IS NULL OR json_valid(meta_json))
+);
+"""
+SEED_HEADER = (
+    "-- Tarteel.ai root export aligned with ar_u_roots\n"
+    "DROP TABLE IF EXISTS ar_u_roots;\n" + SCHEMA_SQL + "\n"
+)
+# Dropping ar_u_roots also drops the ar_u_root_fts triggers, so the seed rebuilds that index last.
+SEED_FOOTER = (
+    "-- Rebuild the ar_u_roots search index (see scripts/quran_search.py).\n"
+    + render_search_index_sql(["root"], header=False)
+)
+INSERT_HEAD = "INSERT INTO ar_u_roots VALUES\n"
+_ROW_SEPARATOR = ",\n"
+# Last line of the seed file: sha256 of every byte before it, plus the row count.
+CHECKSUM_PREFIX = "-- sha256 "
+SNAPSHOT_VERSION = 1
 
 
 def normalize_text(value: Any) -> Optional[str]:
@@ -77,7 +136,7 @@ def collect_search_keys(values: list[tuple[Any, bool]]) -> Optional[str]:
     return " ".join(tokens) if tokens else None
 
 
-def build_meta(row: sqlite3.Row) -> Optional[Dict[str, Any]]:
+def build_meta(row: RootRow) -> Optional[Dict[str, Any]]:
     meta: Dict[str, Any] = {}
 
 
@@ -133,13 +192,13 @@ def extract_first_string(value: Any) -> Optional[str]:
     return None
 
 
-def dump_rows(rows: Iterable[sqlite3.Row]) -> tuple[str, int]:
-    lines = []
+def iter_root_values(rows: Iterable[RootRow]) -> Iterator[List[Any]]:
+    """ar_u_roots value lists in ROOT_COLUMNS order, first row per canonical input wins."""
     seen_canonical: set[str] = set()
-    for row in rows:
-        root_norm = normalize_text(row["c17"]) or normalize_text(row["c5"]) or ""
-        canonical_template = f"ROOT|{root_norm}"
-        ar_u_root, canonical_input = sha256_hex(canonical_template)
+    rows = list(rows)
+    root_norms = [normalize_text(row["c17"]) or normalize_text(row["c5"]) or "" for row in rows]
+    root_ids = canonical_ids(f"ROOT|{root_norm}" for root_norm in root_norms)
+    for row, root_norm, (ar_u_root, canonical_input) in zip(rows, root_norms, root_ids):
         if canonical_input in seen_canonical:
             continue
         seen_canonical.add(canonical_input)
@@ -163,7 +222,7 @@ def dump_rows(rows: Iterable[sqlite3.Row]) -> tuple[str, int]:
             ]
         )
 
-        values = [
+        yield [
             ar_u_root,
             canonical_input,
             normalize_text(row["c3"]) or "",
@@ -182,58 +241,143 @@ def dump_rows(rows: Iterable[sqlite3.Row]) -> tuple[str, int]:
             meta_json,
         ]
 
-        lines.append(f"INSERT INTO ar_u_roots VALUES({', '.join(sql_literal(v) for v in values)});")
-    return "\n".join(lines), len(lines)
-
-
-def main() -> None:
-    if not ROOTS_SQL.exists():
-        raise SystemExit(f"Missing {ROOTS_SQL}")
-
-    script = f"CREATE TABLE roots ({', '.join(f'c{i} TEXT' for i in range(1, 22))});\n"
-    relevant_lines = [
-        line
-        for line in ROOTS_SQL.read_text().splitlines()
-        if line.strip().startswith("INSERT INTO roots")
-    ]
-    script += "\n".join(relevant_lines) + "\n"
-
-    conn = sqlite3.connect(":memory:")
-    conn.row_factory = sqlite3.Row
-    conn.executescript(script)
-
-    rows = sorted(conn.execute("SELECT * FROM roots"), key=lambda r: int(r["c1"]))
-
-    header = """-- Tarteel.ai root export aligned with ar_u_roots
-DROP TABLE IF EXISTS ar_u_roots;
-CREATE TABLE ar_u_roots (
-  ar_u_root        TEXT PRIMARY KEY,
-  canonical_input  TEXT NOT NULL UNIQUE,
 
-  root             TEXT NOT NULL,
-  root_norm        TEXT NOT NULL UNIQUE,
+def iter_insert_statements(
+    value_rows: Iterable[List[Any]],
+    max_bytes: int = D1_MAX_STATEMENT_BYTES,
+    max_rows: int = DEFAULT_MAX_ROWS,
+) -> Iterator[Tuple[str, int]]:
+    """Yield (statement, row_count) multi-row INSERTs, each at most max_bytes of UTF-8."""
+    frame_bytes = len(INSERT_HEAD.encode("utf-8")) + len(";\n")
+    separator_bytes = len(_ROW_SEPARATOR)
+    literals: List[str] = []
+    size = frame_bytes
+    for values in value_rows:
+        literal = f"({', '.join(sql_literal(v) for v in values)})"
+        literal_bytes = len(literal.encode("utf-8"))
+        if frame_bytes + literal_bytes > max_bytes:
+            raise ValueError(f"Root {values[0]} alone exceeds the {max_bytes}-byte statement limit.")
+        added = literal_bytes + (separator_bytes if literals else 0)
+        if literals and (len(literals) >= max_rows or size + added > max_bytes):
+            yield INSERT_HEAD + _ROW_SEPARATOR.join(literals) + ";\n", len(literals)
+            literals, size = [], frame_bytes
+            added = literal_bytes
+        literals.append(literal)
+        size += added
+    if literals:
+        yield INSERT_HEAD + _ROW_SEPARATOR.join(literals) + ";\n", len(literals)
+
+
+class SnapshotWriter:
+    """JSONL snapshot for local seeding: a header line with the columns, then one JSON array per row."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.tmp_path = path.with_name(path.name + ".tmp")
+        raw = self.tmp_path.open("wb")
+        # mtime=0 keeps the gzip bytes identical between runs over the same export.
+        self.handle = gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) if path.suffix == ".gz" else raw
+        self.raw = raw
+        self._write({"version": SNAPSHOT_VERSION, "table": "ar_u_roots", "columns": list(ROOT_COLUMNS)})
+
+    def _write(self, item: Any) -> None:
+        self.handle.write(json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    def write(self, values: List[Any]) -> None:
+        self._write(values)
+
+    def close(self, keep: bool = True) -> None:
+        self.handle.close()
+        if self.handle is not self.raw:
+            self.raw.close()
+        if keep:
+            os.replace(self.tmp_path, self.path)
+        else:
+            self.tmp_path.unlink(missing_ok=True)
+
+
+def write_seed_sql(
+    value_rows: Iterable[List[Any]],
+    target: Path,
+    max_bytes: int = D1_MAX_STATEMENT_BYTES,
+    max_rows: int = DEFAULT_MAX_ROWS,
+    snapshot: Optional[SnapshotWriter] = None,
+) -> Tuple[int, int, str]:
+    """Stream the seed file to disk; returns (rows, statements, sha256 of everything above the trailer)."""
+    digest = hashlib.sha256()
+    exported = statements = 0
+    tmp_path = target.with_name(target.name + ".tmp")
+    with tmp_path.open("wb") as fh:
+
+        def emit(text: str) -> None:
+            data = text.encode("utf-8")
+            digest.update(data)
+            fh.write(data)
+
+        emit(SEED_HEADER)
+        for statement, count in iter_insert_statements(
+            _tee(value_rows, snapshot), max_bytes=max_bytes, max_rows=max_rows
+        ):
+            emit(statement)
+            exported += count
+            statements += 1
+        emit(SEED_FOOTER)
+        checksum = digest.hexdigest()
+        fh.write(f"{CHECKSUM_PREFIX}{checksum} rows={exported}\n".encode("utf-8"))
+    os.replace(tmp_path, target)
+    return exported, statements, checksum
+
+
+def _tee(value_rows: Iterable[List[Any]], snapshot: Optional[SnapshotWriter]) -> Iterator[List[Any]]:
+    for values in value_rows:
+        if snapshot is not None:
+            snapshot.write(values)
+        yield values
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Write the ar_u_roots seed SQL from the tarteel.ai roots export.")
+    parser.add_argument("--roots-sql", type=Path, default=ROOTS_SQL, help="tarteel.ai allroots.sql dump.")
+    parser.add_argument("--output", type=Path, default=TARGET_SQL, help="Seed SQL file to write.")
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=D1_MAX_STATEMENT_BYTES,
+        help="Upper bound on the UTF-8 size of each INSERT statement (D1 rejects statements over 100 KB).",
+    )
+    parser.add_argument("--max-rows", type=int, default=DEFAULT_MAX_ROWS, help="Upper bound on rows per INSERT.")
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        help="Also write a JSONL snapshot (gzip-compressed when the name ends in .gz) for seed_ar_u_roots.py.",
+    )
+    return parser.parse_args()
 
-  arabic_trilateral TEXT,
-  english_trilateral TEXT,
-  root_latn         TEXT,
-
-  alt_latn_json     JSON CHECK (alt_latn_json IS NULL OR json_valid(alt_latn_json)),
-  search_keys_norm  TEXT,
 
-  status            TEXT NOT NULL DEFAULT 'active',
-  difficulty        INTEGER,
-  frequency         TEXT,
-
-  created_at        TEXT NOT NULL DEFAULT (datetime('now')),
-  updated_at        TEXT,
-  extracted_at      TEXT,
-  meta_json         JSON CHECK (meta_json IS NULL OR json_valid(meta_json))
-);
-
-"""
-    body, exported = dump_rows(rows)
-    TARGET_SQL.write_text(header + body + ("\n" if body else ""))
-    print(f"Wrote {exported} rows → {TARGET_SQL}")
+def main() -> None:
+    args = parse_args()
+    if not args.roots_sql.exists():
+        raise SystemExit(f"Missing {args.roots_sql}")
+    if args.max_rows < 1:
+        raise SystemExit("--max-rows must be at least 1.")
+
+    # load_tarteel_roots sorts by legacy id (c1, ties in file order), which fixes both
+    # which duplicate wins and the row order of the output.
+    rows = load_tarteel_roots(args.roots_sql)
+    snapshot = SnapshotWriter(args.snapshot) if args.snapshot else None
+    try:
+        exported, statements, checksum = write_seed_sql(
+            iter_root_values(rows), args.output, args.max_bytes, args.max_rows, snapshot
+        )
+    except ValueError as exc:
+        if snapshot is not None:
+            snapshot.close(keep=False)
+        raise SystemExit(str(exc)) from exc
+    if snapshot is not None:
+        snapshot.close()
+    print(f"Wrote {exported} rows in {statements} INSERT statements → {args.output} (sha256 {checksum[:12]})")
+    if snapshot is not None:
+        print(f"Wrote snapshot → {snapshot.path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Seed ar_u_roots in a local SQLite file from regenerate_ar_u_roots_sql.py output.
+
+Accepts either the JSONL snapshot (loaded with executemany) or the seed SQL,
+whose trailing checksum comment is verified before anything is executed.
+Both recreate the table, so both also rebuild its search index: the seed SQL
+ends with the ar_u_root_fts DDL, the snapshot path calls build_search_index.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import IO, Iterator, List, Tuple
+
+from quran_search import build_search_index
+from regenerate_ar_u_roots_sql import CHECKSUM_PREFIX, ROOT_COLUMNS, SCHEMA_SQL, SNAPSHOT_VERSION, TARGET_SQL
+
+BATCH_SIZE = 5000
+
+
+def verify_seed_sql(path: Path) -> Tuple[str, int]:
+    """Return (sql, rows) after checking the file against its trailing sha256 comment."""
+    data = path.read_bytes()
+    body, _, trailer = data.rstrip(b"\n").rpartition(b"\n")
+    trailer_text = trailer.decode("utf-8")
+    if not trailer_text.startswith(CHECKSUM_PREFIX):
+        raise ValueError(f"{path} has no checksum trailer; regenerate it with regenerate_ar_u_roots_sql.py")
+    checksum, _, rows = trailer_text[len(CHECKSUM_PREFIX):].partition(" rows=")
+    if hashlib.sha256(body + b"\n").hexdigest() != checksum:
+        raise ValueError(f"Checksum mismatch for {path}; the seed file is truncated or was edited.")
+    return body.decode("utf-8"), int(rows)
+
+
+def _open_snapshot(path: Path) -> IO[bytes]:
+    return gzip.open(path, "rb") if path.suffix == ".gz" else path.open("rb")
+
+
+def iter_snapshot_batches(path: Path, size: int = BATCH_SIZE) -> Iterator[List[list]]:
+    with _open_snapshot(path) as fh:
+        header = json.loads(fh.readline())
+        if header.get("version") != SNAPSHOT_VERSION or header.get("table") != "ar_u_roots":
+            raise ValueError(f"{path} is not an ar_u_roots snapshot (version {SNAPSHOT_VERSION}).")
+        if tuple(header.get("columns", ())) != ROOT_COLUMNS:
+            raise ValueError(f"{path} was written for different ar_u_roots columns; regenerate it.")
+        batch: List[list] = []
+        for line in fh:
+            batch.append(json.loads(line))
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def seed_from_snapshot(conn: sqlite3.Connection, path: Path) -> int:
+    insert_sql = f"INSERT INTO ar_u_roots ({', '.join(ROOT_COLUMNS)}) VALUES ({', '.join('?' for _ in ROOT_COLUMNS)})"
+    loaded = 0
+    with conn:
+        conn.execute("DROP TABLE IF EXISTS ar_u_roots")
+        conn.execute(SCHEMA_SQL)
+        for batch in iter_snapshot_batches(path):
+            conn.executemany(insert_sql, batch)
+            loaded += len(batch)
+    build_search_index(conn, ["root"])
+    return loaded
+
+
+def seed_from_sql(conn: sqlite3.Connection, path: Path) -> int:
+    sql, rows = verify_seed_sql(path)
+    # The seed drops and recreates ar_u_roots itself; run it as one transaction.
+    conn.executescript("BEGIN;\n" + sql + "\nCOMMIT;")
+    return rows
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load the ar_u_roots seed into a local SQLite database.")
+    parser.add_argument("--db", type=Path, required=True, help="SQLite file to seed (created if missing).")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--snapshot", type=Path, help="JSONL(.gz) snapshot from regenerate_ar_u_roots_sql.py.")
+    source.add_argument("--sql", type=Path, default=TARGET_SQL, help="Seed SQL file with a checksum trailer.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    source = args.snapshot or args.sql
+    if not source.exists():
+        raise SystemExit(f"Seed source missing: {source}")
+    started = time.perf_counter()
+    conn = sqlite3.connect(args.db)
+    try:
+        loaded = seed_from_snapshot(conn, source) if args.snapshot else seed_from_sql(conn, source)
+        (count,) = conn.execute("SELECT COUNT(*) FROM ar_u_roots").fetchone()
+    except (ValueError, sqlite3.Error) as exc:
+        raise SystemExit(str(exc)) from exc
+    finally:
+        conn.close()
+    if count != loaded:
+        raise SystemExit(f"Expected {loaded} rows from {source}, found {count} in {args.db}.")
+    print(f"Seeded {count} ar_u_roots rows from {source} in {time.perf_counter() - started:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Streaming readers for the tarteel.ai ``phrases.json`` and ``phrase_verses.json`` exports.
+
+``phrases.json`` is one JSON object keyed by phrase id::
+
+    {"50": {"surahs": 32, "ayahs": 70, "count": 71,
+            "source": {"key": "2:23", "from": 15, "to": 17},
+            "ayah": {"19:48": [[4, 6]], "29:17": [[13, 15], [3, 5]], ...}}, ...}
+
+where every ``[from, to]`` pair is an inclusive, 1-based word range of the
+ayah (the same numbering as quran_ayah_lemma_location.token_index), and
+``phrase_verses.json`` maps each ayah key to the ids of the phrases in it.
+
+``iter_json_members`` walks a top-level JSON object one member at a time:
+it reads the file in chunks and hands each member to
+``json.JSONDecoder.raw_decode``, so only the current member and one chunk
+are held in memory, the way ``ijson.kvitems(fh, "")`` would without the
+extra dependency.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Iterator, List, NamedTuple, TextIO, Tuple
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+_AYAH_KEY_RE = re.compile(r"(\d+):(\d+)")
+
+
+class PhraseRange(NamedTuple):
+    phrase_id: int
+    surah: int
+    ayah: int
+    word_from: int
+    word_to: int
+
+
+class Phrase(NamedTuple):
+    phrase_id: int
+    source_surah: int
+    source_ayah: int
+    source_from: int
+    source_to: int
+    # Counts as declared by the export; a few phrases list fewer ranges than they claim.
+    surahs: int
+    ayahs: int
+    occurrences: int
+    ranges: Tuple[PhraseRange, ...]
+
+
+class _ChunkedJson:
+    """Decode consecutive JSON values and punctuation from a text stream read in chunks."""
+
+    def __init__(self, fh: TextIO, chunk_size: int) -> None:
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at the end of the stream."""
+        while True:
+            self.pos = _WHITESPACE_RE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return ""
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if not char or char not in expected:
+            found = repr(char) if char else "end of file"
+            raise ValueError(f"Expected one of {expected!r}, found {found}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Most likely a value cut off at the chunk boundary; a real error resurfaces at EOF.
+                if self._read_more():
+                    continue
+                raise
+            # A number ending exactly at the buffer end may continue in the next chunk.
+            if end == len(self.buffer) and self._read_more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_members(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(key, value)`` for each member of the top-level JSON object in ``path``, in file order."""
+    with path.open(encoding="utf-8") as fh:
+        reader = _ChunkedJson(fh, chunk_size)
+        reader.take("{")
+        if reader.peek() == "}":
+            reader.take("}")
+        else:
+            while True:
+                key = reader.value()
+                if not isinstance(key, str):
+                    raise ValueError(f"Expected an object key in {path}, found {key!r}")
+                reader.take(":")
+                yield key, reader.value()
+                if reader.take(",}") == "}":
+                    break
+        if reader.peek():
+            raise ValueError(f"Unexpected data after the top-level object in {path}")
+
+
+def parse_ayah_key(key: str) -> Tuple[int, int]:
+    """``"2:23"`` -> ``(2, 23)``."""
+    match = _AYAH_KEY_RE.fullmatch(key.strip())
+    if match is None:
+        raise ValueError(f"Invalid ayah key: {key!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def _phrase(phrase_key: str, entry: dict) -> Phrase:
+    phrase_id = int(phrase_key)
+    ranges: List[PhraseRange] = []
+    for ayah_key, pairs in entry.get("ayah", {}).items():
+        surah, ayah = parse_ayah_key(ayah_key)
+        for word_from, word_to in pairs:
+            if not 1 <= word_from <= word_to:
+                raise ValueError(f"Phrase {phrase_id}: invalid range {[word_from, word_to]} in {ayah_key}")
+            ranges.append(PhraseRange(phrase_id, surah, ayah, int(word_from), int(word_to)))
+    source = entry["source"]
+    source_surah, source_ayah = parse_ayah_key(source["key"])
+    return Phrase(
+        phrase_id,
+        source_surah,
+        source_ayah,
+        int(source["from"]),
+        int(source["to"]),
+        int(entry.get("surahs", 0)),
+        int(entry.get("ayahs", 0)),
+        int(entry.get("count", 0)),
+        tuple(ranges),
+    )
+
+
+def iter_phrases(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Phrase]:
+    """Yield every phrase in ``phrases.json`` with its word ranges, in file order."""
+    for phrase_key, entry in iter_json_members(path, chunk_size):
+        try:
+            yield _phrase(phrase_key, entry)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"{path}: phrase {phrase_key}: {exc}") from exc
+
+
+def iter_phrase_verses(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, int, List[int]]]:
+    """Yield ``(surah, ayah, phrase_ids)`` for every ayah in ``phrase_verses.json``."""
+    for ayah_key, phrase_ids in iter_json_members(path, chunk_size):
+        surah, ayah = parse_ayah_key(ayah_key)
+        yield surah, ayah, [int(phrase_id) for phrase_id in phrase_ids]
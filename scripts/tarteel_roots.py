@@ -0,0 +1,135 @@
+"""Streaming reader for the tarteel.ai ``allroots.sql`` dump.
+
+The dump is a sequence of ``INSERT INTO roots VALUES(...);`` lines whose 21
+columns the scripts address as ``c1`` .. ``c21`` (c1 is the legacy row id).
+The scripts used to replay those lines into an in-memory SQLite table just
+to read them back; ``iter_root_rows`` tokenizes the VALUES tuples directly
+and ``load_tarteel_roots`` returns them ordered by c1, backed by a parsed
+JSON cache (``allroots.sql.parsed.json``) next to the dump.
+
+Values come back the way the old ``c<N> TEXT`` table returned them: strings
+(numbers converted by TEXT affinity) or None for NULL.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Iterator, List, NamedTuple, Optional, Union
+
+from import_manifest import file_sha256
+
+ROOT_COLUMNS = 21
+ROOTS_INSERT_PREFIX = "INSERT INTO roots"
+ROOTS_CACHE_SUFFIX = ".parsed.json"
+ROOTS_CACHE_VERSION = 1
+
+_RootRowBase = NamedTuple(
+    "_RootRowBase", [(f"c{index}", Optional[str]) for index in range(1, ROOT_COLUMNS + 1)]
+)
+
+
+class RootRow(_RootRowBase):
+    """One ``roots`` tuple; also indexable as ``row["c5"]`` like the sqlite3.Row it replaces."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: Union[int, slice, str]) -> Any:
+        if isinstance(key, str):
+            return getattr(self, key)
+        return super().__getitem__(key)
+
+    @property
+    def legacy_id(self) -> int:
+        return int(self.c1 or 0)
+
+
+_VALUES_RE = re.compile(r"\bVALUES\b", re.IGNORECASE)
+# One alternative per token kind: quoted string, NULL, bare number, punctuation.
+_TOKEN_RE = re.compile(r"'((?:[^']|'')*)'|(NULL)\b|([-+.\w]+)|([(),;])", re.IGNORECASE)
+_INTEGER_RE = re.compile(r"[-+]?\d+")
+
+
+def _number_as_text(literal: str) -> str:
+    if _INTEGER_RE.fullmatch(literal):
+        return str(int(literal))
+    # SQLite renders REALs stored into TEXT columns with "%!.15g".
+    text = "%.15g" % float(literal)
+    return text if any(char in text for char in ".eni") else text + ".0"
+
+
+def _iter_value_tuples(values_sql: str, line_number: int) -> Iterator[List[Optional[str]]]:
+    row: Optional[List[Optional[str]]] = None
+    for string, null, number, punct in _TOKEN_RE.findall(values_sql):
+        if punct:
+            if punct == "(":
+                row = []
+            elif punct == ")":
+                if row is None:
+                    raise ValueError(f"Unbalanced ')' on line {line_number}")
+                yield row
+                row = None
+            continue
+        if row is None:
+            raise ValueError(f"Value outside a tuple on line {line_number}")
+        if null:
+            row.append(None)
+        elif number:
+            row.append(_number_as_text(number))
+        else:
+            row.append(string.replace("''", "'"))
+
+
+def iter_root_rows(path: Path) -> Iterator[RootRow]:
+    """Yield every ``INSERT INTO roots`` tuple in file order without loading the whole dump."""
+    with path.open(encoding="utf-8") as fh:
+        for line_number, line in enumerate(fh, start=1):
+            stripped = line.strip()
+            if not stripped.startswith(ROOTS_INSERT_PREFIX):
+                continue
+            keyword = _VALUES_RE.search(stripped)
+            if keyword is None:
+                raise ValueError(f"INSERT without VALUES on line {line_number} of {path}")
+            for values in _iter_value_tuples(stripped[keyword.end():], line_number):
+                if len(values) != ROOT_COLUMNS:
+                    raise ValueError(f"Expected {ROOT_COLUMNS} values on line {line_number}, got {len(values)}")
+                yield RootRow(*values)
+
+
+def default_cache_path(path: Path) -> Path:
+    return path.with_name(path.name + ROOTS_CACHE_SUFFIX)
+
+
+def load_tarteel_roots(
+    path: Path, cache_path: Optional[Path] = None, use_cache: bool = True, ordered: bool = True
+) -> List[RootRow]:
+    """All root rows, read from the parsed cache when it matches the dump's sha256.
+
+    Rows are sorted by c1 (stable, so equal ids keep file order); pass
+    ``ordered=False`` for plain file order, i.e. the rowid order of a table
+    loaded from the dump.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Missing {path}")
+    cache_path = cache_path or default_cache_path(path)
+    source_sha = file_sha256(path)
+    rows: Optional[List[RootRow]] = None
+    if use_cache and cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            cached = {}
+        if cached.get("version") == ROOTS_CACHE_VERSION and cached.get("sha256") == source_sha:
+            rows = [RootRow(*values) for values in cached["rows"]]
+    if rows is None:
+        rows = list(iter_root_rows(path))
+        if use_cache:
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            payload = {"version": ROOTS_CACHE_VERSION, "sha256": source_sha, "rows": rows}
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+    if ordered:
+        rows.sort(key=lambda row: row.legacy_id)
+    return rows
@@ -1,6 +1,8 @@
 import argparse
 import sqlite3
 
+from quran_word_index import QuranWordIndex
+
 
 def main():
     parser = argparse.ArgumentParser(description="Fast batch update for quran lemma word columns.")
@@ -10,11 +12,7 @@ def main():
     conn = sqlite3.connect('Database/d1.db')
     cur = conn.cursor()
 
-    tokens = {}
-    for unit_id, pos_index, surface, norm in cur.execute(
-        "SELECT unit_id, pos_index, surface_ar, norm_ar FROM ar_occ_token"
-    ):
-        tokens[(unit_id, pos_index)] = (surface, norm)
+    tokens = QuranWordIndex.from_ar_occ_token(conn)
 
     total = 0
     while True:
@@ -33,14 +31,13 @@ def main():
         for rid, surah, ayah, token_index in rows:
             word_simple = None
             word_diacritic = None
-            unit_id = f"U:QURAN:{surah}:{ayah}"
             for pos in (token_index - 1, token_index):
                 if pos < 0:
                     continue
-                token = tokens.get((unit_id, pos))
+                token = tokens.get((surah, ayah, pos))
                 if not token:
                     continue
-                surface, norm = token
+                _, _, surface, norm = token
                 if word_simple is None:
                     word_simple = norm or surface
                 if word_diacritic is None:
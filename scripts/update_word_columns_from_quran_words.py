@@ -3,8 +3,16 @@ from __future__ import annotations
 import argparse
 import sqlite3
 from pathlib import Path
+from typing import Dict, Mapping
 
-from quran_words import load_salam_word_map
+from quran_words import WordKey, WordValue, open_salam_word_map
+
+WORD_STAGE_TABLE = "salam_word_stage"
+
+# Rows whose stored columns differ from the dump; IS NOT treats NULLs as values.
+CHANGED_ROW_FILTER = (
+    "(loc.word_simple IS NOT w.word_simple OR loc.word_diacritic IS NOT w.word_diacritic)"
+)
 
 
 def parse_args() -> argparse.Namespace:
@@ -23,25 +31,27 @@ def parse_args() -> argparse.Namespace:
         default=Path("database/data/tarteel.ai/quran-meta/salamquran_quran_words.sql"),
         help="Path to the Salam Quran words SQL dump that provides the surface forms.",
     )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Stage the word map in an indexed temp table and apply it with one joined UPDATE.",
+    )
+    parser.add_argument(
+        "--only-changed",
+        action="store_true",
+        help="With --bulk, skip rows whose word columns already match the dump.",
+    )
     parser.add_argument("--dry-run", action="store_true", help="Do not persist changes.")
     return parser.parse_args()
 
 
-def main() -> None:
-    args = parse_args()
-    if not args.target_db.exists():
-        raise SystemExit(f"Target DB missing: {args.target_db}")
-    word_map = load_salam_word_map(args.quran_words)
-
-    conn = sqlite3.connect(args.target_db)
+def update_row_by_row(conn: sqlite3.Connection, word_map: Mapping[WordKey, WordValue]) -> None:
     cursor = conn.cursor()
     updated_positions = 0
     updated_rows = 0
     total = len(word_map)
 
     for idx, ((surah, ayah, position), (simple, diacritic)) in enumerate(word_map.items(), start=1):
-        if simple is None and diacritic is None:
-            continue
         cursor.execute(
             """
             UPDATE quran_ayah_lemma_location
@@ -56,6 +66,88 @@ def main() -> None:
         if idx % 5000 == 0:
             print(f"Processed {idx}/{total} words (positions updated: {updated_positions}).")
 
+    print(
+        f"Finished updating {updated_positions} quran word positions and {updated_rows} lemma rows "
+        f"using {total} entries from the Salam dump."
+    )
+
+
+def stage_word_map(conn: sqlite3.Connection, word_map: Mapping[WordKey, WordValue]) -> int:
+    conn.executescript(
+        f"""
+        DROP TABLE IF EXISTS temp.{WORD_STAGE_TABLE};
+        CREATE TEMP TABLE {WORD_STAGE_TABLE} (
+            surah INTEGER NOT NULL,
+            ayah INTEGER NOT NULL,
+            token_index INTEGER NOT NULL,
+            word_simple TEXT,
+            word_diacritic TEXT,
+            PRIMARY KEY (surah, ayah, token_index)
+        ) WITHOUT ROWID;
+        """
+    )
+    conn.executemany(
+        f"INSERT OR REPLACE INTO temp.{WORD_STAGE_TABLE} VALUES (?, ?, ?, ?, ?)",
+        ((surah, ayah, position, simple, diacritic) for (surah, ayah, position), (simple, diacritic) in word_map.items()),
+    )
+    return conn.execute(f"SELECT COUNT(*) FROM temp.{WORD_STAGE_TABLE}").fetchone()[0]
+
+
+def count_matches(conn: sqlite3.Connection) -> Dict[str, int]:
+    matched, changed = conn.execute(
+        f"""
+        SELECT COUNT(*), COALESCE(SUM({CHANGED_ROW_FILTER}), 0)
+        FROM quran_ayah_lemma_location AS loc
+        JOIN temp.{WORD_STAGE_TABLE} AS w
+            ON w.surah = loc.surah AND w.ayah = loc.ayah AND w.token_index = loc.token_index
+        """
+    ).fetchone()
+    positions = conn.execute(
+        f"""
+        SELECT COUNT(*)
+        FROM temp.{WORD_STAGE_TABLE} AS w
+        WHERE EXISTS (
+            SELECT 1 FROM quran_ayah_lemma_location AS loc
+            WHERE loc.surah = w.surah AND loc.ayah = w.ayah AND loc.token_index = w.token_index
+        )
+        """
+    ).fetchone()[0]
+    return {"matched": matched, "positions": positions, "changed": changed, "unchanged": matched - changed}
+
+
+def update_bulk(conn: sqlite3.Connection, word_map: Mapping[WordKey, WordValue], only_changed: bool) -> None:
+    staged = stage_word_map(conn, word_map)
+    counts = count_matches(conn)
+    cursor = conn.execute(
+        f"""
+        UPDATE quran_ayah_lemma_location AS loc
+        SET word_simple = w.word_simple, word_diacritic = w.word_diacritic
+        FROM temp.{WORD_STAGE_TABLE} AS w
+        WHERE w.surah = loc.surah AND w.ayah = loc.ayah AND w.token_index = loc.token_index
+        {"AND " + CHANGED_ROW_FILTER if only_changed else ""}
+        """
+    )
+    print(
+        f"Staged {staged} Salam words; {counts['positions']} positions match {counts['matched']} lemma rows "
+        f"({counts['changed']} changed, {counts['unchanged']} unchanged)."
+    )
+    print(f"Rewrote {cursor.rowcount} lemma rows{' (changed rows only)' if only_changed else ''}.")
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.target_db.exists():
+        raise SystemExit(f"Target DB missing: {args.target_db}")
+    if args.only_changed and not args.bulk:
+        raise SystemExit("--only-changed requires --bulk.")
+    word_map = open_salam_word_map(args.quran_words)
+
+    conn = sqlite3.connect(args.target_db)
+    if args.bulk:
+        update_bulk(conn, word_map, args.only_changed)
+    else:
+        update_row_by_row(conn, word_map)
+
     if args.dry_run:
         conn.rollback()
         print("Dry-run: changes rolled back.")
@@ -63,10 +155,7 @@ def main() -> None:
         conn.commit()
 
     conn.close()
-    print(
-        f"Finished updating {updated_positions} quran word positions and {updated_rows} lemma rows "
-        f"using {total} entries from the Salam dump."
-    )
+    word_map.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+"""Batched surface-word UPDATE statements for replaying local word columns on remote D1.
+
+Instead of one UPDATE per location, rows are packed into
+
+    UPDATE quran_ayah_lemma_location AS loc
+    SET word_simple = v.column4, word_diacritic = v.column5
+    FROM (VALUES (1, 1, 1, '...', '...'), ...) AS v
+    WHERE loc.surah = v.column1 AND loc.ayah = v.column2 AND loc.token_index = v.column3;
+
+statements, each kept under D1's per-statement size limit.
+
+A row manifest maps every exported (surah, ayah, token_index) to a hash
+of its word columns; passing the previous run's manifest (or a SQLite copy
+of the remote DB) as a baseline limits the export to rows that changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Cloudflare D1 rejects SQL statements longer than 100 KB.
+D1_MAX_STATEMENT_BYTES = 100_000
+# Rows per VALUES list; keeps each statement well inside SQLite's expression limits.
+DEFAULT_MAX_ROWS = 500
+
+WordRow = Tuple[int, int, int, Optional[str], Optional[str]]
+
+WORD_ROWS_SQL = """
+    SELECT surah, ayah, token_index, word_simple, word_diacritic
+    FROM quran_ayah_lemma_location
+    WHERE word_simple IS NOT NULL OR word_diacritic IS NOT NULL
+    ORDER BY surah, ayah, token_index
+"""
+
+UPDATE_HEAD = (
+    "UPDATE quran_ayah_lemma_location AS loc\n"
+    "SET word_simple = v.column4, word_diacritic = v.column5\n"
+    "FROM (VALUES\n"
+)
+UPDATE_TAIL = (
+    "\n) AS v\n"
+    "WHERE loc.surah = v.column1 AND loc.ayah = v.column2 AND loc.token_index = v.column3;\n"
+)
+_FRAME_BYTES = len(UPDATE_HEAD.encode("utf-8")) + len(UPDATE_TAIL.encode("utf-8"))
+_ROW_SEPARATOR = ",\n"
+
+
+def sql_literal(value: Optional[str]) -> str:
+    if value is None:
+        return "NULL"
+    return "'" + value.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def iter_word_rows(conn: sqlite3.Connection) -> Iterator[WordRow]:
+    """Stream every location that has word columns, in (surah, ayah, token_index) order."""
+    yield from conn.execute(WORD_ROWS_SQL)
+
+
+def format_values_row(row: WordRow) -> str:
+    surah, ayah, token_index, word_simple, word_diacritic = row
+    return f"({surah}, {ayah}, {token_index}, {sql_literal(word_simple)}, {sql_literal(word_diacritic)})"
+
+
+def iter_update_batches(
+    rows: Iterable[WordRow],
+    max_bytes: int = D1_MAX_STATEMENT_BYTES,
+    max_rows: int = DEFAULT_MAX_ROWS,
+) -> Iterator[Tuple[str, List[WordRow]]]:
+    """Yield (statement, rows) pairs; every statement is at most max_bytes of UTF-8."""
+    separator_bytes = len(_ROW_SEPARATOR)
+    values: List[str] = []
+    batch: List[WordRow] = []
+    size = _FRAME_BYTES
+    for row in rows:
+        literal = format_values_row(row)
+        literal_bytes = len(literal.encode("utf-8"))
+        if _FRAME_BYTES + literal_bytes > max_bytes:
+            raise ValueError(f"Row {row[:3]} alone exceeds the {max_bytes}-byte statement limit.")
+        added = literal_bytes + (separator_bytes if values else 0)
+        if values and (len(values) >= max_rows or size + added > max_bytes):
+            yield UPDATE_HEAD + _ROW_SEPARATOR.join(values) + UPDATE_TAIL, batch
+            values, batch, size = [], [], _FRAME_BYTES
+            added = literal_bytes
+        values.append(literal)
+        batch.append(row)
+        size += added
+    if values:
+        yield UPDATE_HEAD + _ROW_SEPARATOR.join(values) + UPDATE_TAIL, batch
+
+
+# --- Differential export against a remote snapshot -------------------------
+
+WordKey = Tuple[int, int, int]
+SQLITE_HEADER = b"SQLite format 3\x00"
+ROW_MANIFEST_VERSION = 1
+
+
+def row_hash(row: WordRow) -> str:
+    payload = "\x1f".join("\x00" if value is None else value for value in row[3:])
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _format_key(key: WordKey) -> str:
+    return "%d:%d:%d" % key
+
+
+def _parse_key(text: str) -> WordKey:
+    surah, ayah, token_index = text.split(":")
+    return int(surah), int(ayah), int(token_index)
+
+
+def load_baseline(path: Path) -> Dict[WordKey, str]:
+    """Row hashes of a remote snapshot: a SQLite copy of the remote DB or a row manifest from an earlier run."""
+    if not path.exists():
+        raise FileNotFoundError(f"Baseline missing: {path}")
+    with path.open("rb") as fh:
+        is_sqlite = fh.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    if is_sqlite:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        hashes = {row[:3]: row_hash(row) for row in iter_word_rows(conn)}
+        conn.close()
+        return hashes
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != ROW_MANIFEST_VERSION:
+        raise ValueError(f"Unsupported row manifest version in {path}: {manifest.get('version')}")
+    return {_parse_key(key): digest for key, digest in manifest["rows"].items()}
+
+
+def iter_changed_rows(
+    rows: Iterable[WordRow], baseline: Dict[WordKey, str], seen: Dict[WordKey, str]
+) -> Iterator[WordRow]:
+    """Yield rows whose words differ from the baseline; records every row's hash in ``seen``."""
+    for row in rows:
+        digest = row_hash(row)
+        key = row[:3]
+        seen[key] = digest
+        if baseline.get(key) != digest:
+            yield row
+
+
+def write_row_manifest(path: Path, hashes: Dict[WordKey, str], source: Path) -> None:
+    manifest = {
+        "version": ROW_MANIFEST_VERSION,
+        "source": str(source),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "rows": {_format_key(key): digest for key, digest in hashes.items()},
+    }
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, separators=(",", ":")), encoding="utf-8")
+    tmp_path.replace(path)